@@ -0,0 +1,156 @@
+"""
+Captura de cámara en un hilo dedicado.
+
+El hilo productor lee frames de la cámara sin pausa y los deja en un buffer circular
+pequeño; los consumidores (ventanas de registro y verificación) siempre reciben el frame
+más reciente, así la latencia cámara→decisión queda acotada aunque el procesamiento sea
+más lento que la cámara.
+"""
+import time
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Optional, Tuple
+
+import numpy as np
+
+from process.config_modern import VIDEO_CONFIG
+
+
+@dataclass
+class CaptureStats:
+    """Contadores de la captura en segundo plano"""
+    frames_captured: int = 0
+    frames_consumed: int = 0
+    frames_dropped: int = 0
+    read_failures: int = 0
+    capture_fps: float = 0.0
+    last_latency_ms: float = 0.0
+
+
+class FrameRingBuffer:
+    """Buffer circular de frames que entrega siempre el más reciente"""
+
+    def __init__(self, size: int = VIDEO_CONFIG.CAPTURE_BUFFER_SIZE):
+        self._frames = deque(maxlen=max(1, size))
+        self._condition = threading.Condition()
+        self._last_id: int = 0
+        self._closed: bool = False
+
+    @property
+    def last_id(self) -> int:
+        return self._last_id
+
+    def put(self, frame: np.ndarray, timestamp: float) -> int:
+        with self._condition:
+            self._last_id += 1
+            self._frames.append((self._last_id, timestamp, frame))
+            self._condition.notify_all()
+            return self._last_id
+
+    def latest(self, after_id: int = 0, timeout: Optional[float] = None) -> Optional[Tuple[int, float, np.ndarray]]:
+        """Frame más reciente con id mayor a after_id, esperando hasta timeout segundos"""
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._last_id > after_id or self._closed, timeout):
+                return None
+            if self._last_id <= after_id:
+                return None
+            return self._frames[-1]
+
+    def recent(self) -> list:
+        """Frames retenidos en el buffer, del más antiguo al más reciente"""
+        with self._condition:
+            return list(self._frames)
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+
+class CameraCapture:
+    """
+    Hilo productor sobre un cv2.VideoCapture con la misma interfaz (read, isOpened, release),
+    de modo que reemplaza a la cámara directa en las ventanas de captura.
+    """
+
+    def __init__(self, cap: Any, buffer_size: int = VIDEO_CONFIG.CAPTURE_BUFFER_SIZE):
+        self.cap = cap
+        self.buffer = FrameRingBuffer(buffer_size)
+        self.stats = CaptureStats()
+        self._consumed_id: int = 0
+        self._running = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._release_lock = threading.Lock()
+        self._released = False
+
+    @property
+    def is_running(self) -> bool:
+        return self._running.is_set()
+
+    def start(self) -> 'CameraCapture':
+        if self._thread is None and self.cap.isOpened():
+            self._running.set()
+            self._thread = threading.Thread(target=self._produce, name='camera-capture', daemon=True)
+            self._thread.start()
+        return self
+
+    def isOpened(self) -> bool:
+        return self.cap.isOpened()
+
+    def read(self, timeout: float = VIDEO_CONFIG.CAPTURE_READ_TIMEOUT) -> Tuple[bool, Optional[np.ndarray]]:
+        """Frame más reciente aún no consumido; (False, None) si no llegó uno nuevo a tiempo"""
+        item = self.buffer.latest(self._consumed_id, timeout)
+        if item is None:
+            return False, None
+        frame_id, timestamp, frame = item
+        # los frames que el productor dejó pasar sin ser consumidos se descartan
+        self.stats.frames_dropped += frame_id - self._consumed_id - 1
+        self.stats.frames_consumed += 1
+        self.stats.last_latency_ms = (time.perf_counter() - timestamp) * 1000
+        self._consumed_id = frame_id
+        return True, frame
+
+    def release(self):
+        self._running.clear()
+        self.buffer.close()
+        if self._thread is None:
+            self._release_camera()
+        elif self._thread is not threading.current_thread():
+            # VideoCapture is not thread-safe: the producer releases the camera when its loop
+            # exits, never while another thread may still be inside cap.read()
+            self._thread.join(timeout=1.0)
+
+    def _release_camera(self):
+        with self._release_lock:
+            if not self._released:
+                self._released = True
+                self.cap.release()
+
+    def _produce(self):
+        try:
+            self._capture_loop()
+        finally:
+            self._running.clear()
+            self.buffer.close()
+            self._release_camera()
+
+    def _capture_loop(self):
+        last_time = time.perf_counter()
+        while self._running.is_set():
+            ret, frame = self.cap.read()
+            now = time.perf_counter()
+            if not ret:
+                self.stats.read_failures += 1
+                if not self.cap.isOpened():
+                    break
+                time.sleep(0.01)
+                continue
+            self.buffer.put(frame, now)
+            self.stats.frames_captured += 1
+            # fps de captura suavizado (media móvil exponencial)
+            elapsed = now - last_time
+            last_time = now
+            if elapsed > 0:
+                fps = 1.0 / elapsed
+                self.stats.capture_fps = fps if self.stats.capture_fps == 0 else 0.9 * self.stats.capture_fps + 0.1 * fps
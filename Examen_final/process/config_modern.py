@@ -4,7 +4,6 @@ Solo contiene las configuraciones necesarias para la nueva interfaz.
 """
 from dataclasses import dataclass
 from typing import Tuple
-import cv2
 
 
 @dataclass
@@ -19,6 +18,15 @@ class VideoConfig:
     CAPTURE_WIDTH: int = 640
     CAPTURE_HEIGHT: int = 480
     
+    # Captura en hilo dedicado: frames retenidos y espera máxima por un frame nuevo
+    # (0 = no bloquear el hilo de la interfaz)
+    CAPTURE_BUFFER_SIZE: int = 2
+    CAPTURE_READ_TIMEOUT: float = 0.0
+    
+    # Vista previa: ancho mostrado y tasa de refresco, independiente del procesamiento
+    PREVIEW_WIDTH: int = 720
+    PREVIEW_FPS: float = 30.0
+    
     @property
     def geometry(self) -> str:
         return f"{self.WIDTH}x{self.HEIGHT}"
@@ -39,13 +47,69 @@ class ProcessingConfig:
     FACE_CONFIDENCE: float = 0.6
     FACE_MODEL: str = "VGG-Face"
     CONFIDENCE_THRESHOLD: float = 0.5
-    DISTANCE_THRESHOLD: float = 1.2
+    # 0 = umbral calibrado por DeepFace para FACE_MODEL y la métrica (find_threshold)
+    DISTANCE_THRESHOLD: float = 0.0
+    # Detector usado por DeepFace al calcular embeddings ("skip": el recorte ya es un rostro)
+    EMBEDDING_DETECTOR: str = "skip"
+
+    # Índice de la galería de embeddings: "exact", "ivf" o "pq"
+    INDEX_BACKEND: str = "exact"
+    INDEX_TOP_K: int = 5
+    INDEX_ANN_MIN_SIZE: int = 2000  # por debajo la búsqueda exacta ya es inmediata
+    INDEX_IVF_LISTS: int = 0  # 0 = raíz cuadrada del tamaño de la galería
+    INDEX_IVF_PROBES: int = 8
+    INDEX_PQ_SUBVECTORS: int = 16
+    INDEX_PQ_RERANK: int = 64  # 0 = sin re-ranking: el índice no retiene la matriz float32
+
+    # Pool de comparación fuera del hilo de la interfaz: "thread" o "process"
+    MATCHING_WORKER_MODE: str = "thread"
+    MATCHING_WORKERS: int = 1
+
+    # Superposición de la malla en la vista previa: "off", "bbox", "contour" o "full"
+    OVERLAY_MODE: str = "full"
+    OVERLAY_EVERY_N: int = 1  # dibujar en uno de cada N frames
     
     # Configuración de captura
     CAPTURE_DELAY: int = 3
-    FRAME_SKIP: int = 5
-    FRAME_COUNT_THRESHOLD: int = 48
-    RECOGNITION_ATTEMPTS: int = 3
+    FRAME_SKIP: int = 5  # detección completa cada N frames, seguimiento por malla entre medio
+    TRACKING_ENABLED: bool = True
+    TRACKING_MIN_IOU: float = 0.5  # confianza mínima del seguimiento (IoU entre mallas consecutivas)
+    TRACKING_ROI_MARGIN: float = 0.25  # margen de la región de la malla respecto al bbox seguido
+    # ancho de la copia reducida donde corren detección y malla (0 = resolución completa);
+    # bbox y landmarks vuelven a coordenadas completas y el recorte sale del frame original
+    PROCESSING_WIDTH: int = 0
+    # Selección del mejor frame para comparar (reemplaza al conteo fijo de frames centrados)
+    SELECTOR_BEST_K: int = 3
+    SELECTOR_GOOD_SCORE: float = 0.75  # calidad que dispara la comparación de inmediato
+    SELECTOR_TIME_BUDGET: float = 1.5  # s desde el primer frame aceptable
+    SELECTOR_MIN_SHARPNESS: float = 30.0  # varianza del Laplaciano mínima
+    SELECTOR_SHARPNESS_TARGET: float = 150.0
+    SELECTOR_MAX_YAW: float = 0.35  # giro/cabeceo relativos máximos (0 = frontal)
+    SELECTOR_MAX_PITCH: float = 0.35
+    SELECTOR_MIN_FACE_SIZE: int = 80  # ancho mínimo del rostro en píxeles
+    SELECTOR_FACE_SIZE_TARGET: int = 200
+    # Fusión temporal: embeddings de los mejores frames combinados en una sola sonda
+    FUSION_FRAMES: int = 3
+    FUSION_MODE: str = "quality"  # "mean" o "quality" (ponderada por la calidad del frame)
+    # Medición por etapa del pipeline: ventana de percentiles y traza por sesión en DIAGNOSTICS_DIR
+    STAGE_TIMING: bool = True
+    STAGE_WINDOW: int = 512  # últimas muestras por etapa
+    STAGE_TRACE: bool = False
+    DIAGNOSTICS_DIR: str = "diagnostics"
+    # Panel de rendimiento del dashboard: refresco (lee contadores, no toca la cámara) y aviso
+    # de falta de CPU cuando se procesa menos de esta fracción de los frames capturados
+    PERF_REFRESH_MS: int = 1000
+    PERF_STARVED_RATIO: float = 0.5
+    # Búsqueda de usuarios: espera tras la última tecla antes de filtrar
+    USER_SEARCH_DEBOUNCE_MS: int = 150
+    # Perfilado de sesiones de cámara con cProfile y tracemalloc (python start.py --profile)
+    PROFILE_SESSIONS: bool = False
+    PROFILE_TOP_N: int = 25
+    PROFILE_TRACEMALLOC_FRAMES: int = 1  # marcos por traza de asignación (más = más costo)
+    # Registro con varias plantillas por usuario (filtradas por la misma calidad del selector)
+    ENROLL_TEMPLATES: int = 3
+    ENROLL_TEMPLATE_INTERVAL: float = 0.3  # s mínimos entre plantillas, para que varíen entre sí
+    ENROLL_TIME_BUDGET: float = 4.0  # s desde el primer frame centrado; luego basta con lo capturado
     
     # Configuración de recorte de rostro
     CROP_OFFSET_X_RATIO: float = 0.1
@@ -59,7 +123,7 @@ class ProcessingConfig:
     COLOR_BLACK: Tuple[int, int, int] = (0, 0, 0)      # Negro
     
     # Configuración de texto en video (si se necesita)
-    TEXT_FONT: int = cv2.FONT_HERSHEY_SIMPLEX
+    TEXT_FONT: int = 0  # cv2.FONT_HERSHEY_SIMPLEX (sin importar cv2 al cargar la configuración)
     TEXT_SCALE: float = 0.7
     TEXT_THICKNESS: int = 2
     TEXT_X_PRIMARY: int = 10
@@ -78,7 +142,19 @@ class FileConfig:
     LOG_FAILURE_PREFIX: str = "❌ Acceso fallido: "
 
 
+@dataclass
+class ServiceConfig:
+    """Servicio local de verificación sin interfaz (python -m process.verification_service)"""
+    HOST: str = "127.0.0.1"
+    PORT: int = 8765
+    # micro-lotes: pedidos concurrentes que se embeben juntos y espera máxima para juntarlos
+    MAX_BATCH_SIZE: int = 8
+    MAX_WAIT_MS: float = 5.0
+    REQUEST_TIMEOUT: float = 30.0
+
+
 # Instancias globales para uso en el sistema
 VIDEO_CONFIG = VideoConfig()
 PROCESSING_CONFIG = ProcessingConfig()
 FILE_CONFIG = FileConfig()
+SERVICE_CONFIG = ServiceConfig()
@@ -1,6 +1,7 @@
 from pydantic import BaseModel
-from process.database.users_path import (users_path, users_check_path)
+from process.database.users_path import (users_path, users_check_path, users_db_path)
 from process.database.faces_path import faces_path
+from process.database.embeddings_path import embeddings_path
 
 
 class DataBasePaths(BaseModel):
@@ -8,3 +9,5 @@ class DataBasePaths(BaseModel):
     faces: str = faces_path
     users: str = users_path
     check_users: str = users_check_path
+    users_db: str = users_db_path
+    embeddings: str = embeddings_path
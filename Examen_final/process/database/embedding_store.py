@@ -0,0 +1,284 @@
+"""
+Almacén persistente de embeddings faciales por modelo de reconocimiento.
+
+Cada modelo guarda una matriz float32 contigua (una fila por rostro) y un índice JSON
+con el nombre, hash de contenido y firma de archivo de cada fila. La matriz se abre con
+np.memmap, por lo que cargar la galería no requiere decodificar ninguna imagen.
+"""
+import os
+import re
+import json
+import hashlib
+import numpy as np
+from dataclasses import dataclass, asdict
+from typing import Dict, Iterable, List, Optional
+
+
+@dataclass
+class EmbeddingEntry:
+    """Fila del almacén: rostro al que pertenece y firma del archivo de origen"""
+    name: str
+    content_hash: str = ''
+    mtime_ns: int = 0
+    size: int = 0
+    # foto de la que se registró (ruta:hash) en el registro masivo, para retomarlo
+    source: str = ''
+
+
+class EmbeddingStore:
+    """Matriz de embeddings en disco (memmap) con índice de nombres para un modelo"""
+
+    MATRIX_FILE: str = 'embeddings.f32'
+    INDEX_FILE: str = 'index.json'
+
+    def __init__(self, root: Optional[str], model_name: str):
+        self.model_name = model_name
+        # sin raíz el almacén vive solo en memoria
+        self.path = os.path.join(root, self.model_dir(model_name)) if root else None
+
+        self.dim: int = 0
+        self.entries: List[EmbeddingEntry] = []
+        self.positions: Dict[str, int] = {}
+        self.matrix: np.ndarray = np.empty((0, 0), dtype=np.float32)
+        self.norms: np.ndarray = np.empty(0, dtype=np.float32)
+        self._index_signature: Optional[tuple] = None
+        # aumenta con cada cambio que no sea agregar filas al final (recarga, reemplazo, eliminación)
+        self.generation: int = 0
+
+        self.load()
+
+    @staticmethod
+    def model_dir(model_name: str) -> str:
+        return re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name)
+
+    @staticmethod
+    def file_hash(file_path: str) -> str:
+        """Hash del contenido de un archivo, usado para detectar embeddings obsoletos"""
+        digest = hashlib.sha1()
+        with open(file_path, 'rb') as file:
+            for chunk in iter(lambda: file.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @property
+    def matrix_path(self) -> str:
+        return os.path.join(self.path, self.MATRIX_FILE)
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.path, self.INDEX_FILE)
+
+    @property
+    def names(self) -> List[str]:
+        return [entry.name for entry in self.entries]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.positions
+
+    def get(self, name: str) -> Optional[EmbeddingEntry]:
+        row = self.positions.get(name)
+        return None if row is None else self.entries[row]
+
+    # load
+    def load(self):
+        self._reset()
+        if self.path is None or not os.path.exists(self.index_path):
+            return
+
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as file:
+                index = json.load(file)
+            self._index_signature = self._stat_signature(self.index_path)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Índice de embeddings ilegible, se reconstruirá: {e}")
+            return
+
+        # embeddings de otro modelo no son comparables con los actuales
+        if index.get('model') != self.model_name or index.get('dtype') != 'float32':
+            print(f"⚠️ Almacén de embeddings de otro modelo ({index.get('model')}), se reconstruirá")
+            return
+
+        entries = [EmbeddingEntry(**entry) for entry in index.get('entries', [])]
+        dim = int(index.get('dim', 0))
+        expected_size = len(entries) * dim * np.dtype(np.float32).itemsize
+        if entries and (not os.path.exists(self.matrix_path) or os.path.getsize(self.matrix_path) < expected_size):
+            print("⚠️ Matriz de embeddings incompleta, se reconstruirá")
+            return
+
+        self.dim = dim
+        self.entries = entries
+        self._open_matrix()
+
+    def refresh(self) -> bool:
+        """Recarga el almacén si otro proceso u objeto modificó el índice en disco"""
+        if self.path is None:
+            return False
+        try:
+            index_signature = self._stat_signature(self.index_path)
+        except OSError:
+            index_signature = None
+        if index_signature == self._index_signature:
+            return False
+        self.load()
+        return True
+
+    # update
+    def add(self, name: str, embedding: np.ndarray, content_hash: str = '', mtime_ns: int = 0, size: int = 0):
+        """Agrega o reemplaza el embedding de un rostro escribiendo solo su fila"""
+        embedding = np.asarray(embedding, dtype=np.float32).ravel()
+        if len(self.entries) == 0:
+            self.dim = embedding.size
+        elif embedding.size != self.dim:
+            raise ValueError(f'Dimensión de embedding {embedding.size} distinta a la del almacén ({self.dim})')
+
+        entry = EmbeddingEntry(name, content_hash, mtime_ns, size)
+        row = self.positions.get(name)
+        norm = np.linalg.norm(embedding)
+
+        if self.path is None:
+            if row is None:
+                self.matrix = np.vstack([self.matrix.reshape(-1, self.dim), embedding[None, :]])
+            else:
+                self.matrix[row] = embedding
+        else:
+            os.makedirs(self.path, exist_ok=True)
+            count = len(self.entries)
+            offset = (count if row is None else row) * self.dim * embedding.itemsize
+            self.matrix = np.empty((0, self.dim), dtype=np.float32)  # libera el memmap antes de escribir
+            with open(self.matrix_path, 'r+b' if count and os.path.exists(self.matrix_path) else 'wb') as file:
+                file.seek(offset)
+                file.write(embedding.tobytes())
+
+        if row is None:
+            self.positions[name] = len(self.entries)
+            self.entries.append(entry)
+            self.norms = np.append(self.norms, np.float32(norm))
+        else:
+            self.entries[row] = entry
+            self.norms[row] = norm
+            self.generation += 1
+
+        if self.path is not None:
+            self._write_index()
+            self._open_matrix(compute_norms=False)
+
+    def add_many(self, entries: List[EmbeddingEntry], embeddings: np.ndarray):
+        """Agrega o reemplaza varios rostros escribiendo el índice una sola vez (registro masivo)"""
+        if not entries:
+            return
+        embeddings = np.asarray(embeddings, dtype=np.float32).reshape(len(entries), -1)
+        if len(self.entries) == 0:
+            self.dim = embeddings.shape[1]
+        elif embeddings.shape[1] != self.dim:
+            raise ValueError(f'Dimensión de embedding {embeddings.shape[1]} distinta a la del almacén ({self.dim})')
+
+        count = len(self.entries)
+        rows = []
+        for entry in entries:
+            row = self.positions.get(entry.name)
+            if row is None:
+                row = self.positions[entry.name] = len(self.entries)
+                self.entries.append(entry)
+            else:
+                self.entries[row] = entry
+                if row < count:
+                    self.generation += 1
+            rows.append(row)
+
+        if self.path is None:
+            matrix = np.empty((len(self.entries), self.dim), dtype=np.float32)
+            matrix[:count] = self.matrix.reshape(-1, self.dim)
+            matrix[rows] = embeddings
+            self.matrix = matrix
+            self.norms = np.linalg.norm(matrix, axis=1).astype(np.float32)
+            return
+
+        os.makedirs(self.path, exist_ok=True)
+        self.matrix = np.empty((0, self.dim), dtype=np.float32)  # libera el memmap antes de escribir
+        with open(self.matrix_path, 'r+b' if count and os.path.exists(self.matrix_path) else 'wb') as file:
+            for row, embedding in zip(rows, embeddings):
+                file.seek(row * self.dim * embedding.itemsize)
+                file.write(embedding.tobytes())
+        self._write_index()
+        self._open_matrix()
+
+    def touch(self, name: str, mtime_ns: int, size: int, persist: bool = True):
+        """Actualiza la firma del archivo de un rostro cuyo contenido no cambió"""
+        row = self.positions.get(name)
+        if row is None:
+            return
+        self.entries[row].mtime_ns = mtime_ns
+        self.entries[row].size = size
+        if persist:
+            self.flush()
+
+    def flush(self):
+        """Escribe el índice en disco (tras actualizaciones con persist=False)"""
+        if self.path is not None and self.entries:
+            self._write_index()
+
+    def remove(self, names: Iterable[str]):
+        """Elimina rostros compactando la matriz"""
+        names = set(names) & set(self.positions)
+        if not names:
+            return
+        self.generation += 1
+        keep = [i for i, entry in enumerate(self.entries) if entry.name not in names]
+        matrix = np.array(self.matrix[keep], dtype=np.float32)
+        self.entries = [self.entries[i] for i in keep]
+
+        if self.path is None:
+            self.matrix = matrix
+            self.norms = self.norms[keep]
+            self.positions = {entry.name: i for i, entry in enumerate(self.entries)}
+            return
+
+        self.matrix = np.empty((0, self.dim), dtype=np.float32)  # libera el memmap antes de reemplazar
+        tmp_path = self.matrix_path + '.tmp'
+        matrix.tofile(tmp_path)
+        os.replace(tmp_path, self.matrix_path)
+        self._write_index()
+        self._open_matrix()
+
+    # internals
+    def _reset(self):
+        self.generation += 1
+        self.dim = 0
+        self.entries = []
+        self.positions = {}
+        self.matrix = np.empty((0, 0), dtype=np.float32)
+        self.norms = np.empty(0, dtype=np.float32)
+
+    def _open_matrix(self, compute_norms: bool = True):
+        count = len(self.entries)
+        if count == 0:
+            self.matrix = np.empty((0, self.dim), dtype=np.float32)
+        else:
+            self.matrix = np.memmap(self.matrix_path, dtype=np.float32, mode='r', shape=(count, self.dim))
+        if compute_norms:
+            self.norms = np.linalg.norm(self.matrix, axis=1).astype(np.float32) if count else \
+                np.empty(0, dtype=np.float32)
+        self.positions = {entry.name: i for i, entry in enumerate(self.entries)}
+
+    def _write_index(self):
+        index = {
+            'model': self.model_name,
+            'dtype': 'float32',
+            'dim': self.dim,
+            'count': len(self.entries),
+            'entries': [asdict(entry) for entry in self.entries],
+        }
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(index, file)
+        os.replace(tmp_path, self.index_path)
+        self._index_signature = self._stat_signature(self.index_path)
+
+    @staticmethod
+    def _stat_signature(file_path: str) -> tuple:
+        # os.replace crea un inodo nuevo en cada escritura del índice
+        stat = os.stat(file_path)
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
@@ -0,0 +1,3 @@
+import os
+
+embeddings_path: str = os.path.join(os.path.dirname(__file__), 'embeddings')
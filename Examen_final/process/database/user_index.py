@@ -0,0 +1,129 @@
+"""
+Índice en memoria de usuarios para la búsqueda incremental de la pestaña de usuarios.
+
+Se construye una vez desde UserStore y se actualiza con cada alta o baja, sin volver a la
+base. La búsqueda encuentra el texto en cualquier parte del nombre o del código (sin
+distinguir mayúsculas) y muestra primero los que empiezan con él:
+  • la búsqueda completa recorre un único texto con todas las claves con str.find, en C
+    (o una pasada sobre las claves si la consulta coincide con muchas);
+  • al seguir escribiendo, la nueva consulta contiene a la anterior y solo se filtran los
+    resultados previos (estrechamiento incremental).
+"""
+import bisect
+from typing import Iterable, List, Optional, Tuple
+
+# separa las claves dentro del texto de búsqueda; no aparece en nombres ni códigos
+_KEY_END = '\n'
+
+
+class UserIndex:
+    """Usuarios ordenados por nombre con búsqueda por subcadena y prefijo"""
+
+    def __init__(self, users: Iterable[Tuple[str, str]] = ()):
+        self.order: List[Tuple[str, str]] = []   # sort key (name, code) in display order
+        self.codes: List[str] = []
+        self.names: List[str] = []
+        self.rebuild(users)
+
+    def rebuild(self, users: Iterable[Tuple[str, str]]):
+        """(código, nombre) de todos los usuarios"""
+        rows = sorted(((name.lower(), code), code, name) for code, name in users)
+        self.order = [row[0] for row in rows]
+        self.codes = [row[1] for row in rows]
+        self.names = [row[2] for row in rows]
+        self._positions = {code: i for i, code in enumerate(self.codes)}
+        self._invalidate()
+
+    def _invalidate(self):
+        self._blob: Optional[str] = None
+        self._starts: List[int] = []
+        self._keys: List[str] = []
+        self._lower_codes: List[str] = []
+        self._last_query: Optional[str] = None
+        self._last_rows: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __contains__(self, code: str) -> bool:
+        return code in self._positions
+
+    def display(self, row: int) -> str:
+        return f"{self.names[row]} (ID: {self.codes[row]})"
+
+    def key(self, row: int) -> str:
+        return f"{self.names[row].lower()} {self.codes[row].lower()}"
+
+    # updates
+    def add(self, code: str, name: str):
+        """Alta (o cambio de nombre) de un usuario en su posición ordenada"""
+        if code in self._positions:
+            self.remove(code)
+        sort_key = (name.lower(), code)
+        row = bisect.bisect_left(self.order, sort_key)
+        self.order.insert(row, sort_key)
+        self.codes.insert(row, code)
+        self.names.insert(row, name)
+        self._reposition(row)
+
+    def remove(self, code: str) -> bool:
+        row = self._positions.pop(code, None)
+        if row is None:
+            return False
+        del self.order[row], self.codes[row], self.names[row]
+        self._reposition(row)
+        return True
+
+    def _reposition(self, start: int):
+        for i in range(start, len(self.codes)):
+            self._positions[self.codes[i]] = i
+        self._invalidate()
+
+    # search
+    def _build_blob(self):
+        self._keys = [self.key(row) for row in range(len(self.codes))]
+        self._lower_codes = [code.lower() for code in self.codes]
+        self._starts, offset = [], 0
+        for key in self._keys:
+            self._starts.append(offset)
+            offset += len(key) + len(_KEY_END)
+        self._blob = _KEY_END.join(self._keys) + _KEY_END
+
+    def _scan(self, query: str) -> List[int]:
+        blob, starts, rows = self._blob, self._starts, []
+        # with many hits one pass over the keys is cheaper than one find + bisect per hit
+        if blob.count(query) * 16 > len(starts):
+            return [row for row, key in enumerate(self._keys) if query in key]
+        position = blob.find(query)
+        while position != -1:
+            row = bisect.bisect_right(starts, position) - 1
+            rows.append(row)
+            # one hit per user: continue after the end of this key
+            next_start = starts[row + 1] if row + 1 < len(starts) else len(blob)
+            position = blob.find(query, next_start)
+        return rows
+
+    def search(self, query: str) -> List[int]:
+        """Filas que contienen la consulta en nombre o código: primero las que empiezan con ella"""
+        query = query.strip().lower()
+        if not query:
+            return list(range(len(self.codes)))
+        if _KEY_END in query:
+            return []
+
+        if self._blob is None:
+            self._build_blob()
+        keys, codes = self._keys, self._lower_codes
+        last = self._last_query
+        if last and last in query:
+            rows = [row for row in self._last_rows if query in keys[row]]
+        else:
+            rows = self._scan(query)
+        self._last_query, self._last_rows = query, rows
+
+        # the key starts with the lowercased name
+        prefix = [row for row in rows if keys[row].startswith(query) or codes[row].startswith(query)]
+        if len(prefix) in (0, len(rows)):
+            return list(rows)
+        prefix_set = set(prefix)
+        return prefix + [row for row in rows if row not in prefix_set]
@@ -0,0 +1,265 @@
+"""
+Almacén de usuarios, plantillas faciales y marcaciones en SQLite.
+
+Reemplaza los archivos users/<código>.txt: una sola base embebida en modo WAL (lectores y un
+escritor a la vez sin bloquearse entre sí) con las tablas
+  • users           código, nombre y fecha de alta
+  • face_templates  plantilla (imagen en faces/) → usuario
+  • check_ins       marcaciones exitosas o fallidas, indexadas por usuario y por fecha
+
+Cada hilo usa su propia conexión; las escrituras concurrentes de varios procesos esperan el
+lock de escritura hasta BUSY_TIMEOUT en lugar de fallar.
+
+Migración del esquema anterior (archivos .txt y .png):
+    python -m process.database.user_store migrate [--users DIR] [--faces DIR] [--force]
+"""
+import os
+import sqlite3
+import argparse
+import datetime
+import threading
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Tuple
+
+from process.config_modern import FILE_CONFIG
+from process.database.users_path import users_db_path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    code TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_users_name ON users(name COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS face_templates (
+    template TEXT PRIMARY KEY,
+    user_code TEXT NOT NULL REFERENCES users(code) ON DELETE CASCADE,
+    path TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_face_templates_user ON face_templates(user_code);
+CREATE TABLE IF NOT EXISTS check_ins (
+    id INTEGER PRIMARY KEY,
+    user_code TEXT NOT NULL,
+    checked_at TEXT NOT NULL,
+    success INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS idx_check_ins_user ON check_ins(user_code, checked_at);
+CREATE INDEX IF NOT EXISTS idx_check_ins_time ON check_ins(checked_at);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def timestamp(moment: Optional[datetime.datetime] = None) -> str:
+    """Fecha en el formato de los registros (ordenable como texto)"""
+    return (moment or datetime.datetime.now()).strftime(FILE_CONFIG.DATETIME_FORMAT)
+
+
+@dataclass
+class UserRecord:
+    """Usuario registrado"""
+    code: str
+    name: str
+    created_at: str = ''
+
+
+@dataclass
+class MigrationReport:
+    """Filas importadas del esquema de archivos"""
+    users: int = 0
+    templates: int = 0
+    check_ins: int = 0
+    skipped: bool = False
+
+
+class UserStore:
+    """Usuarios, plantillas y marcaciones en una base SQLite en modo WAL"""
+
+    BUSY_TIMEOUT: float = 10.0
+
+    def __init__(self, path: str = users_db_path):
+        self.path = path
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Conexión del hilo actual (sqlite3 no comparte conexiones entre hilos)"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=self.BUSY_TIMEOUT)
+            connection.execute('PRAGMA journal_mode=WAL')
+            # FULL: a check-in survives a power loss once its commit returns
+            connection.execute('PRAGMA synchronous=FULL')
+            connection.execute('PRAGMA foreign_keys=ON')
+            with self._schema_lock:
+                if not self._schema_ready:
+                    with connection:
+                        connection.executescript(SCHEMA)
+                    self._schema_ready = True
+            self._local.connection = connection
+        return connection
+
+    def close(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    # users
+    def add_user(self, code: str, name: str) -> bool:
+        """Alta de un usuario; False si el código ya existe"""
+        with self.connection as connection:
+            cursor = connection.execute('INSERT OR IGNORE INTO users (code, name, created_at) VALUES (?, ?, ?)',
+                                        (code, name, timestamp()))
+        return cursor.rowcount == 1
+
+    def add_users(self, users: Iterable[Tuple[str, str]]) -> int:
+        """Alta de varios usuarios en una transacción; devuelve cuántos eran nuevos"""
+        created_at = timestamp()
+        with self.connection as connection:
+            before = connection.total_changes
+            connection.executemany('INSERT OR IGNORE INTO users (code, name, created_at) VALUES (?, ?, ?)',
+                                   ((code, name, created_at) for code, name in users))
+            return connection.total_changes - before
+
+    def delete_user(self, code: str) -> bool:
+        """Baja del usuario y sus plantillas; las marcaciones quedan como historial"""
+        with self.connection as connection:
+            cursor = connection.execute('DELETE FROM users WHERE code = ?', (code,))
+        return cursor.rowcount == 1
+
+    def get_user(self, code: str) -> Optional[UserRecord]:
+        row = self.connection.execute('SELECT code, name, created_at FROM users WHERE code = ?', (code,)).fetchone()
+        return UserRecord(*row) if row else None
+
+    def __contains__(self, code: str) -> bool:
+        return self.connection.execute('SELECT 1 FROM users WHERE code = ?', (code,)).fetchone() is not None
+
+    def users(self) -> List[UserRecord]:
+        """Todos los usuarios ordenados por nombre"""
+        rows = self.connection.execute('SELECT code, name, created_at FROM users ORDER BY name COLLATE NOCASE, code')
+        return [UserRecord(*row) for row in rows]
+
+    def user_codes(self) -> List[str]:
+        return [row[0] for row in self.connection.execute('SELECT code FROM users ORDER BY code')]
+
+    def user_count(self) -> int:
+        return self.connection.execute('SELECT COUNT(*) FROM users').fetchone()[0]
+
+    # face templates
+    def add_templates(self, templates: Iterable[Tuple[str, str, str]]) -> int:
+        """(plantilla, código de usuario, ruta de la imagen); reemplaza plantillas con el mismo nombre"""
+        created_at = timestamp()
+        with self.connection as connection:
+            before = connection.total_changes
+            connection.executemany('INSERT OR REPLACE INTO face_templates (template, user_code, path, created_at) '
+                                   'VALUES (?, ?, ?, ?)',
+                                   ((template, code, path, created_at) for template, code, path in templates))
+            return connection.total_changes - before
+
+    def remove_templates(self, code: str) -> int:
+        with self.connection as connection:
+            return connection.execute('DELETE FROM face_templates WHERE user_code = ?', (code,)).rowcount
+
+    def templates(self, code: str) -> List[Tuple[str, str]]:
+        """(plantilla, ruta) del usuario"""
+        return self.connection.execute('SELECT template, path FROM face_templates WHERE user_code = ? '
+                                       'ORDER BY template', (code,)).fetchall()
+
+    # check-ins
+    def check_in(self, code: str, success: bool = True, moment: Optional[datetime.datetime] = None):
+        with self.connection as connection:
+            connection.execute('INSERT INTO check_ins (user_code, checked_at, success) VALUES (?, ?, ?)',
+                               (code, timestamp(moment), int(success)))
+
+    def check_ins(self, code: str, limit: int = 20) -> List[Tuple[str, bool]]:
+        """Últimas marcaciones del usuario: (fecha, exitosa), de la más reciente a la más antigua"""
+        rows = self.connection.execute('SELECT checked_at, success FROM check_ins WHERE user_code = ? '
+                                       'ORDER BY checked_at DESC, id DESC LIMIT ?', (code, limit))
+        return [(checked_at, bool(success)) for checked_at, success in rows]
+
+    def check_in_count(self, code: str) -> int:
+        return self.connection.execute('SELECT COUNT(*) FROM check_ins WHERE user_code = ?', (code,)).fetchone()[0]
+
+    # legacy file layout
+    def migrate_legacy(self, users_path: str, faces_path: str, force: bool = False) -> MigrationReport:
+        """
+        Importa users/<código>.txt (nombre y marcaciones) y faces/*.png (plantillas) una sola vez;
+        con force se vuelve a recorrer, sin duplicar usuarios ni plantillas.
+        """
+        from process.face_processing.face_gallery import template_user
+
+        report = MigrationReport()
+        with self.connection as connection:
+            migrated = connection.execute("SELECT 1 FROM meta WHERE key = 'legacy_migrated'").fetchone()
+            if migrated and not force:
+                report.skipped = True
+                return report
+            before = connection.total_changes
+
+            users, check_ins = [], []
+            user_files = sorted(os.listdir(users_path)) if os.path.isdir(users_path) else []
+            for file_name in user_files:
+                if not file_name.endswith(FILE_CONFIG.USER_FILE_EXTENSION):
+                    continue
+                code = file_name[:-len(FILE_CONFIG.USER_FILE_EXTENSION)]
+                file_path = os.path.join(users_path, file_name)
+                with open(file_path, 'r', encoding='utf-8', errors='replace') as file:
+                    lines = [line.strip() for line in file if line.strip()]
+                created_at = timestamp(datetime.datetime.fromtimestamp(os.stat(file_path).st_mtime))
+                name = lines[0].split(',')[0] if lines else code
+                users.append((code, name or code, created_at))
+                for line in lines[1:]:
+                    for prefix, success in ((FILE_CONFIG.LOG_SUCCESS_PREFIX, 1), (FILE_CONFIG.LOG_FAILURE_PREFIX, 0)):
+                        if line.startswith(prefix.strip()):
+                            check_ins.append((code, line[len(prefix.strip()):].strip(), success))
+            connection.executemany('INSERT OR IGNORE INTO users (code, name, created_at) VALUES (?, ?, ?)', users)
+            report.users = connection.total_changes - before
+            # check-ins are only imported on the first pass, a forced re-run would duplicate them
+            if not migrated:
+                connection.executemany('INSERT INTO check_ins (user_code, checked_at, success) VALUES (?, ?, ?)',
+                                       check_ins)
+                report.check_ins = len(check_ins)
+
+            before = connection.total_changes
+            known = {row[0] for row in connection.execute('SELECT code FROM users')}
+            face_files = sorted(os.listdir(faces_path)) if os.path.isdir(faces_path) else []
+            templates = [(os.path.splitext(file_name)[0], template_user(os.path.splitext(file_name)[0]),
+                          os.path.join(faces_path, file_name), timestamp())
+                         for file_name in face_files if file_name.endswith('.png')]
+            connection.executemany('INSERT OR IGNORE INTO face_templates (template, user_code, path, created_at) '
+                                   'VALUES (?, ?, ?, ?)', [row for row in templates if row[1] in known])
+            report.templates = connection.total_changes - before
+            connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('legacy_migrated', ?)", (timestamp(),))
+        return report
+
+
+def main(argv: Optional[List[str]] = None):
+    from process.database.config import DataBasePaths
+    database = DataBasePaths()
+    parser = argparse.ArgumentParser(description='Almacén SQLite de usuarios y marcaciones')
+    parser.add_argument('command', choices=['migrate'])
+    parser.add_argument('--users', default=database.users, help='directorio de archivos <código>.txt')
+    parser.add_argument('--faces', default=database.faces, help='directorio de rostros <plantilla>.png')
+    parser.add_argument('--db', default=database.users_db, help='archivo de la base SQLite')
+    parser.add_argument('--force', action='store_true', help='volver a importar aunque ya se haya migrado')
+    args = parser.parse_args(argv)
+
+    store = UserStore(args.db)
+    report = store.migrate_legacy(args.users, args.faces, force=args.force)
+    if report.skipped:
+        print(f'ℹ️ {args.db} ya fue migrada (usa --force para volver a importar)')
+    else:
+        print(f'✅ Migración: {report.users} usuarios, {report.templates} plantillas y '
+              f'{report.check_ins} marcaciones importadas en {args.db}')
+
+
+if __name__ == '__main__':
+    main()
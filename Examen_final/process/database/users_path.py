@@ -1,4 +1,5 @@
 import os
 
 users_path: str = os.path.join(os.path.dirname(__file__), 'users')
-users_check_path: str = os.path.join(os.path.dirname(__file__), 'users', '')
\ No newline at end of file
+users_check_path: str = os.path.join(os.path.dirname(__file__), 'users', '')
+users_db_path: str = os.path.join(os.path.dirname(__file__), 'users.sqlite3')
@@ -0,0 +1,354 @@
+"""
+Registro masivo de usuarios sin cámara.
+
+Uso: python -m process.enroll <directorio | manifiesto.csv> [--workers N] [--batch 256] [--force]
+
+Fuentes aceptadas:
+  • directorio con una foto por usuario (<código>.jpg) o una carpeta por usuario
+    (<código>/*.jpg, cada foto pasa a ser una plantilla del usuario)
+  • manifiesto CSV con columnas path,code[,name] (rutas relativas al manifiesto)
+
+Detección, recorte y embedding corren en un pool de procesos (uno por CPU, cada uno con sus
+propios modelos). El proceso principal escribe los rostros y registros de usuario y agrega los
+embeddings al almacén por lotes, de modo que una ejecución interrumpida retoma donde quedó:
+cada embedding guarda la foto de la que salió (ruta y hash de contenido) y las fotos ya
+registradas, con su imagen en disco, se omiten aunque se hayan agregado o quitado otras.
+"""
+import os
+import csv
+import sys
+import time
+import argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from process.database.config import DataBasePaths
+from process.database.embedding_store import EmbeddingEntry, EmbeddingStore
+from process.database.user_store import UserStore
+from process.face_processing.face_gallery import template_name, template_user
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tiff')
+
+
+@dataclass
+class EnrollTask:
+    """Foto a registrar como plantilla de un usuario"""
+    path: str
+    code: str
+    name: str
+    template: str
+    source: str = ''  # ruta:hash de la foto, calculado al retomar o en el proceso del pool
+
+
+@dataclass
+class EnrollResult:
+    """Resultado de procesar una foto en un proceso del pool"""
+    template: str
+    status: str  # "ok", "unreadable", "no_face" o "no_embedding"
+    embedding: Optional[np.ndarray] = None
+    content_hash: str = ''
+    mtime_ns: int = 0
+    size: int = 0
+    source: str = ''
+
+
+def _is_image(file_name: str) -> bool:
+    return file_name.lower().endswith(IMAGE_EXTENSIONS)
+
+
+def _tasks_for_user(code: str, name: str, paths: List[str]) -> List[EnrollTask]:
+    return [EnrollTask(path, code, name or code, template_name(code, i)) for i, path in enumerate(paths)]
+
+
+def discover_directory(source: str) -> List[EnrollTask]:
+    """Fotos de un directorio: <código>.<ext> o <código>/<fotos>"""
+    tasks = []
+    for entry in sorted(os.listdir(source)):
+        path = os.path.join(source, entry)
+        if os.path.isdir(path):
+            photos = [os.path.join(path, file) for file in sorted(os.listdir(path)) if _is_image(file)]
+            tasks.extend(_tasks_for_user(entry, entry, photos))
+        elif _is_image(entry):
+            code = os.path.splitext(entry)[0]
+            tasks.extend(_tasks_for_user(code, code, [path]))
+    return tasks
+
+
+def read_manifest(manifest_path: str) -> List[EnrollTask]:
+    """Fotos de un manifiesto CSV (path,code[,name]); varias filas de un código son varias plantillas"""
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    photos: Dict[str, List[str]] = {}
+    names: Dict[str, str] = {}
+    with open(manifest_path, newline='', encoding='utf-8') as file:
+        for row in csv.DictReader(file):
+            code = (row.get('code') or '').strip()
+            path = (row.get('path') or '').strip()
+            if not code or not path:
+                continue
+            photos.setdefault(code, []).append(path if os.path.isabs(path) else os.path.join(base_dir, path))
+            names.setdefault(code, (row.get('name') or '').strip())
+    tasks = []
+    for code, paths in photos.items():
+        tasks.extend(_tasks_for_user(code, names[code], paths))
+    return tasks
+
+
+def load_tasks(source: str) -> List[EnrollTask]:
+    if os.path.isdir(source):
+        return discover_directory(source)
+    if source.lower().endswith('.csv'):
+        return read_manifest(source)
+    raise ValueError(f'Fuente no soportada: {source} (se espera un directorio o un manifiesto .csv)')
+
+
+def source_key(path: str) -> str:
+    """Identidad de una foto de origen: ruta absoluta y hash de su contenido"""
+    return f'{os.path.abspath(path)}:{EmbeddingStore.file_hash(path)}'
+
+
+def pending_tasks(tasks: Iterable[EnrollTask], store: EmbeddingStore, faces_path: str) -> List[EnrollTask]:
+    """
+    Fotos que faltan: sin embedding en el almacén o sin su imagen en disco.
+
+    Se retoma por foto de origen y no por posición en la carpeta: a cada tarea ya registrada
+    se le asigna su plantilla guardada y las fotos nuevas reciben nombres de plantilla libres.
+    Las plantillas sin origen (registradas por una versión anterior) se reconocen por nombre.
+    """
+    stored: Dict[str, List[EmbeddingEntry]] = {}
+    for entry in store.entries:
+        stored.setdefault(template_user(entry.name), []).append(entry)
+    by_user: Dict[str, List[EnrollTask]] = {}
+    for task in tasks:
+        by_user.setdefault(task.code, []).append(task)
+
+    pending = []
+    for code, user_tasks in by_user.items():
+        entries = stored.get(code)
+        if not entries:
+            # nothing stored for this user: the positional names are all free
+            pending.extend(user_tasks)
+            continue
+        by_source = {entry.source: entry.name for entry in entries if entry.source}
+        legacy = {entry.name for entry in entries if not entry.source}
+        used = {entry.name for entry in entries}
+        new = []
+        for task in user_tasks:
+            task.source = task.source or source_key(task.path)
+            template = by_source.get(task.source) or (task.template if task.template in legacy else None)
+            if template is None:
+                new.append(task)
+                continue
+            task.template = template
+            if not os.path.exists(os.path.join(faces_path, f'{template}.png')):
+                pending.append(task)
+        slot = 0
+        for task in new:
+            while template_name(code, slot) in used:
+                slot += 1
+            task.template = template_name(code, slot)
+            used.add(task.template)
+            pending.append(task)
+    return pending
+
+
+# FaceUtils propio de cada proceso del pool
+_WORKER_FACE_UTILS = None
+
+
+def _worker_init(single_thread: bool = False):
+    global _WORKER_FACE_UTILS
+    if single_thread:
+        # one pool process per CPU: TensorFlow's default pools (one thread per CPU each)
+        # would oversubscribe the machine; must run before the first TensorFlow op
+        try:
+            import tensorflow as tf
+            tf.config.threading.set_intra_op_parallelism_threads(1)
+            tf.config.threading.set_inter_op_parallelism_threads(1)
+        except ImportError:
+            pass
+    from process.face_processing.face_utils import FaceUtils
+    _WORKER_FACE_UTILS = FaceUtils()
+
+
+def _worker_model_name() -> str:
+    return _WORKER_FACE_UTILS.face_matcher.embedding_model
+
+
+def enroll_photo(task: EnrollTask, faces_path: str) -> EnrollResult:
+    """Detección, recorte y embedding de una foto, igual que FaceSignUp; guarda el rostro recortado"""
+    import cv2
+    from process.face_processing.frame_context import FrameContext
+
+    face_utils = _WORKER_FACE_UTILS
+    image = cv2.imread(task.path)
+    if image is None:
+        return EnrollResult(task.template, 'unreadable')
+    source = task.source or source_key(task.path)
+
+    frame_context = FrameContext(image)
+    check_face, face_info = face_utils.face_detector.face_detect_mediapipe(
+        image, face_utils.detection_image(frame_context))
+    if not check_face:
+        return EnrollResult(task.template, 'no_face')
+    face_bbox = face_utils.face_detector.extract_face_bbox_mediapipe(frame_context.width, frame_context.height,
+                                                                     face_info)
+    face_crop = face_utils.face_crop(frame_context, face_bbox)
+    if face_crop.size == 0:
+        return EnrollResult(task.template, 'no_face')
+
+    # the same image that FaceUtils.save_face writes is the one embedded
+    face_saved = cv2.cvtColor(face_crop, cv2.COLOR_BGR2RGB)
+    embedding = face_utils.face_matcher.face_embedding(face_saved)
+    if embedding is None:
+        return EnrollResult(task.template, 'no_embedding')
+
+    img_path = os.path.join(faces_path, f'{task.template}.png')
+    cv2.imwrite(img_path, face_saved)
+    stat = os.stat(img_path)
+    return EnrollResult(task.template, 'ok', np.asarray(embedding, dtype=np.float32).ravel(),
+                        EmbeddingStore.file_hash(img_path), stat.st_mtime_ns, stat.st_size, source)
+
+
+def write_user_records(tasks: Iterable[EnrollTask], user_store: UserStore, faces_path: str) -> int:
+    """Alta de cada usuario nuevo y de sus plantillas en el almacén; devuelve los usuarios nuevos"""
+    tasks = list(tasks)
+    written = user_store.add_users({task.code: task.name for task in tasks}.items())
+    user_store.add_templates((task.template, task.code, os.path.join(faces_path, f'{task.template}.png'))
+                             for task in tasks)
+    return written
+
+
+class ProgressReport:
+    """Progreso y rostros/s en la consola, como mucho cada `interval` segundos"""
+
+    def __init__(self, total: int, interval: float = 2.0, stream=sys.stdout):
+        self.total = total
+        self.interval = interval
+        self.stream = stream
+        self.done = 0
+        self.status = Counter()
+        self.start = time.perf_counter()
+        self._last = 0.0
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    @property
+    def throughput(self) -> float:
+        return self.done / self.elapsed if self.elapsed > 0 else 0.0
+
+    def update(self, status: str):
+        self.done += 1
+        self.status[status] += 1
+        now = time.perf_counter()
+        if now - self._last >= self.interval or self.done == self.total:
+            self._last = now
+            rate = self.throughput
+            eta = (self.total - self.done) / rate if rate > 0 else float('inf')
+            print(f'  {self.done}/{self.total} fotos | {rate:.1f} rostros/s | restante ~{eta:.0f} s | '
+                  f'fallidas {self.done - self.status["ok"]}', file=self.stream, flush=True)
+
+
+class EnrollPool:
+    """Pool de procesos con los modelos cargados; con un solo proceso trabaja en el actual"""
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.executor: Optional[ProcessPoolExecutor] = None
+        if workers > 1:
+            self.executor = ProcessPoolExecutor(workers, initializer=_worker_init, initargs=(True,))
+        else:
+            _worker_init()
+
+    def model_name(self) -> str:
+        # the store is per recognition model: ask a worker instead of loading the models here too
+        if self.executor is None:
+            return _worker_model_name()
+        return self.executor.submit(_worker_model_name).result()
+
+    def map(self, tasks: List[EnrollTask], faces_path: str) -> Iterator[EnrollResult]:
+        if self.executor is None:
+            return (enroll_photo(task, faces_path) for task in tasks)
+        chunksize = max(1, min(32, len(tasks) // (self.workers * 4)))
+        return self.executor.map(enroll_photo, tasks, [faces_path] * len(tasks), chunksize=chunksize)
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+
+
+def enroll(source: str, workers: int = 0, batch_size: int = 256, force: bool = False,
+           database: Optional[DataBasePaths] = None) -> ProgressReport:
+    database = database or DataBasePaths()
+    workers = workers or os.cpu_count() or 1
+    tasks = load_tasks(source)
+    print(f'📂 {len(tasks)} fotos de {len({task.code for task in tasks})} usuarios en {source}')
+
+    entries: List[EmbeddingEntry] = []
+    embeddings: List[np.ndarray] = []
+    pool = EnrollPool(workers)
+    try:
+        store = EmbeddingStore(database.embeddings, pool.model_name())
+        os.makedirs(database.faces, exist_ok=True)
+        todo = tasks if force else pending_tasks(tasks, store, database.faces)
+        if len(todo) < len(tasks):
+            print(f'⏩ {len(tasks) - len(todo)} plantillas ya registradas, se omiten')
+        print(f'⚙️ {len(todo)} fotos con {workers} procesos ({store.model_name})')
+
+        report = ProgressReport(len(todo))
+        tasks_by_template = {task.template: task for task in todo}
+        failed: List[EnrollTask] = []
+        for result in pool.map(todo, database.faces):
+            report.update(result.status)
+            if result.status != 'ok':
+                failed.append(tasks_by_template[result.template])
+                continue
+            entries.append(EmbeddingEntry(result.template, result.content_hash, result.mtime_ns, result.size,
+                                          result.source))
+            embeddings.append(result.embedding)
+            # the store is written per batch: an interrupted run loses at most one batch
+            if len(entries) >= batch_size:
+                store.add_many(entries, np.stack(embeddings))
+                entries, embeddings = [], []
+    finally:
+        if entries:
+            store.add_many(entries, np.stack(embeddings))
+        pool.shutdown()
+
+    # users of every stored template, including those enrolled by an interrupted run
+    users_written = write_user_records([task for task in tasks if task.template in store],
+                                       UserStore(database.users_db), database.faces)
+    print(f'✅ {report.status["ok"]} plantillas registradas ({users_written} usuarios nuevos) en {report.elapsed:.1f} s '
+          f'→ {report.throughput:.1f} rostros/s')
+    if failed:
+        failed_path = os.path.join(database.embeddings, 'enroll_failed.csv')
+        os.makedirs(database.embeddings, exist_ok=True)
+        with open(failed_path, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.writer(file)
+            writer.writerow(['path', 'code', 'name'])
+            writer.writerows([task.path, task.code, task.name] for task in failed)
+        print(f'⚠️ {len(failed)} fotos fallidas ({dict(report.status - Counter(ok=report.status["ok"]))}), '
+              f'listadas en {failed_path}')
+    return report
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Registro masivo de usuarios a partir de fotos')
+    parser.add_argument('source', help='directorio de fotos o manifiesto CSV (path,code[,name])')
+    parser.add_argument('--workers', type=int, default=0, help='procesos del pool (0 = número de CPUs)')
+    parser.add_argument('--batch', type=int, default=256, help='embeddings escritos por lote')
+    parser.add_argument('--force', action='store_true', help='reprocesar también las plantillas ya registradas')
+    args = parser.parse_args(argv)
+    try:
+        enroll(args.source, args.workers, args.batch, args.force)
+    except (OSError, ValueError) as e:
+        raise SystemExit(f'❌ {e}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,7 @@
 import numpy as np
 import mediapipe as mp
 import cv2
-from typing import Tuple, Any
+from typing import Tuple, Any, Optional
 
 
 class FaceDetectMediapipe:
@@ -12,9 +12,10 @@ class FaceDetectMediapipe:
         self.bbox = []
         self.face_points = []
 
-    def face_detect_mediapipe(self, face_image: np.ndarray) -> Tuple[bool, Any]:
-        rgb_image = face_image.copy()
-        rgb_image = cv2.cvtColor(rgb_image, cv2.COLOR_BGR2RGB)
+    def face_detect_mediapipe(self, face_image: np.ndarray, rgb_image: Optional[np.ndarray] = None) -> Tuple[bool, Any]:
+        # rgb_image: RGB view already computed for this frame (FrameContext)
+        if rgb_image is None:
+            rgb_image = cv2.cvtColor(face_image, cv2.COLOR_BGR2RGB)
 
         faces = self.face_detector_mp.process(rgb_image)
         if faces.detections is None:
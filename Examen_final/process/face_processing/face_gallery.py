@@ -0,0 +1,289 @@
+import os
+import cv2
+import numpy as np
+from typing import Callable, Dict, List, Optional, Tuple
+
+from process.utils import FileUtils
+from process.database.embedding_store import EmbeddingEntry, EmbeddingStore
+from process.config_modern import PROCESSING_CONFIG
+from process.face_processing.face_index_models.face_index import (embedding_distances, top_k, create_face_index,
+                                                                  FaceIndexExact)
+
+# a user enrolls several templates: "{user}.png" is the first, "{user}~{n}.png" the others
+TEMPLATE_SEPARATOR = '~'
+# new faces written to the store per index write during sync
+SYNC_BATCH_SIZE = 256
+
+
+def template_name(user: str, index: int) -> str:
+    return user if index == 0 else f'{user}{TEMPLATE_SEPARATOR}{index}'
+
+
+def template_user(name: str) -> str:
+    return name.split(TEMPLATE_SEPARATOR, 1)[0]
+
+
+class FaceGallery:
+    """
+    Enrolled faces kept as embeddings: each face is embedded once and the probe is scored
+    against the whole gallery with one NumPy distance computation.
+
+    Each user may own several templates. Search scores one centroid per user and only
+    compares a user's individual templates when the spread around its centroid leaves
+    the decision open, so its cost grows with the number of users, not of templates.
+    """
+    def __init__(self, embedder: Callable[[np.ndarray], Optional[np.ndarray]], metric: str = 'cosine',
+                 store: Optional[EmbeddingStore] = None, index_backend: str = PROCESSING_CONFIG.INDEX_BACKEND,
+                 threshold: float = PROCESSING_CONFIG.DISTANCE_THRESHOLD):
+        self.embedder = embedder
+        self.metric = metric
+        # decision threshold of the matcher (FaceMatcherModels.distance_threshold)
+        self.threshold = threshold
+        # without a persistent store the gallery lives in memory only
+        self.store = store if store is not None else EmbeddingStore(None, 'memory')
+        # search index, kept in step with the store
+        self.index: FaceIndexExact = create_face_index(index_backend, metric)
+        self.index_state: Tuple[int, int] = (-1, 0)
+        self.indexed_templates: int = 0
+        self.indexed_counts = np.zeros(0, dtype=np.int64)
+        # per-user centroids, recomputed when the store changes
+        self.users: List[str] = []
+        self.user_positions: Dict[str, int] = {}
+        self.template_counts = np.zeros(0, dtype=np.int64)
+        self.centroids = np.zeros((0, 0), dtype=np.float32)
+        self.centroid_norms = np.zeros(0, dtype=np.float32)
+        self.spreads = np.zeros(0, dtype=np.float32)
+        self.template_rows: np.ndarray = np.zeros(0, dtype=np.int64)
+        self.template_offsets: np.ndarray = np.zeros(1, dtype=np.int64)
+        self.users_state: Tuple[int, int] = (-1, -1)
+        # users whose templates were compared in the last search (diagnostics)
+        self.templates_consulted: int = 0
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    @property
+    def names(self) -> List[str]:
+        return self.store.names
+
+    @property
+    def embeddings(self) -> np.ndarray:
+        return self.store.matrix
+
+    def add(self, name: str, embedding: np.ndarray, content_hash: str = '', mtime_ns: int = 0, size: int = 0):
+        self.store.add(name, embedding, content_hash, mtime_ns, size)
+
+    def add_face(self, name: str, face_image: np.ndarray, content_hash: str = '', mtime_ns: int = 0,
+                 size: int = 0) -> bool:
+        embedding = self.embedder(face_image)
+        if embedding is None:
+            return False
+        self.add(name, embedding, content_hash, mtime_ns, size)
+        return True
+
+    def add_face_file(self, name: str, img_path: str, face_image: Optional[np.ndarray] = None) -> bool:
+        """Embeds a saved face and records its content hash so the file is not embedded again"""
+        stat = os.stat(img_path)
+        if face_image is None:
+            face_image = cv2.imread(img_path)
+            if face_image is None:
+                return False
+        return self.add_face(name, face_image, EmbeddingStore.file_hash(img_path), stat.st_mtime_ns, stat.st_size)
+
+    def remove(self, name: str):
+        self.store.remove([name])
+
+    def user_templates(self, user: str) -> List[str]:
+        """Stored names of every template enrolled for a user"""
+        return [name for name in self.store.names if template_user(name) == user]
+
+    def sync(self, database_path: str) -> int:
+        """Embeds faces added or modified on disk since the last sync and drops deleted ones"""
+        self.store.refresh()
+
+        current: Dict[str, str] = {}
+        for file in FileUtils.get_valid_image_files(database_path):
+            current[os.path.splitext(file)[0]] = os.path.join(database_path, file)
+
+        self.store.remove([name for name in self.store.names if name not in current])
+
+        entries: List[EmbeddingEntry] = []
+        embeddings: List[np.ndarray] = []
+        embedded, touched = 0, False
+        for name, img_path in current.items():
+            entry = self.store.get(name)
+            stat = os.stat(img_path)
+            if entry is not None and (entry.mtime_ns, entry.size) == (stat.st_mtime_ns, stat.st_size):
+                continue
+            # the file signature changed: only re-embed when the content did
+            content_hash = EmbeddingStore.file_hash(img_path)
+            if entry is not None and entry.content_hash == content_hash:
+                self.store.touch(name, stat.st_mtime_ns, stat.st_size, persist=False)
+                touched = True
+                continue
+            img_read = cv2.imread(img_path)
+            embedding = self.embedder(img_read) if img_read is not None else None
+            if embedding is not None:
+                entries.append(EmbeddingEntry(name, content_hash, stat.st_mtime_ns, stat.st_size))
+                embeddings.append(np.asarray(embedding, dtype=np.float32).ravel())
+                embedded += 1
+            # the index is written once per batch, not once per face
+            if len(entries) >= SYNC_BATCH_SIZE:
+                self.store.add_many(entries, np.stack(embeddings))
+                entries, embeddings, touched = [], [], False
+        if entries:
+            self.store.add_many(entries, np.stack(embeddings))
+        elif touched:
+            self.store.flush()
+        return embedded
+
+    def distances(self, probe_embedding: np.ndarray) -> np.ndarray:
+        return embedding_distances(probe_embedding, self.store.matrix, self.metric, self.store.norms)
+
+    def paired_distances(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """Row-wise distance between two matrices of the same shape"""
+        if self.metric == 'euclidean':
+            return np.linalg.norm(a - b, axis=1)
+        a = a / np.maximum(np.linalg.norm(a, axis=1), 1e-12)[:, None]
+        b = b / np.maximum(np.linalg.norm(b, axis=1), 1e-12)[:, None]
+        if self.metric == 'cosine':
+            return 1.0 - np.einsum('ij,ij->i', a, b)
+        return np.linalg.norm(a - b, axis=1)
+
+    def to_chord(self, distances: np.ndarray) -> np.ndarray:
+        # cosine distance breaks the triangle inequality; the chord between unit vectors,
+        # sqrt(2 * d), does not (euclidean and euclidean_l2 are metrics already)
+        if self.metric == 'cosine':
+            return np.sqrt(2.0 * np.maximum(distances, 0.0))
+        return distances
+
+    def from_chord(self, chords: np.ndarray) -> np.ndarray:
+        if self.metric == 'cosine':
+            return chords ** 2 / 2.0
+        return chords
+
+    def update_users(self):
+        """Groups templates by user and computes each user's centroid and spread"""
+        state = (self.store.generation, len(self.store))
+        if state == self.users_state:
+            return
+        names, matrix = self.store.names, self.store.matrix
+        users: List[str] = []
+        positions: Dict[str, int] = {}
+        user_ids = np.empty(len(names), dtype=np.int64)
+        for row, name in enumerate(names):
+            user = template_user(name)
+            user_ids[row] = positions.setdefault(user, len(users))
+            if user_ids[row] == len(users):
+                users.append(user)
+
+        self.users, self.user_positions = users, positions
+        self.template_counts = np.bincount(user_ids, minlength=len(users))
+        self.template_offsets = np.concatenate([[0], np.cumsum(self.template_counts)])
+        if len(users) == len(names):
+            # one template per user: the templates are the centroids
+            self.template_rows = np.arange(len(names))
+            self.centroids, self.centroid_norms = matrix, self.store.norms
+            self.spreads = np.zeros(len(users), dtype=np.float32)
+        else:
+            self.template_rows = np.argsort(user_ids, kind='stable')
+            templates = np.asarray(matrix[self.template_rows], dtype=np.float32)
+            if self.metric in ('cosine', 'euclidean_l2'):
+                templates /= np.maximum(np.linalg.norm(templates, axis=1), 1e-12)[:, None]
+            starts = self.template_offsets[:-1]
+            self.centroids = np.add.reduceat(templates, starts, axis=0) / self.template_counts[:, None]
+            self.centroids = self.centroids.astype(np.float32)
+            self.centroid_norms = np.linalg.norm(self.centroids, axis=1).astype(np.float32)
+            # spread: chord distance from the centroid to the user's farthest template
+            own_centroids = np.repeat(self.centroids, self.template_counts, axis=0)
+            self.spreads = np.maximum.reduceat(self.to_chord(self.paired_distances(templates, own_centroids)),
+                                               starts).astype(np.float32)
+        self.users_state = state
+
+    def template_distances(self, probe_embedding: np.ndarray, user_row: int) -> np.ndarray:
+        start, end = self.template_offsets[user_row], self.template_offsets[user_row + 1]
+        rows = np.sort(self.template_rows[start:end])
+        return embedding_distances(probe_embedding, self.store.matrix[rows], self.metric, self.store.norms[rows])
+
+    def search(self, probe_embedding: np.ndarray, k: int = PROCESSING_CONFIG.INDEX_TOP_K,
+               threshold: Optional[float] = None) -> List[Tuple[str, float]]:
+        """Top-k enrolled users closest to the probe, best first"""
+        threshold = self.threshold if threshold is None else threshold
+        probe_embedding = np.asarray(probe_embedding, dtype=np.float32).ravel()
+        self.update_users()
+        if len(self.users) < PROCESSING_CONFIG.INDEX_ANN_MIN_SIZE:
+            distances = embedding_distances(probe_embedding, self.centroids, self.metric, self.centroid_norms)
+            rows = top_k(distances, k)
+            distances = distances[rows]
+        else:
+            self.update_index()
+            rows, distances = self.index.search(probe_embedding, k)
+        return self.resolve_ambiguous(probe_embedding, np.asarray(rows), np.asarray(distances, dtype=np.float32),
+                                      threshold)
+
+    def resolve_ambiguous(self, probe_embedding: np.ndarray, rows: np.ndarray, distances: np.ndarray,
+                          threshold: float) -> List[Tuple[str, float]]:
+        """
+        A template lies within its user's spread of the centroid, so by the triangle inequality
+        (in chord distance, see to_chord) the centroid distance ± spread bounds every template
+        distance. Users whose bounds straddle the threshold, or overlap the best candidate's,
+        are scored by their closest template instead.
+        """
+        self.templates_consulted = 0
+        if len(rows) == 0:
+            return []
+        spreads = self.spreads[rows]
+        chords = self.to_chord(distances)
+        lower, upper = self.from_chord(np.maximum(chords - spreads, 0.0)), self.from_chord(chords + spreads)
+        best = int(np.argmin(distances))
+        overlaps_best = lower < upper[best]
+        overlaps_best[best] = bool(np.delete(overlaps_best, best).any())
+        ambiguous = (spreads > 0) & (((lower < threshold) & (upper >= threshold)) | overlaps_best)
+
+        resolved = distances.astype(float)
+        for i in np.flatnonzero(ambiguous):
+            resolved[i] = float(self.template_distances(probe_embedding, int(rows[i])).min())
+            self.templates_consulted += 1
+        order = np.argsort(resolved, kind='stable')
+        return [(self.users[rows[i]], float(resolved[i])) for i in order]
+
+    def match(self, probe_embedding: np.ndarray) -> Tuple[str, float]:
+        candidates = self.search(probe_embedding, 1)
+        if not candidates:
+            return '', float('inf')
+        return candidates[0]
+
+    def fuse(self, embeddings: List[np.ndarray], weights: Optional[List[float]] = None) -> np.ndarray:
+        """One probe from several frames: weighted mean, on unit vectors for angular metrics"""
+        stacked = np.stack([np.asarray(embedding, dtype=np.float32).ravel() for embedding in embeddings])
+        if self.metric in ('cosine', 'euclidean_l2'):
+            stacked /= np.maximum(np.linalg.norm(stacked, axis=1), 1e-12)[:, None]
+        weights = np.ones(len(stacked), dtype=np.float32) if weights is None else np.asarray(weights, np.float32)
+        return (weights[:, None] * stacked).sum(axis=0) / max(float(weights.sum()), 1e-12)
+
+    def frame_distances(self, user: str, embeddings: List[np.ndarray]) -> List[float]:
+        """Distance from each per-frame embedding to one user's centroid (diagnostics)"""
+        self.update_users()
+        row = self.user_positions.get(user)
+        if row is None or not embeddings:
+            return []
+        stacked = np.stack([np.asarray(embedding, dtype=np.float32).ravel() for embedding in embeddings])
+        return embedding_distances(self.centroids[row], stacked, self.metric).astype(float).tolist()
+
+    def update_index(self):
+        # the index holds one centroid per user: new users are added to it, any other change
+        # (including a new template for an enrolled user, which moves its centroid) rebuilds it
+        self.update_users()
+        generation, count = self.store.generation, len(self.users)
+        indexed_generation, indexed_count = self.index_state
+        if (generation, count) == self.index_state and self.indexed_templates == len(self.store):
+            return
+        appended = (generation == indexed_generation and count > indexed_count and
+                    np.array_equal(self.template_counts[:indexed_count], self.indexed_counts))
+        if appended:
+            self.index.add(self.centroids, self.centroid_norms)
+        else:
+            self.index.build(self.centroids, self.centroid_norms)
+        self.index_state = (generation, count)
+        self.indexed_templates = len(self.store)
+        self.indexed_counts = self.template_counts.copy()
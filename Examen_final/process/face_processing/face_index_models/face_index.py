@@ -0,0 +1,300 @@
+import time
+import numpy as np
+from typing import Dict, Optional, Tuple
+
+from process.config_modern import PROCESSING_CONFIG
+
+
+def embedding_distances(probe: np.ndarray, embeddings: np.ndarray, metric: str,
+                        norms: Optional[np.ndarray] = None) -> np.ndarray:
+    """Distances from one probe to every row of the gallery in a single vectorized pass"""
+    if len(embeddings) == 0:
+        return np.empty(0, dtype=np.float32)
+    probe = np.asarray(probe, dtype=np.float32)
+    if metric == 'cosine':
+        if norms is None:
+            norms = np.linalg.norm(embeddings, axis=1)
+        probe_norm = np.linalg.norm(probe)
+        similarity = (embeddings @ probe) / np.maximum(norms * probe_norm, 1e-12)
+        return 1.0 - similarity
+    if metric == 'euclidean_l2':
+        if norms is None:
+            norms = np.linalg.norm(embeddings, axis=1)
+        unit_embeddings = embeddings / np.maximum(norms, 1e-12)[:, None]
+        return np.linalg.norm(unit_embeddings - probe / max(np.linalg.norm(probe), 1e-12), axis=1)
+    if metric == 'euclidean':
+        return np.linalg.norm(embeddings - probe, axis=1)
+    raise ValueError(f'Métrica de distancia no soportada: {metric}')
+
+
+def top_k(distances: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the k smallest distances, sorted"""
+    k = min(k, len(distances))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    candidates = np.argpartition(distances, k - 1)[:k]
+    return candidates[np.argsort(distances[candidates], kind='stable')]
+
+
+def resident_bytes(array: np.ndarray) -> int:
+    """Bytes an array keeps in RAM: a view of an np.memmap lives in the page cache, not the heap"""
+    base = array
+    while base is not None:
+        if isinstance(base, np.memmap):
+            return 0
+        base = base.base if isinstance(base, np.ndarray) else None
+    return array.nbytes
+
+
+def _search_space(embeddings: np.ndarray, norms: np.ndarray, metric: str) -> np.ndarray:
+    # cosine and euclidean_l2 rank like plain L2 on unit vectors
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    if metric == 'euclidean':
+        return embeddings
+    return embeddings / np.maximum(norms, 1e-12)[:, None]
+
+
+def _squared_distances(data: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    return (np.einsum('ij,ij->i', data, data)[:, None] - 2.0 * data @ centroids.T
+            + np.einsum('ij,ij->i', centroids, centroids)[None, :])
+
+
+def _nearest_centroid(data: np.ndarray, centroids: np.ndarray, chunk: int = 8192) -> np.ndarray:
+    assign = np.empty(len(data), dtype=np.int32)
+    for start in range(0, len(data), chunk):
+        assign[start:start + chunk] = np.argmin(_squared_distances(data[start:start + chunk], centroids), axis=1)
+    return assign
+
+
+def _kmeans(data: np.ndarray, n_clusters: int, iterations: int, rng: np.random.Generator) -> np.ndarray:
+    centroids = data[rng.choice(len(data), n_clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assign = _nearest_centroid(data, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, data)
+        counts = np.bincount(assign, minlength=n_clusters)
+        filled = counts > 0
+        # empty clusters keep their previous centroid
+        centroids[filled] = sums[filled] / counts[filled, None]
+    return centroids
+
+
+class FaceIndexExact:
+    """Brute-force search over the whole gallery (reference backend)"""
+    name: str = 'exact'
+
+    def __init__(self, metric: str = 'cosine'):
+        self.metric = metric
+        self.embeddings = np.empty((0, 0), dtype=np.float32)
+        self.norms = np.empty(0, dtype=np.float32)
+
+    def build(self, embeddings: np.ndarray, norms: np.ndarray):
+        self.embeddings, self.norms = embeddings, norms
+
+    def add(self, embeddings: np.ndarray, norms: np.ndarray):
+        # the gallery hands over the whole matrix, so new rows are already visible
+        self.build(embeddings, norms)
+
+    def search(self, probe: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        distances = embedding_distances(probe, self.embeddings, self.metric, self.norms)
+        best = top_k(distances, k)
+        return best, distances[best]
+
+    def memory_bytes(self) -> int:
+        """RAM held by the index (a memmapped gallery matrix counts as 0)"""
+        return resident_bytes(self.embeddings) + self.norms.nbytes
+
+
+class FaceIndexIVF(FaceIndexExact):
+    """Inverted-file index: k-means coarse lists, only the closest n_probe lists are scanned"""
+    name: str = 'ivf'
+
+    def __init__(self, metric: str = 'cosine', n_lists: int = 0, n_probe: int = 8, seed: int = 0):
+        super().__init__(metric)
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.rng = np.random.default_rng(seed)
+        self.centroids = np.empty((0, 0), dtype=np.float32)
+        self.assign = np.empty(0, dtype=np.int32)
+        self.order = np.empty(0, dtype=np.int64)
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.trained_size: int = 0
+
+    def build(self, embeddings: np.ndarray, norms: np.ndarray):
+        super().build(embeddings, norms)
+        n = len(embeddings)
+        if n == 0:
+            return
+        n_lists = min(n, self.n_lists or max(1, int(np.sqrt(n))))
+        sample = self.rng.choice(n, min(n, max(n_lists * 32, 1000), 20000), replace=False)
+        sample.sort()
+        self.centroids = _kmeans(_search_space(embeddings[sample], norms[sample], self.metric), n_lists, 10, self.rng)
+        self.assign = self._assign(embeddings, norms)
+        self.trained_size = n
+        self._update_lists()
+
+    def add(self, embeddings: np.ndarray, norms: np.ndarray):
+        start = len(self.assign)
+        self.embeddings, self.norms = embeddings, norms
+        # retrain once the gallery doubled since the coarse lists were learnt
+        if self.trained_size == 0 or len(embeddings) > 2 * self.trained_size:
+            self.build(embeddings, norms)
+            return
+        self.assign = np.concatenate([self.assign, self._assign(embeddings[start:], norms[start:])])
+        self._update_lists()
+
+    def search(self, probe: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        if len(self.assign) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        query = _search_space(probe[None, :], np.linalg.norm(probe)[None], self.metric)
+        lists = top_k(_squared_distances(query, self.centroids)[0], self.n_probe)
+        candidates = np.sort(np.concatenate([self.order[self.offsets[l]:self.offsets[l + 1]] for l in lists]))
+        distances = embedding_distances(probe, self.embeddings[candidates], self.metric, self.norms[candidates])
+        best = top_k(distances, k)
+        return candidates[best], distances[best]
+
+    def _assign(self, embeddings: np.ndarray, norms: np.ndarray, chunk: int = 8192) -> np.ndarray:
+        assign = np.empty(len(embeddings), dtype=np.int32)
+        for start in range(0, len(embeddings), chunk):
+            rows = slice(start, start + chunk)
+            assign[rows] = _nearest_centroid(_search_space(embeddings[rows], norms[rows], self.metric), self.centroids)
+        return assign
+
+    def _update_lists(self):
+        self.order = np.argsort(self.assign, kind='stable')
+        self.offsets = np.searchsorted(self.assign[self.order], np.arange(len(self.centroids) + 1))
+
+    def memory_bytes(self) -> int:
+        return (super().memory_bytes() + self.centroids.nbytes + self.assign.nbytes + self.order.nbytes
+                + self.offsets.nbytes)
+
+
+class FaceIndexPQ(FaceIndexExact):
+    """
+    Product-quantized index: each embedding is stored as n_subvectors bytes and scored with
+    lookup tables; the best `rerank` candidates are re-scored exactly (0 disables re-ranking).
+
+    Re-ranking reads only the candidate rows of the matrix the index was built over and keeps
+    no copy of it: over a memmapped store those rows are paged in on demand and the index
+    itself holds just the codes. With rerank=0 it drops the float matrix altogether.
+    """
+    name: str = 'pq'
+
+    def __init__(self, metric: str = 'cosine', n_subvectors: int = 16, n_centroids: int = 256,
+                 rerank: int = 64, seed: int = 0):
+        super().__init__(metric)
+        self.n_subvectors = n_subvectors
+        self.n_centroids = n_centroids
+        self.rerank = rerank
+        self.rng = np.random.default_rng(seed)
+        self.codebooks = np.empty((0, 0, 0), dtype=np.float32)
+        self.codes = np.empty((0, 0), dtype=np.uint8)
+        self.trained_size: int = 0
+
+    def build(self, embeddings: np.ndarray, norms: np.ndarray):
+        self._keep_rows(embeddings, norms)
+        n, dim = embeddings.shape
+        if n == 0:
+            return
+        # largest number of subvectors that splits the embedding evenly
+        m = max(d for d in range(1, min(self.n_subvectors, dim) + 1) if dim % d == 0)
+        n_centroids = min(self.n_centroids, n)
+        sample = self.rng.choice(n, min(n, max(n_centroids * 40, 1000), 20000), replace=False)
+        sample.sort()
+        data = _search_space(embeddings[sample], norms[sample], self.metric).reshape(len(sample), m, dim // m)
+        self.codebooks = np.stack([_kmeans(np.ascontiguousarray(data[:, j]), n_centroids, 10, self.rng)
+                                   for j in range(m)])
+        self.codes = self._encode(embeddings, norms)
+        self.trained_size = n
+
+    def add(self, embeddings: np.ndarray, norms: np.ndarray):
+        start = len(self.codes)
+        self._keep_rows(embeddings, norms)
+        if self.trained_size == 0 or len(embeddings) > 2 * self.trained_size:
+            self.build(embeddings, norms)
+            return
+        self.codes = np.concatenate([self.codes, self._encode(embeddings[start:], norms[start:])])
+
+    def _keep_rows(self, embeddings: np.ndarray, norms: np.ndarray):
+        # a reference for re-ranking, never a copy; without re-ranking nothing is kept
+        if self.rerank > 0:
+            self.embeddings, self.norms = embeddings, norms
+        else:
+            self.embeddings = np.empty((0, embeddings.shape[1]), dtype=np.float32)
+            self.norms = np.empty(0, dtype=np.float32)
+
+    def search(self, probe: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        if len(self.codes) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        m, n_centroids, sub_dim = self.codebooks.shape
+        query = _search_space(probe[None, :], np.linalg.norm(probe)[None], self.metric).reshape(m, 1, sub_dim)
+        tables = ((self.codebooks - query) ** 2).sum(axis=2)
+        approx = np.zeros(len(self.codes), dtype=np.float32)
+        for j in range(m):
+            approx += tables[j][self.codes[:, j]]
+
+        if self.rerank <= 0:
+            best = top_k(approx, k)
+            return best, self._to_metric(approx[best])
+        candidates = np.sort(top_k(approx, max(k, self.rerank)))
+        distances = embedding_distances(probe, self.embeddings[candidates], self.metric, self.norms[candidates])
+        best = top_k(distances, k)
+        return candidates[best], distances[best]
+
+    def memory_bytes(self) -> int:
+        return super().memory_bytes() + self.codebooks.nbytes + self.codes.nbytes
+
+    def _encode(self, embeddings: np.ndarray, norms: np.ndarray, chunk: int = 8192) -> np.ndarray:
+        m, _, sub_dim = self.codebooks.shape
+        codes = np.empty((len(embeddings), m), dtype=np.uint8)
+        for start in range(0, len(embeddings), chunk):
+            rows = slice(start, start + chunk)
+            data = _search_space(embeddings[rows], norms[rows], self.metric).reshape(-1, m, sub_dim)
+            for j in range(m):
+                codes[rows, j] = _nearest_centroid(np.ascontiguousarray(data[:, j]), self.codebooks[j])
+        return codes
+
+    def _to_metric(self, squared: np.ndarray) -> np.ndarray:
+        # squared L2 on unit vectors is 2 * cosine distance
+        if self.metric == 'cosine':
+            return squared / 2.0
+        return np.sqrt(np.maximum(squared, 0.0))
+
+
+FACE_INDEX_BACKENDS = {
+    FaceIndexExact.name: FaceIndexExact,
+    FaceIndexIVF.name: FaceIndexIVF,
+    FaceIndexPQ.name: FaceIndexPQ,
+}
+
+
+def create_face_index(backend: str = PROCESSING_CONFIG.INDEX_BACKEND, metric: str = 'cosine') -> FaceIndexExact:
+    if backend == FaceIndexIVF.name:
+        return FaceIndexIVF(metric, PROCESSING_CONFIG.INDEX_IVF_LISTS, PROCESSING_CONFIG.INDEX_IVF_PROBES)
+    if backend == FaceIndexPQ.name:
+        return FaceIndexPQ(metric, PROCESSING_CONFIG.INDEX_PQ_SUBVECTORS, rerank=PROCESSING_CONFIG.INDEX_PQ_RERANK)
+    if backend == FaceIndexExact.name:
+        return FaceIndexExact(metric)
+    raise ValueError(f'Índice de galería no soportado: {backend} (opciones: {", ".join(FACE_INDEX_BACKENDS)})')
+
+
+def evaluate_face_index(index: FaceIndexExact, exact_index: FaceIndexExact, queries: np.ndarray,
+                        k: int = 5) -> Dict[str, float]:
+    """recall@1, recall@k, per-query latency and RAM footprint of an index against the exact backend"""
+    hits_1, hits_k, latencies = 0, 0, []
+    for probe in queries:
+        expected, _ = exact_index.search(probe, k)
+        start = time.perf_counter()
+        found, _ = index.search(probe, k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits_1 += int(len(found) > 0 and found[0] == expected[0])
+        hits_k += len(np.intersect1d(expected, found))
+    latencies = np.asarray(latencies)
+    return {
+        'recall@1': hits_1 / max(1, len(queries)),
+        f'recall@{k}': hits_k / max(1, len(queries) * min(k, len(exact_index.embeddings))),
+        'latency_mean_ms': float(latencies.mean()),
+        'latency_p50_ms': float(np.percentile(latencies, 50)),
+        'latency_p95_ms': float(np.percentile(latencies, 95)),
+        'memory_mb': index.memory_bytes() / 2**20,
+    }
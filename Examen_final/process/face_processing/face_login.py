@@ -2,21 +2,83 @@ import numpy as np
 
 from process.face_processing.face_utils import FaceUtils
 from process.database.config import DataBasePaths
+from process.database.user_store import UserStore
 from process.config_modern import PROCESSING_CONFIG
+from process.face_processing.matching_worker import MATCHING_POOL, MatchingCancelled
+from process.face_processing.frame_selector import FrameSelector
+from process.face_processing.stage_timer import STAGE_TIMERS
 
 
 class FaceLogIn:
     def __init__(self):
         self.face_utilities = FaceUtils()
         self.database = DataBasePaths()
+        self.user_store = UserStore(self.database.users_db)
 
         self.matcher = None
         self.comparison = False
-        self.cont_frame = 0
+        self.message = ''
+        self.frame_selector = FrameSelector()
+        self.matching_job = None
+        # diagnostics of the last comparison: fused probe and per-frame distances
+        self.fused_distance = float('inf')
+        self.frame_distances = []
+
+    def reset(self):
+        self.cancel()
+        self.face_utilities.detection_scheduler.reset()
+        self.matcher = None
+        self.comparison = False
+        self.message = ''
+        self.frame_selector.reset()
+
+    def cancel(self):
+        if self.matching_job is not None:
+            self.matching_job.cancel()
+            self.matching_job = None
+
+    def check_matching_job(self, face_image: np.ndarray):
+        job = self.matching_job
+        if not job.done():
+            return face_image, self.matcher, job.progress
+        self.matching_job = None
+
+        try:
+            result = job.result()
+        except MatchingCancelled:
+            # no decision: the selector looks for new frames
+            self.frame_selector.reset()
+            return face_image, self.matcher, 'Comparación cancelada'
+        except Exception as e:
+            print(f"❌ Error en la comparación facial: {e}")
+            return self.decide(face_image, False, 'Error al comparar rostro')
+
+        if result.empty_database:
+            self.frame_selector.reset()
+            return face_image, self.matcher, 'Base de datos vacía'
+
+        self.fused_distance, self.frame_distances = result.distance, result.frame_distances
+        if result.matched:
+            # step 10: save data & time
+            self.face_utilities.user_check_in(result.user_name, self.user_store)
+            return self.decide(face_image, True, 'Usuario verificado correctamente')
+        else:
+            return self.decide(face_image, False, 'Usuario no encontrado en la base de datos')
+
+    def decide(self, face_image: np.ndarray, matched: bool, message: str):
+        """Final result of the session: later frames keep reporting it"""
+        self.comparison = True
+        self.matcher = matched
+        self.message = message
+        return face_image, self.matcher, message
 
     def process(self, face_image: np.ndarray):
+        # step 0: matching job running in the worker pool, the preview keeps rendering
+        if self.matching_job is not None:
+            return self.check_matching_job(face_image)
+
         # step 1: check face detection
-        check_face_detect, face_info, face_save = self.face_utilities.check_face(face_image)
+        check_face_detect, face_info, frame_context = self.face_utilities.check_face(face_image)
         if check_face_detect is False:
             return face_image, self.matcher, 'No se detectó rostro'
 
@@ -26,43 +88,37 @@ class FaceLogIn:
             return face_image, self.matcher, 'No se detectó malla facial'
 
         # step 3: extract face mesh
-        face_mesh_points_list = self.face_utilities.extract_face_mesh(face_image, face_mesh_info)
+        face_mesh_points = self.face_utilities.extract_face_mesh(face_image, face_mesh_info)
 
         # step 4: check face center
-        check_face_center = self.face_utilities.check_face_center(face_mesh_points_list)
+        check_face_center = self.face_utilities.check_face_center(face_mesh_points)
 
         # step 5: show state
         self.face_utilities.show_state_login(face_image, state=self.matcher)
 
+        # a decision was already taken: no more frames are scored or compared
+        if self.comparison:
+            return face_image, self.matcher, self.message
+
         if check_face_center:
-            # step 6: extract face info
-            # bbox & key_points
-            self.cont_frame = self.cont_frame + 1
-            if self.cont_frame == PROCESSING_CONFIG.FRAME_COUNT_THRESHOLD:
-                face_bbox = self.face_utilities.extract_face_bbox(face_image, face_info)
-                face_points = self.face_utilities.extract_face_points(face_image, face_info)
-
-                # step 7: face crop
-                face_crop = self.face_utilities.face_crop(face_save, face_bbox)
-
-                # step 8: read database
-                faces_database, names_database, info = self.face_utilities.read_face_database(self.database.faces)
-
-                if len(faces_database) != 0 and not self.comparison and self.matcher is None:
-                    self.comparison = True
-                    # step 9: compare faces
-                    self.matcher, user_name = self.face_utilities.face_matching(face_crop, faces_database, names_database)
-
-                    if self.matcher:
-                        # step 10: save data & time
-                        self.face_utilities.user_check_in(user_name, self.database.users)
-                        return face_image, self.matcher, 'Usuario verificado correctamente'
-                    else:
-                        return face_image, self.matcher, 'Usuario no encontrado en la base de datos'
-                else:
-                    return face_image, self.matcher, 'Base de datos vacía'
-            else:
-                return face_image, self.matcher, 'Esperando frames'
+            # step 6: score the frame (sharpness, pose, size) and keep the best candidates
+            with STAGE_TIMERS.stage('select'):
+                quality = self.frame_selector.score(frame_context, face_mesh_points)
+            self.frame_selector.add(quality, frame_context, face_info)
+            if not self.frame_selector.ready():
+                return face_image, self.matcher, f'Buscando mejor imagen (calidad {quality.score:.2f})'
+
+            # step 7: face crops of the best frames, fused into one probe by the matcher
+            best_frames = self.frame_selector.best_frames()[:PROCESSING_CONFIG.FUSION_FRAMES]
+            self.frame_selector.triggered = True
+            face_crops = [self.face_utilities.candidate_crop(candidate.frame_context, candidate.face_info)
+                          for candidate in best_frames]
+            weights = [candidate.score for candidate in best_frames] if PROCESSING_CONFIG.FUSION_MODE == 'quality' else None
+            print(f'Mejores imágenes: {len(best_frames)} (calidad {", ".join(f"{c.score:.2f}" for c in best_frames)}) '
+                  f'tras {self.frame_selector.elapsed():.2f} s ({self.frame_selector.frames_scored} frames evaluados)')
+
+            # step 8 & 9: read database & compare faces off the UI thread
+            self.matching_job = MATCHING_POOL.submit(self.face_utilities, face_crops, self.database.faces, weights)
+            return face_image, self.matcher, self.matching_job.progress
         else:
             return face_image, self.matcher, 'Rostro no centrado'
-
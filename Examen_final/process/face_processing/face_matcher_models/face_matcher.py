@@ -1,11 +1,29 @@
 import face_recognition as fr
 from deepface import DeepFace
-from typing import Tuple
+from typing import List, Tuple, Optional
 import cv2
 import numpy as np
 
+from process.config_modern import PROCESSING_CONFIG
+
+
+def model_threshold(model_name: str, metric: str) -> float:
+    """Decision threshold for a model and metric: the configured one, or DeepFace's calibrated value"""
+    if PROCESSING_CONFIG.DISTANCE_THRESHOLD > 0:
+        return PROCESSING_CONFIG.DISTANCE_THRESHOLD
+    try:
+        from deepface.modules.verification import find_threshold
+        return float(find_threshold(model_name, metric))
+    except ImportError:
+        # deepface < 0.0.80
+        from deepface.commons import distance
+        return float(distance.findThreshold(model_name, metric))
+
 
 class FaceMatcherModels:
+    # metric used to compare the embeddings returned by face_embedding
+    distance_metric: str = 'cosine'
+
     def __init__(self):
         self.models = [
             "VGG-Face",
@@ -19,6 +37,59 @@ class FaceMatcherModels:
             "SFace",
             "GhostFaceNet",
         ]
+        # model used by face_embedding and the embedding store
+        self.embedding_model: str = PROCESSING_CONFIG.FACE_MODEL
+        # cosine distance spans 0..2 and impostors of each model sit at a different level
+        self.distance_threshold: float = model_threshold(self.embedding_model, self.distance_metric)
+        # batched forward pass: None until checked against DeepFace.represent, then True/False
+        self.batch_forward: Optional[bool] = None
+        self.batch_flip_channels: bool = False
+
+    def face_embedding(self, face: np.ndarray, model_name: Optional[str] = None) -> Optional[np.ndarray]:
+        # the face is already cropped by mediapipe, so deepface skips its own detector
+        try:
+            result = DeepFace.represent(img_path=face, model_name=model_name or self.embedding_model,
+                                        detector_backend=PROCESSING_CONFIG.EMBEDDING_DETECTOR,
+                                        enforce_detection=False)
+            return np.asarray(result[0]['embedding'], dtype=np.float32)
+        except:
+            return None
+
+    def face_embeddings(self, faces: List[np.ndarray]) -> List[Optional[np.ndarray]]:
+        """Several faces with one forward pass of the model, falling back to one represent call per face"""
+        if len(faces) > 1 and self.batch_forward is not False:
+            try:
+                if self.batch_forward is None:
+                    self.check_batch_forward(faces[0])
+                if self.batch_forward:
+                    return list(self.forward_batch(faces, self.batch_flip_channels))
+            except Exception as e:
+                self.batch_forward = False
+                print(f"⚠️ Embeddings por lote no disponibles, se calculan uno a uno: {e}")
+        return [self.face_embedding(face) for face in faces]
+
+    def forward_batch(self, faces: List[np.ndarray], flip_channels: bool) -> np.ndarray:
+        from deepface.modules import modeling, preprocessing
+        model = modeling.build_model(self.embedding_model)
+        target_size = (model.input_shape[1], model.input_shape[0])
+        batch = np.concatenate([
+            preprocessing.normalize_input(preprocessing.resize_image(face[:, :, ::-1] if flip_channels else face,
+                                                                      target_size))
+            for face in faces])
+        return np.asarray(model.model(batch, training=False), dtype=np.float32)
+
+    def check_batch_forward(self, face: np.ndarray):
+        # the batched path is only trusted if it reproduces the embeddings already stored
+        reference = self.face_embedding(face)
+        self.batch_forward = False
+        if reference is None:
+            raise ValueError('represent no devolvió un embedding de referencia')
+        for flip_channels in (False, True):
+            embedding = self.forward_batch([face], flip_channels)[0]
+            if np.allclose(embedding, reference, rtol=1e-3, atol=1e-4):
+                self.batch_forward, self.batch_flip_channels = True, flip_channels
+                return
+        raise ValueError('el forward por lote no coincide con DeepFace.represent')
 
     def face_matching_face_recognition_model(self, face_1: np.ndarray, face_2: np.ndarray) -> Tuple[bool, float]:
         face_1 = cv2.cvtColor(face_1, cv2.COLOR_BGR2RGB)
@@ -1,21 +1,47 @@
 import cv2
 import numpy as np
 import mediapipe as mp
-from typing import Tuple
+from typing import List, Tuple, Optional
+
+from process.config_modern import PROCESSING_CONFIG
+from process.face_processing.model_registry import MODEL_REGISTRY
+from process.face_processing.face_mesh_models.face_mesh import landmarks_to_array
 
 
 class FaceMatcherModelsOpenCV:
+    # metric used to compare the embeddings returned by face_embedding
+    distance_metric: str = 'euclidean'
+
     def __init__(self):
-        self.mp_face_detection = mp.solutions.face_detection
         self.mp_face_mesh = mp.solutions.face_mesh
-        self.face_detection = self.mp_face_detection.FaceDetection(model_selection=0, min_detection_confidence=0.5)
-        self.face_mesh = self.mp_face_mesh.FaceMesh(static_image_mode=True, max_num_faces=1, min_detection_confidence=0.5)
+        # static-image mesh shared through the model registry
+        self.face_mesh = MODEL_REGISTRY.get('face_mesh_static', lambda: self.mp_face_mesh.FaceMesh(
+            static_image_mode=True, max_num_faces=1, min_detection_confidence=0.5))
+        # model used by face_embedding and the embedding store
+        self.embedding_model: str = "OpenCV-Mesh"
+        # euclidean distance between landmark vectors, not calibrated by DeepFace
+        self.distance_threshold: float = PROCESSING_CONFIG.DISTANCE_THRESHOLD or 1.2
         
     def face_distance(self, face_encodings, face_to_compare):
         """Calculate distance between face encodings"""
         if len(face_encodings) == 0:
             return np.empty((0))
         return np.linalg.norm(face_encodings - face_to_compare, axis=1)
+
+    def face_embedding(self, face: np.ndarray, model_name: Optional[str] = None) -> Optional[np.ndarray]:
+        """Flattened face mesh landmarks used as a basic face embedding"""
+        try:
+            results = self.face_mesh.process(cv2.cvtColor(face, cv2.COLOR_BGR2RGB))
+            if not results.multi_face_landmarks:
+                return None
+            return landmarks_to_array(results.multi_face_landmarks[0]).ravel()
+        except Exception as e:
+            print(f"Error in face embedding: {e}")
+            return None
+
+    def face_embeddings(self, faces: List[np.ndarray]) -> List[Optional[np.ndarray]]:
+        """Several faces at once; the static mesh runs one image at a time"""
+        return [self.face_embedding(face) for face in faces]
     
     def face_recognition_opencv(self, known_image, unknown_image):
         """Basic face recognition using OpenCV and MediaPipe"""
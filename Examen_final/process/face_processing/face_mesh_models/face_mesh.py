@@ -1,21 +1,48 @@
 import numpy as np
 import mediapipe as mp
 import cv2
-from typing import Any, List, Tuple
+from typing import Any, List, Optional, Sequence, Tuple
+
+from process.face_processing.face_overlay import FaceOverlay
+
+# serialized NormalizedLandmark entry: field tag, length, then x, y, z as tagged float32
+LANDMARK_RECORD = np.dtype([('tag', 'u1'), ('length', 'u1'),
+                            ('x_tag', 'u1'), ('x', '<f4'), ('y_tag', 'u1'), ('y', '<f4'), ('z_tag', 'u1'), ('z', '<f4')])
+
+
+def landmarks_to_array(landmark_list: Any) -> np.ndarray:
+    """(n, 3) float32 array of a NormalizedLandmarkList, decoded in bulk from its wire format"""
+    data = landmark_list.SerializeToString()
+    count = len(landmark_list.landmark)
+    if count and len(data) == count * LANDMARK_RECORD.itemsize:
+        records = np.frombuffer(data, LANDMARK_RECORD)
+        if ((records['tag'] == 0x0a).all() and (records['length'] == 15).all() and (records['x_tag'] == 0x0d).all()
+                and (records['y_tag'] == 0x15).all() and (records['z_tag'] == 0x1d).all()):
+            return np.stack([records['x'], records['y'], records['z']], axis=1)
+    # other layouts (visibility/presence set, missing fields): one landmark at a time
+    return np.array([(point.x, point.y, point.z) for point in landmark_list.landmark], dtype=np.float32).reshape(-1, 3)
 
 
 class FaceMeshMediapipe:
+    # landmarks used by check_face_center: right parietal, left parietal, right eyebrow, left eyebrow
+    CENTER_LANDMARKS: Tuple[int, ...] = (139, 368, 70, 300)
+
     def __init__(self):
         # mediapipe
-        self.mp_draw = mp.solutions.drawing_utils
-        self.config_draw = self.mp_draw.DrawingSpec(color=(255, 0, 0), thickness=1, circle_radius=1)
-
         self.face_mesh_object = mp.solutions.face_mesh
         self.face_mesh_mp = self.face_mesh_object.FaceMesh(static_image_mode=False, max_num_faces=1,
                                                            refine_landmarks=False, min_detection_confidence=0.6,
                                                            min_tracking_confidence=0.6)
+        self.tessellation_edges = np.array(sorted(self.face_mesh_object.FACEMESH_TESSELATION), dtype=np.int32)
+        self.contour_edges = np.array(sorted(self.face_mesh_object.FACEMESH_CONTOURS), dtype=np.int32)
+        # preview overlay: mode, throttle and cached drawing styles
+        self.overlay = FaceOverlay(self.tessellation_edges, self.contour_edges)
 
-        self.mesh_points = None
+        # last mesh result: landmarks normalized to the full frame and their pixel view
+        self.mesh_info = None
+        self.mesh_transform = (0.0, 0.0, 1.0, 1.0)
+        self.mesh_points: Optional[np.ndarray] = None
+        self.mesh_pixels: Optional[np.ndarray] = None
         # face points
         # right parietal
         self.rp_x: int = 0
@@ -30,41 +57,94 @@ class FaceMeshMediapipe:
         self.le_x: int = 0
         self.le_y: int = 0
 
-    def face_mesh_mediapipe(self, face_image: np.ndarray) -> Tuple[bool, Any]:
-        rgb_image = face_image.copy()
-        rgb_image = cv2.cvtColor(rgb_image, cv2.COLOR_BGR2RGB)
+    def face_mesh_mediapipe(self, face_image: np.ndarray, rgb_image: Optional[np.ndarray] = None,
+                            roi: Optional[List[int]] = None) -> Tuple[bool, Any]:
+        # rgb_image: RGB view already computed for this frame (FrameContext)
+        if rgb_image is None:
+            rgb_image = cv2.cvtColor(face_image, cv2.COLOR_BGR2RGB)
+
+        # roi: [xi, yi, xf, yf] region of the tracked face in face_image pixels, the mesh only sees
+        # that crop (rgb_image may be a downscaled copy of face_image)
+        self.mesh_transform = (0.0, 0.0, 1.0, 1.0)
+        if roi is not None:
+            height, width = face_image.shape[:2]
+            rgb_height, rgb_width = rgb_image.shape[:2]
+            xi, xf = int(roi[0] * rgb_width / width), int(roi[2] * rgb_width / width)
+            yi, yf = int(roi[1] * rgb_height / height), int(roi[3] * rgb_height / height)
+            rgb_image = np.ascontiguousarray(rgb_image[yi:yf, xi:xf])
+            # landmarks are normalized to the crop: keep the mapping back to the full frame
+            self.mesh_transform = (xi / rgb_width, yi / rgb_height, (xf - xi) / rgb_width, (yf - yi) / rgb_height)
 
         face_mesh = self.face_mesh_mp.process(rgb_image)
+        self.mesh_info = face_mesh
+        self.mesh_points = None
+        self.mesh_pixels = None
+
         if face_mesh.multi_face_landmarks is None:
+            # no face: the overlay must not keep redrawing the previous one
+            self.overlay.clear()
             return False, face_mesh
+        return True, face_mesh
+
+    def face_mesh_landmarks(self, face_mesh_info: Any, indices: Optional[Sequence[int]] = None) -> np.ndarray:
+        """Landmarks of the first face as a float32 (n, 3) array normalized to the full frame"""
+        if face_mesh_info is self.mesh_info and self.mesh_points is not None:
+            return self.mesh_points if indices is None else self.mesh_points[list(indices)]
+
+        landmark_list = face_mesh_info.multi_face_landmarks[0]
+        if indices is None:
+            points = landmarks_to_array(landmark_list)
         else:
-            return True, face_mesh
+            # only the landmarks a check needs, without decoding the whole mesh
+            points = np.array([(landmark_list.landmark[i].x, landmark_list.landmark[i].y, landmark_list.landmark[i].z)
+                               for i in indices], dtype=np.float32).reshape(-1, 3)
 
-    def extract_face_mesh_points(self, face_image: np.ndarray, face_mesh_info: Any, viz: bool) -> List[List[int]]:
-        height, width, _ = face_image.shape
-        self.mesh_points = []
-        for face_mesh in face_mesh_info.multi_face_landmarks:
-            for i, points in enumerate(face_mesh.landmark):
-                x, y = int(points.x * width), int(points.y * height)
-                self.mesh_points.append([i, x, y])
+        if face_mesh_info is self.mesh_info:
+            offset_x, offset_y, scale_x, scale_y = self.mesh_transform
+            if (offset_x, offset_y, scale_x, scale_y) != (0.0, 0.0, 1.0, 1.0):
+                points[:, 0] = offset_x + points[:, 0] * scale_x
+                points[:, 1] = offset_y + points[:, 1] * scale_y
+            if indices is None:
+                self.mesh_points = points
+        return points
 
-            if viz:
-                self.mp_draw.draw_landmarks(face_image, face_mesh, self.face_mesh_object.FACEMESH_TESSELATION,
-                                            self.config_draw, self.config_draw)
+    def face_mesh_bbox(self, width: int, height: int, face_mesh_info: Any) -> List[int]:
+        # bbox in pixels enclosing the landmarks of the first face
+        points = self.face_mesh_landmarks(face_mesh_info)
+        (x_min, y_min), (x_max, y_max) = points[:, :2].min(axis=0), points[:, :2].max(axis=0)
+        xi, yi = max(0, int(x_min * width)), max(0, int(y_min * height))
+        xf, yf = min(width, int(x_max * width)), min(height, int(y_max * height))
+        return [xi, yi, xf, yf]
 
-        return self.mesh_points
+    def extract_face_mesh_points(self, face_image: np.ndarray, face_mesh_info: Any, viz: bool,
+                                 indices: Optional[Sequence[int]] = None) -> np.ndarray:
+        """Pixel view (n, 2) int32 of the landmarks; indices selects a subset (drawing always uses all)"""
+        height, width, _ = face_image.shape
+        draw = viz and self.overlay.render_frame()
+        points = self.face_mesh_landmarks(face_mesh_info, None if draw else indices)
+        pixels = (points[:, :2] * (width, height)).astype(np.int32)
+        if draw or indices is None:
+            self.mesh_pixels = pixels
+        if draw:
+            self.overlay.draw(face_image, pixels)
+            if indices is not None:
+                pixels = pixels[list(indices)]
+        elif viz:
+            # throttled frame: the last geometry is drawn again instead of recomputed
+            self.overlay.redraw(face_image)
+        return pixels
 
-    def check_face_center(self, face_points: List[List[int]]) -> bool:
+    def check_face_center(self, face_points: np.ndarray) -> bool:
+        # face_points: the full (468, 2) pixel view or only CENTER_LANDMARKS, in that order
+        face_points = np.asarray(face_points)
         if len(face_points) == 468:
-            self.rp_x, self.rp_y = face_points[139][1:]
-            self.lp_x, self.lp_y = face_points[368][1:]
-            self.re_x, self.re_y = face_points[70][1:]
-            self.le_x, self.le_y = face_points[300][1:]
+            face_points = face_points[list(self.CENTER_LANDMARKS)]
+        if len(face_points) != len(self.CENTER_LANDMARKS):
+            return False
 
-            if self.re_x > self.rp_x and self.le_x < self.lp_x:
-                return True
-            else:
-                return False
+        (self.rp_x, self.rp_y), (self.lp_x, self.lp_y), (self.re_x, self.re_y), (self.le_x, self.le_y) = \
+            face_points[:, -2:].tolist()
+        return self.re_x > self.rp_x and self.le_x < self.lp_x
 
     def config_color(self, color: Tuple[int, int, int]):
-        self.config_draw = self.mp_draw.DrawingSpec(color=color, thickness=1, circle_radius=1)
+        self.overlay.set_color(color)
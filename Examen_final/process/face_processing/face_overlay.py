@@ -0,0 +1,108 @@
+"""
+Superposición de la malla facial sobre la vista previa.
+
+Modos: "off" (nada), "bbox" (solo el recuadro del rostro), "contour" (contornos de ojos,
+cejas, labios y óvalo) y "full" (teselación completa). La geometría se recalcula en uno de
+cada OVERLAY_EVERY_N frames y en los demás se vuelve a dibujar la última calculada, así la
+superposición no parpadea; los estilos de dibujo se crean una vez por color.
+"""
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from process.config_modern import PROCESSING_CONFIG
+
+
+@dataclass(frozen=True)
+class DrawingStyle:
+    """Color y grosor de la superposición"""
+    color: Tuple[int, int, int]
+    thickness: int = 1
+
+
+class FaceOverlay:
+    OFF: str = 'off'
+    BBOX: str = 'bbox'
+    CONTOUR: str = 'contour'
+    FULL: str = 'full'
+    MODES = (OFF, BBOX, CONTOUR, FULL)
+
+    # estilos compartidos: uno por (color, grosor), no uno por frame
+    _styles: Dict[Tuple[Tuple[int, int, int], int], DrawingStyle] = {}
+
+    def __init__(self, tessellation_edges: np.ndarray, contour_edges: np.ndarray,
+                 mode: str = PROCESSING_CONFIG.OVERLAY_MODE, every_n: int = PROCESSING_CONFIG.OVERLAY_EVERY_N,
+                 thickness: int = 1):
+        self.tessellation_edges = tessellation_edges
+        self.contour_edges = contour_edges
+        self.thickness = thickness
+        self.style = self.get_style((255, 0, 0), thickness)
+        self.set_mode(mode)
+        self.every_n = max(1, every_n)
+        self.frame_count = 0
+        self.rendered_frames = 0
+        # geometry of the last rendered frame, redrawn on the frames in between
+        self.rectangle: Optional[Tuple[Tuple[int, int], Tuple[int, int]]] = None
+        self.segments: Optional[np.ndarray] = None
+        self.points: Optional[np.ndarray] = None
+
+    @classmethod
+    def get_style(cls, color: Tuple[int, int, int], thickness: int = 1) -> DrawingStyle:
+        key = (tuple(color), thickness)
+        style = cls._styles.get(key)
+        if style is None:
+            style = cls._styles[key] = DrawingStyle(key[0], thickness)
+        return style
+
+    def set_mode(self, mode: str):
+        if mode not in self.MODES:
+            raise ValueError(f'Modo de superposición no soportado: {mode} (opciones: {", ".join(self.MODES)})')
+        self.mode = mode
+        self.clear()
+
+    def clear(self):
+        """Olvida la última geometría (rostro perdido o cambio de modo)"""
+        self.rectangle, self.segments, self.points = None, None, None
+
+    def set_color(self, color: Tuple[int, int, int]):
+        self.style = self.get_style(color, self.thickness)
+
+    def render_frame(self) -> bool:
+        """Avanza el contador de frames; True si en este frame se recalcula la geometría"""
+        self.frame_count += 1
+        if self.mode == self.OFF or (self.frame_count - 1) % self.every_n:
+            return False
+        self.rendered_frames += 1
+        return True
+
+    def draw(self, face_image: np.ndarray, pixels: np.ndarray, bbox: Optional[list] = None):
+        """Calcula la geometría de este frame, la guarda y la dibuja"""
+        # pixels: (468, 2) int32 pixel view of the face mesh
+        self.clear()
+        if self.mode == self.BBOX:
+            if bbox is None:
+                (xi, yi), (xf, yf) = pixels.min(axis=0), pixels.max(axis=0)
+                bbox = [int(xi), int(yi), int(xf), int(yf)]
+            self.rectangle = ((int(bbox[0]), int(bbox[1])), (int(bbox[2]), int(bbox[3])))
+        elif self.mode == self.CONTOUR:
+            self.segments = pixels[self.contour_edges]
+        elif self.mode == self.FULL:
+            self.segments = pixels[self.tessellation_edges]
+            height, width = face_image.shape[:2]
+            inside = (pixels[:, 0] >= 0) & (pixels[:, 0] < width) & (pixels[:, 1] >= 0) & (pixels[:, 1] < height)
+            self.points = pixels[inside]
+        self.redraw(face_image)
+
+    def redraw(self, face_image: np.ndarray):
+        """Dibuja la última geometría calculada (frames salteados por el límite de frecuencia)"""
+        if self.mode == self.OFF:
+            return
+        color, thickness = self.style.color, self.style.thickness
+        if self.rectangle is not None:
+            cv2.rectangle(face_image, self.rectangle[0], self.rectangle[1], color, thickness)
+        if self.segments is not None:
+            cv2.polylines(face_image, self.segments, False, color, thickness)
+        if self.points is not None:
+            face_image[self.points[:, 1], self.points[:, 0]] = color
@@ -1,18 +1,52 @@
+import time
 import numpy as np
-from typing import Tuple
+from typing import Optional, Tuple
 
 from process.face_processing.face_utils import FaceUtils
+from process.face_processing.face_gallery import template_name
+from process.face_processing.frame_selector import FrameSelector
+from process.face_processing.stage_timer import STAGE_TIMERS
 from process.database.config import DataBasePaths
+from process.database.user_store import UserStore
+from process.config_modern import PROCESSING_CONFIG
 
 
 class FaceSignUp:
     def __init__(self):
         self.database = DataBasePaths()
+        self.user_store = UserStore(self.database.users_db)
         self.face_utilities = FaceUtils()
+        # the login quality gate decides which frames are good enough to become templates
+        self.frame_selector = FrameSelector()
+        self.reset()
+
+    def reset(self, user_code: str = ''):
+        self.user_code = user_code
+        self.templates_saved = 0
+        self.start_time: Optional[float] = None
+        self.last_saved = float('-inf')
+        self.frame_selector.reset()
+        self.face_utilities.detection_scheduler.reset()
+
+    def save_template(self, face_crop: np.ndarray, user_code: str) -> bool:
+        # the first template keeps the plain user code, the others get a suffix
+        if self.templates_saved == 0:
+            self.face_utilities.remove_face_templates(user_code, self.database.faces)
+            self.user_store.remove_templates(user_code)
+        name = template_name(user_code, self.templates_saved)
+        if not self.face_utilities.save_face(face_crop, name, self.database.faces):
+            return False
+        self.face_utilities.save_face_embedding(face_crop, name, self.database.faces)
+        self.user_store.add_templates([(name, user_code, f"{self.database.faces}/{name}.png")])
+        self.templates_saved += 1
+        return True
 
     def process(self, face_image: np.ndarray, user_code: str) -> Tuple[np.ndarray, bool, str]:
+        if user_code != self.user_code:
+            self.reset(user_code)
+
         # step 1: check face detection
-        check_face_detect, face_info, face_save = self.face_utilities.check_face(face_image)
+        check_face_detect, face_info, frame_context = self.face_utilities.check_face(face_image)
         if check_face_detect is False:
             return face_image, False, '¡No face detected!'
 
@@ -22,27 +56,36 @@ class FaceSignUp:
             return face_image, False, '¡No face mesh detected!'
 
         # step 3: extract face mesh
-        face_mesh_points_list = self.face_utilities.extract_face_mesh(face_image, face_mesh_info)
+        face_mesh_points = self.face_utilities.extract_face_mesh(face_image, face_mesh_info)
 
         # step 4: check face center
-        check_face_center = self.face_utilities.check_face_center(face_mesh_points_list)
+        check_face_center = self.face_utilities.check_face_center(face_mesh_points)
 
         # step 5: show state
         self.face_utilities.show_state_signup(face_image, state=check_face_center)
-        if check_face_center:
-            # step 6: extract face info
-            face_bbox = self.face_utilities.extract_face_bbox(face_image, face_info)
-            face_points = self.face_utilities.extract_face_points(face_image, face_info)
-
-            # step 7: face crop
-            face_crop = self.face_utilities.face_crop(face_save, face_bbox)
-
-            # step 8: save face
-            check_save_image = self.face_utilities.save_face(face_crop, user_code, self.database.faces)
-            return face_image, check_save_image, '¡Saved face!'
-
-        else:
+        if not check_face_center:
             return face_image, False, 'No face center!'
 
+        # step 6: quality gate; once the time budget is spent any centered frame is taken
+        now = time.perf_counter()
+        if self.start_time is None:
+            self.start_time = now
+        out_of_time = now - self.start_time >= PROCESSING_CONFIG.ENROLL_TIME_BUDGET
+        with STAGE_TIMERS.stage('select'):
+            quality = self.frame_selector.score(frame_context, face_mesh_points)
+        spaced = now - self.last_saved >= PROCESSING_CONFIG.ENROLL_TEMPLATE_INTERVAL
+        if spaced and (quality.accepted or (out_of_time and self.templates_saved == 0)):
+            # step 7: face crop
+            face_crop = self.face_utilities.candidate_crop(frame_context, face_info)
 
+            # step 8 & 9: save face template & its embedding
+            if len(face_crop) != 0 and self.save_template(face_crop, user_code):
+                self.last_saved = now
+                print(f'Plantilla {self.templates_saved}/{PROCESSING_CONFIG.ENROLL_TEMPLATES} de {user_code} '
+                      f'(calidad {quality.score:.2f})')
 
+        if self.templates_saved >= PROCESSING_CONFIG.ENROLL_TEMPLATES or (out_of_time and self.templates_saved):
+            self.reset()
+            return face_image, True, '¡Saved face!'
+        return face_image, False, (f'Capturing templates {self.templates_saved}/{PROCESSING_CONFIG.ENROLL_TEMPLATES} '
+                                   f'(quality {quality.score:.2f})')
@@ -0,0 +1,125 @@
+"""
+Planificador detectar-y-seguir.
+
+La detección completa de MediaPipe corre solo cada FRAME_SKIP frames o cuando el
+seguimiento pierde confianza; entre detecciones el bbox se propaga desde los landmarks de
+la malla del frame anterior y la malla se ejecuta únicamente sobre esa región de interés.
+"""
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from process.config_modern import PROCESSING_CONFIG
+
+
+@dataclass
+class TrackedFace:
+    """Rostro propagado por seguimiento, usado en lugar del resultado del detector"""
+    bbox: List[int]
+    # resultado del detector si una etapa lo pidió en este frame (ver FaceUtils.detection_info)
+    detection: Optional[object] = None
+
+
+@dataclass
+class TrackingStats:
+    """Contadores observables de la política de detección"""
+    frames: int = 0
+    detections: int = 0
+    tracked_frames: int = 0
+    lost: int = 0
+    reasons: Counter = field(default_factory=Counter)
+
+    @property
+    def detection_ratio(self) -> float:
+        return self.detections / self.frames if self.frames else 0.0
+
+
+def bbox_iou(a: List[int], b: List[int]) -> float:
+    xi, yi = max(a[0], b[0]), max(a[1], b[1])
+    xf, yf = min(a[2], b[2]), min(a[3], b[3])
+    intersection = max(0, xf - xi) * max(0, yf - yi)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - intersection
+    return intersection / union if union > 0 else 0.0
+
+
+class DetectionScheduler:
+    """Decide en cada frame entre detección completa y seguimiento por malla"""
+
+    def __init__(self, detect_every: int = PROCESSING_CONFIG.FRAME_SKIP,
+                 min_confidence: float = PROCESSING_CONFIG.TRACKING_MIN_IOU,
+                 roi_margin: float = PROCESSING_CONFIG.TRACKING_ROI_MARGIN,
+                 enabled: bool = PROCESSING_CONFIG.TRACKING_ENABLED):
+        self.detect_every = max(1, detect_every)
+        self.min_confidence = min_confidence
+        self.roi_margin = roi_margin
+        self.enabled = enabled
+        self.stats = TrackingStats()
+        self.reset()
+
+    def reset(self):
+        self.bbox: Optional[List[int]] = None
+        self.confidence: float = 0.0
+        self.from_detection: bool = False
+        self.frames_since_detection: int = 0
+        self.last_decision: str = 'no_track'
+
+    @property
+    def tracking(self) -> bool:
+        return self.bbox is not None
+
+    def should_detect(self) -> bool:
+        """Decisión del frame actual; el motivo queda en last_decision y en stats.reasons"""
+        self.stats.frames += 1
+        if not self.enabled:
+            decision = 'disabled'
+        elif self.bbox is None:
+            decision = 'no_track'
+        elif self.frames_since_detection >= self.detect_every:
+            decision = 'interval'
+        elif self.confidence < self.min_confidence:
+            decision = 'low_confidence'
+        else:
+            decision = 'track'
+        self.last_decision = decision
+        self.stats.reasons[decision] += 1
+
+        if decision == 'track':
+            self.stats.tracked_frames += 1
+            self.frames_since_detection += 1
+            return False
+        self.stats.detections += 1
+        self.frames_since_detection = 0
+        return True
+
+    def on_detection(self, bbox: List[int]):
+        self.bbox = list(bbox)
+        self.confidence = 1.0
+        self.from_detection = True
+
+    def on_mesh(self, mesh_bbox: List[int]):
+        # confianza del seguimiento: solapamiento entre la malla nueva y la del frame anterior
+        # (el bbox del detector encuadra distinto que la malla, no se compara contra él)
+        if self.bbox is not None and not self.from_detection:
+            self.confidence = bbox_iou(self.bbox, mesh_bbox)
+        else:
+            self.confidence = 1.0
+        self.bbox = list(mesh_bbox)
+        self.from_detection = False
+
+    def on_lost(self):
+        if self.bbox is not None:
+            self.stats.lost += 1
+        self.bbox = None
+        self.confidence = 0.0
+        self.from_detection = False
+
+    def roi(self, width: int, height: int) -> Optional[List[int]]:
+        """Región de interés para la malla: el bbox seguido ampliado por roi_margin"""
+        if not self.enabled or self.bbox is None:
+            return None
+        xi, yi, xf, yf = self.bbox
+        margin_x, margin_y = int((xf - xi) * self.roi_margin), int((yf - yi) * self.roi_margin)
+        roi = [max(0, xi - margin_x), max(0, yi - margin_y), min(width, xf + margin_x), min(height, yf + margin_y)]
+        if roi[2] - roi[0] < 2 or roi[3] - roi[1] < 2:
+            return None
+        return roi
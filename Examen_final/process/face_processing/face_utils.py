@@ -1,33 +1,56 @@
 import os
 import numpy as np
 import cv2
-import datetime
-from typing import List, Tuple, Any
+from typing import List, Optional, Sequence, Tuple, Any, Union
 from process.face_processing.face_detect_models.face_detect import FaceDetectMediapipe
 from process.face_processing.face_mesh_models.face_mesh import FaceMeshMediapipe
-from process.config_modern import PROCESSING_CONFIG, FILE_CONFIG
+from process.face_processing.face_gallery import FaceGallery, TEMPLATE_SEPARATOR
+from process.face_processing.frame_context import FrameContext
+from process.face_processing.face_tracker import DetectionScheduler, TrackedFace
+from process.face_processing.stage_timer import STAGE_TIMERS
+from process.database.embedding_store import EmbeddingStore
+from process.database.config import DataBasePaths
+from process.database.user_store import UserStore
+from process.face_processing.model_registry import MODEL_REGISTRY
+from process.config_modern import PROCESSING_CONFIG
 from process.utils import FileUtils
-try:
-    from process.face_processing.face_matcher_models.face_matcher import FaceMatcherModels
-    print("✅ Usando modelos de IA completos (DeepFace, TensorFlow)")
-except ImportError:
-    from process.face_processing.face_matcher_models.face_matcher_opencv import FaceMatcherModelsOpenCV as FaceMatcherModels
+
+
+def create_face_matcher():
+    # deepface, tensorflow and face_recognition are imported on first use, not with this module
+    try:
+        from process.face_processing.face_matcher_models.face_matcher import FaceMatcherModels
+        print("✅ Usando modelos de IA completos (DeepFace, TensorFlow)")
+    except ImportError:
+        from process.face_processing.face_matcher_models.face_matcher_opencv import FaceMatcherModelsOpenCV as FaceMatcherModels
+    return FaceMatcherModels()
 
 
 class FaceUtils:
     def __init__(self):
+        # heavy models are shared by every FaceUtils in the process
         # face detect
-        self.face_detector = FaceDetectMediapipe()
+        self.face_detector = MODEL_REGISTRY.get('face_detector', FaceDetectMediapipe)
         # face mesh
-        self.mesh_detector = FaceMeshMediapipe()
+        self.mesh_detector = MODEL_REGISTRY.get('face_mesh', FaceMeshMediapipe)
         # face matcher
-        self.face_matcher = FaceMatcherModels()
+        self.face_matcher = MODEL_REGISTRY.get('face_matcher', create_face_matcher)
+        # gallery of enrolled face embeddings, persisted per matcher model
+        self.face_gallery = MODEL_REGISTRY.get('face_gallery', self.create_face_gallery)
+        self.embedding_store = self.face_gallery.store
+
+        # derived views of the frame being processed
+        self.frame_context: Optional[FrameContext] = None
+        # full detection every FRAME_SKIP frames, mesh tracking in between
+        self.detection_scheduler = DetectionScheduler()
 
         # variables
         self.angle = None
-        self.face_db = []
         self.face_names = []
+        self.candidates: List[Tuple[str, float]] = []
         self.distance: float = 0.0
+        # distance of each fused frame to the best candidate
+        self.frame_distances: List[float] = []
         self.matching: bool = False
         self.user_registered: bool = False
         # Nuevas variables para mejorar reconocimiento
@@ -35,41 +58,121 @@ class FaceUtils:
         self.successful_recognitions = []
         self.min_confidence_threshold = PROCESSING_CONFIG.CONFIDENCE_THRESHOLD
 
+    def create_face_gallery(self) -> FaceGallery:
+        store = EmbeddingStore(DataBasePaths().embeddings, self.face_matcher.embedding_model)
+        return FaceGallery(self.face_matcher.face_embedding, self.face_matcher.distance_metric, store,
+                           threshold=self.face_matcher.distance_threshold)
+
+    def get_frame_context(self, face_image: np.ndarray) -> FrameContext:
+        # one context per frame: every stage that sees the same array reuses its views
+        if self.frame_context is None or self.frame_context.bgr is not face_image:
+            self.frame_context = FrameContext(face_image)
+        return self.frame_context
+
+    def detection_image(self, face_image: Union[np.ndarray, FrameContext]) -> np.ndarray:
+        # RGB view detection and mesh run on: downscaled to PROCESSING_WIDTH when set.
+        # MediaPipe returns normalized coordinates, so bboxes and landmarks map back to full resolution
+        frame_context = face_image if isinstance(face_image, FrameContext) else self.get_frame_context(face_image)
+        if PROCESSING_CONFIG.PROCESSING_WIDTH > 0:
+            return frame_context.downscaled(PROCESSING_CONFIG.PROCESSING_WIDTH)[0]
+        return frame_context.rgb
+
     # detect
-    def check_face(self, face_image: np.ndarray) -> Tuple[bool, Any, np.ndarray]:
-        face_save = face_image.copy()
-        check_face, face_info = self.face_detector.face_detect_mediapipe(face_image)
-        return check_face, face_info, face_save
+    def check_face(self, face_image: np.ndarray) -> Tuple[bool, Any, FrameContext]:
+        # the context replaces the clean copy of the frame: crops come from its RGB view
+        frame_context = self.get_frame_context(face_image)
+        if not self.detection_scheduler.should_detect():
+            # tracked frame: the bbox comes from the previous face mesh
+            return True, TrackedFace(self.detection_scheduler.bbox), frame_context
+
+        with STAGE_TIMERS.stage('detect'):
+            check_face, face_info = self.face_detector.face_detect_mediapipe(face_image, self.detection_image(face_image))
+        if check_face:
+            h_img, w_img, _ = face_image.shape
+            self.detection_scheduler.on_detection(self.face_detector.extract_face_bbox_mediapipe(w_img, h_img, face_info))
+        else:
+            self.detection_scheduler.on_lost()
+        return check_face, face_info, frame_context
+
+    def detection_info(self, face_image: np.ndarray, face_info: Any) -> Any:
+        # crops and key points need the detector's framing: detect on demand on tracked frames
+        if isinstance(face_info, TrackedFace):
+            if face_info.detection is None:
+                with STAGE_TIMERS.stage('detect'):
+                    check_face, detection = self.face_detector.face_detect_mediapipe(
+                        face_image, self.detection_image(face_image))
+                face_info.detection = detection if check_face else False
+            return face_info.detection if face_info.detection is not False else None
+        return face_info
+
+    def candidate_crop(self, frame_context: FrameContext, face_info: Any) -> np.ndarray:
+        # crop of a buffered frame with the detector's framing, detecting now if that frame was tracked
+        if isinstance(face_info, TrackedFace) and face_info.detection is None:
+            with STAGE_TIMERS.stage('detect'):
+                check_face, detection = self.face_detector.face_detect_mediapipe(
+                    frame_context.bgr, self.detection_image(frame_context))
+            face_info.detection = detection if check_face else False
+        detection = face_info.detection if isinstance(face_info, TrackedFace) else face_info
+        if detection is False:
+            face_bbox = list(face_info.bbox)
+        else:
+            face_bbox = self.face_detector.extract_face_bbox_mediapipe(frame_context.width, frame_context.height, detection)
+        return self.face_crop(frame_context, face_bbox)
 
     def extract_face_bbox(self, face_image: np.ndarray, face_info: Any):
+        detection = self.detection_info(face_image, face_info)
+        if detection is None:
+            return list(face_info.bbox)
         h_img, w_img, _ = face_image.shape
-        bbox = self.face_detector.extract_face_bbox_mediapipe(w_img, h_img, face_info)
+        bbox = self.face_detector.extract_face_bbox_mediapipe(w_img, h_img, detection)
         return bbox
 
     def extract_face_points(self, face_image: np.ndarray, face_info: Any):
+        detection = self.detection_info(face_image, face_info)
+        if detection is None:
+            return []
         h_img, w_img, _ = face_image.shape
-        face_points = self.face_detector.extract_face_points_mediapipe(h_img, w_img, face_info)
+        face_points = self.face_detector.extract_face_points_mediapipe(h_img, w_img, detection)
         return face_points
 
     # face mesh
     def face_mesh(self, face_image: np.ndarray) -> Tuple[bool, Any]:
-        check_face_mesh, face_mesh_info = self.mesh_detector.face_mesh_mediapipe(face_image)
+        h_img, w_img, _ = face_image.shape
+        roi = self.detection_scheduler.roi(w_img, h_img)
+        with STAGE_TIMERS.stage('mesh'):
+            check_face_mesh, face_mesh_info = self.mesh_detector.face_mesh_mediapipe(
+                face_image, self.detection_image(face_image), roi)
+        if check_face_mesh:
+            if self.detection_scheduler.enabled:
+                self.detection_scheduler.on_mesh(self.mesh_detector.face_mesh_bbox(w_img, h_img, face_mesh_info))
+        else:
+            self.detection_scheduler.on_lost()
         return check_face_mesh, face_mesh_info
 
-    def extract_face_mesh(self, face_image: np.ndarray, face_mesh_info: Any) -> List[List[int]]:
-        face_mesh_points_list = self.mesh_detector.extract_face_mesh_points(face_image, face_mesh_info, viz=True)
-        return face_mesh_points_list
+    def extract_face_mesh(self, face_image: np.ndarray, face_mesh_info: Any, viz: bool = True,
+                          landmarks: Optional[Sequence[int]] = None) -> np.ndarray:
+        # landmarks: only the points a check needs, e.g. mesh_detector.CENTER_LANDMARKS
+        with STAGE_TIMERS.stage('landmarks'):
+            face_mesh_points = self.mesh_detector.extract_face_mesh_points(face_image, face_mesh_info, viz, landmarks)
+        return face_mesh_points
 
-    def check_face_center(self, face_points: List[List[int]]) -> bool:
-        check_face_center = self.mesh_detector.check_face_center(face_points)
+    def check_face_center(self, face_points: np.ndarray) -> bool:
+        with STAGE_TIMERS.stage('center'):
+            check_face_center = self.mesh_detector.check_face_center(face_points)
         return check_face_center
 
     # crop
-    def face_crop(self, face_image: np.ndarray, face_bbox: List[int]) -> np.ndarray:
-        h, w, _ = face_image.shape
+    def face_crop(self, face_image: Union[np.ndarray, FrameContext], face_bbox: List[int]) -> np.ndarray:
+        if isinstance(face_image, FrameContext):
+            h, w = face_image.height, face_image.width
+        else:
+            h, w, _ = face_image.shape
         offset_x, offset_y = int(w * PROCESSING_CONFIG.CROP_OFFSET_X_RATIO), int(h * PROCESSING_CONFIG.CROP_OFFSET_Y_RATIO)
         xi, yi, xf, yf = face_bbox
         xi, yi, xf, yf = xi - offset_x, yi - (offset_y * PROCESSING_CONFIG.CROP_OFFSET_Y_MULTIPLIER), xf + offset_x, yf
+        if isinstance(face_image, FrameContext):
+            with STAGE_TIMERS.stage('crop'):
+                return face_image.crop_bgr(yi, yf, xi, xf)
         return face_image[yi:yf, xi:xf]
 
     # save
@@ -82,6 +185,22 @@ class FaceUtils:
         else:
             return False
 
+    def save_face_embedding(self, face_crop: np.ndarray, user_code: str, path: str) -> bool:
+        # embed the saved face now so login does not have to decode and embed it again
+        face_saved = cv2.cvtColor(face_crop, cv2.COLOR_BGR2RGB)
+        with STAGE_TIMERS.stage('embedding'):
+            return self.face_gallery.add_face_file(user_code, f"{path}/{user_code}.png", face_saved)
+
+    def remove_face_templates(self, user_code: str, path: str):
+        # a new enrollment replaces the extra templates of a previous one
+        for name in self.face_gallery.user_templates(user_code):
+            if name != user_code:
+                self.face_gallery.remove(name)
+        prefix = f'{user_code}{TEMPLATE_SEPARATOR}'
+        for file in FileUtils.get_valid_image_files(path):
+            if file.startswith(prefix):
+                os.remove(os.path.join(path, file))
+
     # draw
     def show_state_signup(self, face_image: np.ndarray, state: bool):
         # Renderizado de texto simplificado para registro
@@ -123,67 +242,48 @@ class FaceUtils:
         # Configurar color del mesh según el estado
         self.mesh_detector.config_color(color)
 
-    def read_face_database(self, database_path: str) -> Tuple[List[np.ndarray], List[str], str]:
-        self.face_db: List[np.ndarray] = []
-        self.face_names: List[str] = []
+    def read_face_database(self, database_path: str) -> Tuple[List[str], str]:
+        # only faces that are new or changed on disk get embedded
+        with STAGE_TIMERS.stage('db_read'):
+            self.face_gallery.sync(database_path)
+        self.face_names = list(self.face_gallery.names)
+        return self.face_names, f'Comparando {len(self.face_names)} rostros!'
 
-        # Usar utilidades para obtener archivos válidos
-        valid_files = FileUtils.get_valid_image_files(database_path)
-        
-        for file in valid_files:
-            img_path = os.path.join(database_path, file)
-            img_read = cv2.imread(img_path)
-            if img_read is not None:
-                self.face_db.append(img_read)
-                self.face_names.append(os.path.splitext(file)[0])
-
-        return self.face_db, self.face_names, f'Comparando {len(self.face_db)} rostros!'
-
-    def face_matching(self, current_face: np.ndarray, face_db: List[np.ndarray], name_db: List[str]) -> Tuple[bool, str]:
-        user_name: str = ''
-        current_face = cv2.cvtColor(current_face, cv2.COLOR_RGB2BGR)
-        
-        best_match = False
-        best_distance = float('inf')
-        best_user = ''
-        
-        for idx, face_img in enumerate(face_db):
-            # Realizar múltiples comparaciones para mayor precisión
-            distances = []
-            for attempt in range(PROCESSING_CONFIG.RECOGNITION_ATTEMPTS):
-                try:
-                    matching, distance = self.face_matcher.face_matching_deepface_model(current_face, face_img)
-                except:
-                    matching, distance = self.face_matcher.face_matching_sface_model(current_face, face_img)
-                distances.append(distance)
-            
-            # Usar la distancia promedio
-            avg_distance = sum(distances) / len(distances)
-            self.distance = avg_distance
-            
-            # Usar umbral configurado
-            self.matching = avg_distance < PROCESSING_CONFIG.DISTANCE_THRESHOLD
-            
-            print(f'Verificando rostro de: {name_db[idx]}')
-            print(f'Coincidencia: {self.matching} | Distancia: {self.distance:.4f} (promedio de {distances})')
-            
-            if self.matching and avg_distance < best_distance:
-                best_match = True
-                best_distance = avg_distance
-                best_user = name_db[idx]
-        
-        if best_match:
-            self.successful_recognitions.append(best_distance)
+    def face_matching(self, current_faces: Union[np.ndarray, List[np.ndarray]],
+                      weights: Optional[List[float]] = None) -> Tuple[bool, str]:
+        # one crop or several frames of the same face, fused into a single probe
+        if isinstance(current_faces, np.ndarray):
+            current_faces = [current_faces]
+
+        frame_embeddings, frame_weights = [], []
+        for i, current_face in enumerate(current_faces):
+            with STAGE_TIMERS.stage('embedding'):
+                embedding = self.face_matcher.face_embedding(cv2.cvtColor(current_face, cv2.COLOR_RGB2BGR))
+            if embedding is not None:
+                frame_embeddings.append(embedding)
+                frame_weights.append(1.0 if weights is None else weights[i])
+        self.frame_distances = []
+        if not frame_embeddings or len(self.face_gallery) == 0:
+            self.matching = False
+            return False, 'Rostro desconocido'
+
+        # the gallery is scored once, with the fused probe
+        with STAGE_TIMERS.stage('matching'):
+            probe_embedding = self.face_gallery.fuse(frame_embeddings, frame_weights)
+            self.candidates = self.face_gallery.search(probe_embedding, PROCESSING_CONFIG.INDEX_TOP_K)
+            best_user, self.distance = self.candidates[0]
+            self.frame_distances = self.face_gallery.frame_distances(best_user, frame_embeddings)
+        self.matching = self.distance < self.face_matcher.distance_threshold
+        print(f'Mejor coincidencia: {best_user} | Coincidencia: {self.matching} | Distancia: {self.distance:.4f} '
+              f'({len(frame_embeddings)} frames: {", ".join(f"{d:.4f}" for d in self.frame_distances)})')
+
+        if self.matching:
+            self.successful_recognitions.append(self.distance)
             return True, best_user
-            
+
         return False, 'Rostro desconocido'
 
-    def user_check_in(self, user_name: str, user_path: str):
+    def user_check_in(self, user_name: str, user_store: UserStore):
         if not self.user_registered:
-            now = datetime.datetime.now()
-            date_time = now.strftime(FILE_CONFIG.DATETIME_FORMAT)
-            user_file_path = os.path.join(user_path, f"{user_name}{FILE_CONFIG.USER_FILE_EXTENSION}")
-            with open(user_file_path, "a", encoding='utf-8') as user_file:
-                user_file.write(f'\n{FILE_CONFIG.LOG_SUCCESS_PREFIX}{date_time}\n')
-
+            user_store.check_in(user_name, success=True)
             self.user_registered = True
@@ -0,0 +1,65 @@
+"""
+Contexto por frame.
+
+Guarda el frame BGR de la cámara una sola vez y calcula de forma perezosa las vistas
+derivadas (RGB, escala de grises, reducida) que necesita cada etapa del pipeline, de modo
+que detector y malla reutilicen la misma conversión en lugar de copiar y convertir el
+frame cada uno. El contador de asignaciones permite medir cuántas imágenes se crean por
+frame.
+"""
+from typing import Dict, List, Tuple
+
+import cv2
+import numpy as np
+
+
+class FrameContext:
+    """Frame BGR y sus vistas derivadas, calculadas una vez por frame"""
+
+    def __init__(self, frame_bgr: np.ndarray):
+        self.bgr = frame_bgr
+        self.height, self.width = frame_bgr.shape[:2]
+        self._rgb = None
+        self._gray = None
+        self._downscaled: Dict[int, Tuple[np.ndarray, float]] = {}
+        # imágenes creadas a partir del frame (vistas de caché y recortes)
+        self.allocations: int = 0
+        self.allocated_views: List[str] = []
+
+    def _count(self, view: str):
+        self.allocations += 1
+        self.allocated_views.append(view)
+
+    @property
+    def rgb(self) -> np.ndarray:
+        # se calcula antes de dibujar sobre self.bgr, así también sirve como copia limpia
+        if self._rgb is None:
+            self._rgb = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2RGB)
+            self._count('rgb')
+        return self._rgb
+
+    @property
+    def gray(self) -> np.ndarray:
+        if self._gray is None:
+            self._gray = cv2.cvtColor(self.rgb, cv2.COLOR_RGB2GRAY)
+            self._count('gray')
+        return self._gray
+
+    def downscaled(self, max_width: int) -> Tuple[np.ndarray, float]:
+        """Vista RGB reducida a max_width de ancho y su factor de escala (reducida / original)"""
+        if self.width <= max_width:
+            return self.rgb, 1.0
+        if max_width not in self._downscaled:
+            scale = max_width / self.width
+            size = (max_width, max(1, int(round(self.height * scale))))
+            self._downscaled[max_width] = (cv2.resize(self.rgb, size, interpolation=cv2.INTER_AREA), scale)
+            self._count(f'downscaled_{max_width}')
+        return self._downscaled[max_width]
+
+    def crop_bgr(self, yi: int, yf: int, xi: int, xf: int) -> np.ndarray:
+        """Recorte BGR sin las anotaciones dibujadas sobre el frame"""
+        crop = self.rgb[yi:yf, xi:xf]
+        if crop.size == 0:
+            return crop
+        self._count('crop')
+        return cv2.cvtColor(crop, cv2.COLOR_RGB2BGR)
@@ -0,0 +1,164 @@
+"""
+Selección del mejor frame para la comparación.
+
+Cada frame centrado se puntúa con medidas baratas: nitidez (varianza del Laplaciano),
+giro y cabeceo estimados con los landmarks de la malla, y tamaño del rostro. Los K mejores
+quedan en un búfer pequeño y la comparación se dispara en cuanto llega un frame
+suficientemente bueno (o los FUSION_FRAMES que se van a fusionar) o se agota el tiempo de espera.
+"""
+import time
+import heapq
+import itertools
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from process.config_modern import PROCESSING_CONFIG
+
+# landmarks de la malla usados para la pose: punta de la nariz, bordes del rostro, frente y mentón
+NOSE_TIP, FACE_RIGHT, FACE_LEFT, FOREHEAD, CHIN = 1, 234, 454, 10, 152
+# posición vertical relativa de la punta de la nariz entre frente y mentón en un rostro frontal
+PITCH_NEUTRAL: float = 0.58
+# lado del recorte en escala de grises sobre el que se mide la nitidez (independiente del tamaño)
+SHARPNESS_SIZE: int = 112
+
+
+@dataclass
+class FrameQuality:
+    """Medidas de calidad de un frame; score en [0, 1], 0 si no pasa los umbrales"""
+    sharpness: float
+    yaw: float
+    pitch: float
+    face_size: int
+    score: float = 0.0
+
+    @property
+    def accepted(self) -> bool:
+        return self.score > 0.0
+
+
+@dataclass(order=True)
+class FrameCandidate:
+    """Frame candidato: se ordena por calidad, el resto de campos no participa"""
+    score: float
+    order: int
+    quality: FrameQuality = field(compare=False)
+    frame_context: Any = field(compare=False)
+    face_info: Any = field(compare=False)
+    timestamp: float = field(compare=False, default=0.0)
+
+
+def head_pose(face_points: np.ndarray) -> Tuple[float, float]:
+    """Giro y cabeceo aproximados en [-1, 1] (0 = frontal) a partir de la malla (468, 2)"""
+    nose_x, nose_y = face_points[NOSE_TIP]
+    right_x, left_x = face_points[FACE_RIGHT][0], face_points[FACE_LEFT][0]
+    top_y, bottom_y = face_points[FOREHEAD][1], face_points[CHIN][1]
+    width, height = max(1, left_x - right_x), max(1, bottom_y - top_y)
+    yaw = ((nose_x - right_x) / width - 0.5) * 2
+    pitch = ((nose_y - top_y) / height - PITCH_NEUTRAL) * 2
+    return float(yaw), float(pitch)
+
+
+def laplacian_variance(image_rgb: np.ndarray) -> float:
+    """Nitidez del recorte: varianza del Laplaciano a un tamaño fijo"""
+    if image_rgb.size == 0:
+        return 0.0
+    gray = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2GRAY)
+    gray = cv2.resize(gray, (SHARPNESS_SIZE, SHARPNESS_SIZE), interpolation=cv2.INTER_AREA)
+    return float(cv2.Laplacian(gray, cv2.CV_64F).var())
+
+
+class FrameSelector:
+    """Búfer de los K mejores frames y política de disparo de la comparación"""
+
+    def __init__(self, best_k: int = PROCESSING_CONFIG.SELECTOR_BEST_K,
+                 good_score: float = PROCESSING_CONFIG.SELECTOR_GOOD_SCORE,
+                 min_good_frames: int = PROCESSING_CONFIG.FUSION_FRAMES,
+                 time_budget: float = PROCESSING_CONFIG.SELECTOR_TIME_BUDGET,
+                 min_sharpness: float = PROCESSING_CONFIG.SELECTOR_MIN_SHARPNESS,
+                 sharpness_target: float = PROCESSING_CONFIG.SELECTOR_SHARPNESS_TARGET,
+                 max_yaw: float = PROCESSING_CONFIG.SELECTOR_MAX_YAW,
+                 max_pitch: float = PROCESSING_CONFIG.SELECTOR_MAX_PITCH,
+                 min_face_size: int = PROCESSING_CONFIG.SELECTOR_MIN_FACE_SIZE,
+                 face_size_target: int = PROCESSING_CONFIG.SELECTOR_FACE_SIZE_TARGET):
+        self.best_k = max(1, best_k)
+        self.good_score = good_score
+        # frames buenos que se esperan antes de disparar (los que luego se fusionan)
+        self.min_good_frames = max(1, min(min_good_frames, self.best_k))
+        self.time_budget = time_budget
+        self.min_sharpness = min_sharpness
+        self.sharpness_target = sharpness_target
+        self.max_yaw = max_yaw
+        self.max_pitch = max_pitch
+        self.min_face_size = min_face_size
+        self.face_size_target = face_size_target
+        self._order = itertools.count()
+        self.reset()
+
+    def reset(self):
+        self.candidates: List[FrameCandidate] = []
+        self.start_time: Optional[float] = None
+        self.triggered: bool = False
+        self.frames_scored: int = 0
+        self.frames_rejected: int = 0
+
+    def score(self, frame_context: Any, face_points: np.ndarray) -> FrameQuality:
+        """Calidad del rostro de face_points (malla en píxeles) dentro del frame"""
+        self.frames_scored += 1
+        (xi, yi), (xf, yf) = face_points.min(axis=0), face_points.max(axis=0)
+        face_size = int(xf - xi)
+        yaw, pitch = head_pose(face_points)
+        quality = FrameQuality(0.0, yaw, pitch, face_size)
+        # los umbrales baratos van primero: la nitidez solo se mide si la pose y el tamaño pasan
+        if face_size < self.min_face_size or abs(yaw) > self.max_yaw or abs(pitch) > self.max_pitch:
+            self.frames_rejected += 1
+            return quality
+
+        xi, yi = max(0, int(xi)), max(0, int(yi))
+        quality.sharpness = laplacian_variance(frame_context.rgb[yi:int(yf), xi:int(xf)])
+        if quality.sharpness < self.min_sharpness:
+            self.frames_rejected += 1
+            return quality
+
+        sharpness_score = min(1.0, quality.sharpness / self.sharpness_target)
+        pose_score = 1.0 - max(abs(yaw) / self.max_yaw, abs(pitch) / self.max_pitch)
+        size_score = min(1.0, face_size / self.face_size_target)
+        quality.score = max(1e-6, 0.5 * sharpness_score + 0.3 * pose_score + 0.2 * size_score)
+        return quality
+
+    def add(self, quality: FrameQuality, frame_context: Any, face_info: Any,
+            now: Optional[float] = None) -> bool:
+        """Guarda el frame si está entre los K mejores; True si fue aceptado"""
+        if not quality.accepted:
+            return False
+        now = time.perf_counter() if now is None else now
+        if self.start_time is None:
+            self.start_time = now
+        candidate = FrameCandidate(quality.score, next(self._order), quality, frame_context, face_info, now)
+        if len(self.candidates) < self.best_k:
+            heapq.heappush(self.candidates, candidate)
+        elif candidate > self.candidates[0]:
+            heapq.heapreplace(self.candidates, candidate)
+        return True
+
+    def ready(self, now: Optional[float] = None) -> bool:
+        """Suficientes frames buenos o tiempo agotado con al menos un candidato"""
+        if self.triggered or not self.candidates:
+            return False
+        now = time.perf_counter() if now is None else now
+        good_frames = sum(candidate.score >= self.good_score for candidate in self.candidates)
+        return good_frames >= self.min_good_frames or now - self.start_time >= self.time_budget
+
+    def best(self) -> FrameCandidate:
+        return max(self.candidates)
+
+    def best_frames(self) -> List[FrameCandidate]:
+        """Candidatos del búfer, del mejor al peor"""
+        return sorted(self.candidates, reverse=True)
+
+    def elapsed(self, now: Optional[float] = None) -> float:
+        if self.start_time is None:
+            return 0.0
+        return (time.perf_counter() if now is None else now) - self.start_time
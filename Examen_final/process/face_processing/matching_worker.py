@@ -0,0 +1,140 @@
+"""
+Comparación facial fuera del hilo de la interfaz.
+
+La comparación 1:N se envía como trabajo a un pool de hilos o de procesos y devuelve un
+MatchingJob con su futuro, el progreso actual y la posibilidad de cancelarlo.
+"""
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from process.config_modern import PROCESSING_CONFIG
+
+
+@dataclass
+class MatchingResult:
+    """Resultado de comparar un rostro contra la galería"""
+    matched: bool = False
+    user_name: str = ''
+    distance: float = float('inf')
+    candidates: List[Tuple[str, float]] = field(default_factory=list)
+    # distancia de cada frame fusionado al mejor candidato
+    frame_distances: List[float] = field(default_factory=list)
+    empty_database: bool = False
+
+
+class MatchingCancelled(Exception):
+    pass
+
+
+def run_matching_job(face_utils, face_crops: Union[np.ndarray, List[np.ndarray]], faces_path: str,
+                     cancel_event: Optional[threading.Event] = None,
+                     report: Callable[[str], None] = lambda message: None,
+                     weights: Optional[List[float]] = None) -> MatchingResult:
+    """Pasos 8 y 9 de FaceLogIn: leer la galería y comparar el rostro (uno o varios frames fusionados)"""
+    def check_cancel():
+        if cancel_event is not None and cancel_event.is_set():
+            raise MatchingCancelled()
+
+    report('Actualizando galería de rostros...')
+    names_database, info = face_utils.read_face_database(faces_path)
+    if len(names_database) == 0:
+        return MatchingResult(empty_database=True)
+    check_cancel()
+
+    report(info)
+    matched, user_name = face_utils.face_matching(face_crops, weights)
+    check_cancel()
+    return MatchingResult(matched, user_name, face_utils.distance, list(face_utils.candidates),
+                          list(face_utils.frame_distances))
+
+
+# FaceUtils propio de cada proceso del pool (modo "process")
+_WORKER_FACE_UTILS = None
+
+
+def _process_worker_init():
+    global _WORKER_FACE_UTILS
+    from process.face_processing.face_utils import FaceUtils
+    _WORKER_FACE_UTILS = FaceUtils()
+
+
+def _process_worker_match(face_crops: Union[np.ndarray, List[np.ndarray]], faces_path: str,
+                          weights: Optional[List[float]] = None) -> MatchingResult:
+    return run_matching_job(_WORKER_FACE_UTILS, face_crops, faces_path, weights=weights)
+
+
+class MatchingJob:
+    """Trabajo de comparación en curso: futuro, progreso y cancelación"""
+
+    def __init__(self):
+        self.future: Optional[Future] = None
+        self.progress: str = 'En cola para comparación...'
+        self.cancel_event = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def report(self, message: str):
+        self.progress = message
+
+    def done(self) -> bool:
+        return self.cancelled or self.future.done()
+
+    def cancel(self):
+        # en el pool de procesos un trabajo ya iniciado termina, pero su resultado se descarta
+        self.cancel_event.set()
+        self.future.cancel()
+
+    def result(self) -> MatchingResult:
+        if self.cancelled:
+            raise MatchingCancelled()
+        return self.future.result()
+
+
+class MatchingWorkerPool:
+    """Pool de comparación seleccionable: "thread" (modelos compartidos) o "process" (modelos por proceso)"""
+
+    def __init__(self, mode: str = PROCESSING_CONFIG.MATCHING_WORKER_MODE,
+                 max_workers: int = PROCESSING_CONFIG.MATCHING_WORKERS):
+        if mode not in ('thread', 'process'):
+            raise ValueError(f'Modo de pool no soportado: {mode} (opciones: thread, process)')
+        self.mode = mode
+        self.max_workers = max_workers
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.mode == 'process':
+                    self._executor = ProcessPoolExecutor(self.max_workers, initializer=_process_worker_init)
+                else:
+                    self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix='face-matching')
+            return self._executor
+
+    def submit(self, face_utils, face_crops: Union[np.ndarray, List[np.ndarray]], faces_path: str,
+               weights: Optional[List[float]] = None) -> MatchingJob:
+        job = MatchingJob()
+        if self.mode == 'process':
+            job.future = self.executor.submit(_process_worker_match, face_crops, faces_path, weights)
+            job.report('Comparando rostro en proceso de trabajo...')
+        else:
+            job.future = self.executor.submit(run_matching_job, face_utils, face_crops, faces_path,
+                                              job.cancel_event, job.report, weights)
+        return job
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+# Instancia global para uso en el sistema
+MATCHING_POOL = MatchingWorkerPool()
@@ -0,0 +1,102 @@
+"""
+Agrupación de pedidos concurrentes en lotes.
+
+Cada pedido entra a una cola y recibe un futuro. Un hilo toma el primero que llega, espera
+como mucho `max_wait` segundos a que se sumen otros (hasta `max_batch_size`) y procesa el
+lote con una sola llamada, repartiendo luego los resultados a sus futuros.
+"""
+import time
+import queue
+import threading
+from collections import Counter
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional
+
+
+@dataclass
+class BatchStats:
+    """Contadores de los lotes procesados"""
+    batches: int = 0
+    items: int = 0
+    errors: int = 0
+    sizes: Counter = field(default_factory=Counter)
+    last_batch_ms: float = 0.0
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.items / self.batches if self.batches else 0.0
+
+
+class MicroBatcher:
+    """Procesa los pedidos en lotes de hasta max_batch_size esperando como mucho max_wait segundos"""
+
+    def __init__(self, process_batch: Callable[[List[Any]], List[Any]], max_batch_size: int = 8,
+                 max_wait: float = 0.005, name: str = 'micro-batcher'):
+        self.process_batch = process_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait)
+        self.name = name
+        self.stats = BatchStats()
+        self._queue: 'queue.Queue[Optional[tuple]]' = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> 'MicroBatcher':
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def submit(self, item: Any) -> Future:
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def _collect(self, first: tuple) -> List[tuple]:
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is None:
+                # stop after this batch
+                self._queue.put(None)
+                break
+            batch.append(request)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [request for request in self._collect(first) if request[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            start = time.perf_counter()
+            try:
+                outputs = self.process_batch([item for item, _ in batch])
+                if len(outputs) != len(batch):
+                    raise RuntimeError(f'El lote devolvió {len(outputs)} resultados para {len(batch)} pedidos')
+            except Exception as e:
+                self.stats.errors += 1
+                for _, future in batch:
+                    future.set_exception(e)
+            else:
+                for (_, future), output in zip(batch, outputs):
+                    future.set_result(output)
+
+            self.stats.last_batch_ms = (time.perf_counter() - start) * 1000
+            self.stats.batches += 1
+            self.stats.items += len(batch)
+            self.stats.sizes[len(batch)] += 1
@@ -0,0 +1,92 @@
+"""
+Registro de modelos compartido por todo el proceso.
+
+Los modelos pesados (MediaPipe, DeepFace, galería de embeddings) se crean una sola vez,
+de forma perezosa y segura entre hilos, y se entregan como instancias compartidas a
+FaceSignUp, FaceLogIn y a cualquier otro consumidor.
+"""
+import os
+import sys
+import time
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+
+def resident_memory_mb() -> float:
+    """Memoria residente (RSS) actual del proceso en MB, 0.0 si no se puede medir"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm', 'r') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        # ru_maxrss es el pico, en KB en Linux y en bytes en macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    except ImportError:
+        return 0.0
+
+
+@dataclass
+class ModelStats:
+    """Costo de carga de un modelo del registro"""
+    name: str
+    load_time_s: float
+    memory_mb: float
+
+
+class ModelRegistry:
+    """Crea cada modelo una vez por proceso y entrega la misma instancia a todos"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._model_locks: Dict[str, threading.Lock] = {}
+        self._models: Dict[str, Any] = {}
+        self.stats: Dict[str, ModelStats] = {}
+
+    def get(self, name: str, factory: Callable[[], Any]) -> Any:
+        model = self._models.get(name)
+        if model is not None:
+            return model
+
+        # un lock por modelo: cargar uno no bloquea a quien pide otro ya cargado
+        with self._lock:
+            model_lock = self._model_locks.setdefault(name, threading.Lock())
+        with model_lock:
+            model = self._models.get(name)
+            if model is None:
+                memory_before = resident_memory_mb()
+                start = time.perf_counter()
+                model = factory()
+                stats = ModelStats(name, time.perf_counter() - start, resident_memory_mb() - memory_before)
+                self._models[name] = model
+                self.stats[name] = stats
+                print(f"🧠 Modelo cargado: {name} en {stats.load_time_s:.2f} s (+{stats.memory_mb:.1f} MB)")
+        return model
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._models
+
+    def peek(self, name: str) -> Optional[Any]:
+        """Instancia ya cargada o None, sin crearla"""
+        return self._models.get(name)
+
+    def report(self) -> List[ModelStats]:
+        return list(self.stats.values())
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+            self._model_locks.clear()
+            self.stats.clear()
+
+
+# Instancia global para uso en el sistema
+MODEL_REGISTRY = ModelRegistry()
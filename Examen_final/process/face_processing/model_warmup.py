@@ -0,0 +1,90 @@
+"""
+Precarga de modelos en segundo plano.
+
+Importa los backends de reconocimiento, construye los modelos del registro y ejecuta una
+inferencia de prueba por detector, malla y embedder, para que la primera verificación no
+pague la construcción y el trazado del grafo de TensorFlow en el hilo de la interfaz.
+"""
+import time
+import threading
+from typing import Optional
+
+
+class ModelWarmUp:
+    """Estado de precarga de los modelos: idle → loading → warm | failed"""
+
+    IDLE: str = 'idle'
+    LOADING: str = 'loading'
+    WARM: str = 'warm'
+    FAILED: str = 'failed'
+
+    STATE_TEXT = {
+        IDLE: '⏸️ Sin iniciar',
+        LOADING: '⏳ Cargando modelos...',
+        WARM: '✅ Modelos listos',
+        FAILED: '❌ Error al cargar modelos',
+    }
+
+    def __init__(self):
+        self.state: str = self.IDLE
+        self.error: str = ''
+        self.duration: float = 0.0
+        self._done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_warm(self) -> bool:
+        return self.state == self.WARM
+
+    @property
+    def is_done(self) -> bool:
+        return self._done.is_set()
+
+    @property
+    def state_text(self) -> str:
+        return self.STATE_TEXT[self.state]
+
+    def start(self):
+        """Inicia la precarga una sola vez; llamadas posteriores no hacen nada"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self.state = self.LOADING
+            self._thread = threading.Thread(target=self._run, name='model-warmup', daemon=True)
+            self._thread.start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Espera el fin de la precarga (no usar desde el hilo de la interfaz)"""
+        self._done.wait(timeout)
+        return self.is_warm
+
+    def _run(self):
+        start = time.perf_counter()
+        try:
+            # importar aquí mantiene TensorFlow/DeepFace fuera del hilo de la interfaz
+            import numpy as np
+            from process.face_processing.face_utils import FaceUtils
+            face_utils = FaceUtils()
+
+            dummy_frame = np.tile(np.linspace(0, 255, 640, dtype=np.uint8)[None, :, None], (480, 1, 3))
+            face_utils.check_face(dummy_frame)
+            face_utils.face_mesh(dummy_frame)
+            # face_embedding swallows backend errors and returns None: that is a failed warm-up too
+            embedding = face_utils.face_matcher.face_embedding(np.ascontiguousarray(dummy_frame[:224, :224]))
+            if embedding is None:
+                raise RuntimeError('el modelo de embeddings no devolvió un resultado')
+
+            self.state = self.WARM
+            print(f"🔥 Modelos precargados en {time.perf_counter() - start:.2f} s")
+        except Exception as e:
+            self.error = str(e)
+            self.state = self.FAILED
+            print(f"❌ Error al precargar modelos: {e}")
+        finally:
+            self.duration = time.perf_counter() - start
+            self._done.set()
+
+
+# Instancia global para uso en el sistema
+MODEL_WARMUP = ModelWarmUp()
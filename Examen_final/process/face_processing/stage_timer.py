@@ -0,0 +1,166 @@
+"""
+Medición de latencia por etapa del pipeline facial.
+
+Cada etapa (detección, malla, landmarks, centrado, recorte, lectura de la base, embedding y
+comparación) se mide con perf_counter y se acumula en una ventana deslizante de las últimas
+muestras, consultable desde el código (percentiles, media, histograma por rangos).
+
+Con STAGE_TRACE activo, cada sesión de cámara escribe además una traza en DIAGNOSTICS_DIR en el
+formato de eventos de Chrome (abre en chrome://tracing o ui.perfetto.dev), con una barra por
+etapa y por hilo.
+"""
+import os
+import json
+import time
+import threading
+from contextlib import nullcontext
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from process.config_modern import PROCESSING_CONFIG
+
+# etapas del pipeline, en el orden en que se muestran
+STAGES = ('detect', 'mesh', 'landmarks', 'center', 'select', 'crop', 'db_read', 'embedding', 'matching')
+# límites (ms) de los rangos del histograma
+BUCKET_EDGES_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+_DISABLED = nullcontext()
+
+
+class LatencyHistogram:
+    """Últimas `window` latencias de una etapa en ms (anillo preasignado) y totales desde el inicio"""
+
+    def __init__(self, window: int = PROCESSING_CONFIG.STAGE_WINDOW):
+        self.samples = np.zeros(max(1, window), dtype=np.float64)
+        self.count = 0
+        self.total_ms = 0.0
+        self.last_ms = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, elapsed_ms: float):
+        with self._lock:
+            self.samples[self.count % len(self.samples)] = elapsed_ms
+            self.count += 1
+            self.total_ms += elapsed_ms
+            self.last_ms = elapsed_ms
+
+    def values(self) -> np.ndarray:
+        with self._lock:
+            return self.samples[:min(self.count, len(self.samples))].copy()
+
+    def percentile(self, q: float) -> float:
+        values = self.values()
+        return float(np.percentile(values, q)) if values.size else 0.0
+
+    def buckets(self) -> Dict[str, int]:
+        """Muestras de la ventana por rango de latencia ("<=1", "<=2", ..., ">5000")"""
+        values = self.values()
+        counts = np.bincount(np.searchsorted(BUCKET_EDGES_MS, values), minlength=len(BUCKET_EDGES_MS) + 1)
+        labels = [f'<={edge}' for edge in BUCKET_EDGES_MS] + [f'>{BUCKET_EDGES_MS[-1]}']
+        return dict(zip(labels, counts.tolist()))
+
+    def summary(self) -> Dict[str, float]:
+        values = self.values()
+        if values.size == 0:
+            return {'count': self.count, 'mean_ms': 0.0, 'p50_ms': 0.0, 'p95_ms': 0.0, 'p99_ms': 0.0,
+                    'max_ms': 0.0, 'last_ms': 0.0}
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        return {'count': self.count, 'mean_ms': float(values.mean()), 'p50_ms': float(p50), 'p95_ms': float(p95),
+                'p99_ms': float(p99), 'max_ms': float(values.max()), 'last_ms': self.last_ms}
+
+
+class _Stage:
+    __slots__ = ('timers', 'name', 'start')
+
+    def __init__(self, timers: 'StageTimers', name: str):
+        self.timers = timers
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.timers.record(self.name, (time.perf_counter() - self.start) * 1000, self.start)
+        return False
+
+
+class StageTimers:
+    """Histogramas por etapa y traza opcional de la sesión de cámara en curso"""
+
+    def __init__(self, enabled: bool = PROCESSING_CONFIG.STAGE_TIMING, window: int = PROCESSING_CONFIG.STAGE_WINDOW,
+                 trace: bool = PROCESSING_CONFIG.STAGE_TRACE, trace_dir: str = PROCESSING_CONFIG.DIAGNOSTICS_DIR):
+        self.enabled = enabled
+        self.window = window
+        self.trace = trace
+        self.trace_dir = trace_dir
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.session: str = ''
+        self.trace_path: Optional[str] = None
+        self._trace_file = None
+        self._trace_origin = 0.0
+        self._lock = threading.Lock()
+
+    def stage(self, name: str):
+        """with STAGE_TIMERS.stage('detect'): ... (sin costo de medición si está desactivado)"""
+        return _Stage(self, name) if self.enabled else _DISABLED
+
+    def histogram(self, name: str) -> LatencyHistogram:
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(name, LatencyHistogram(self.window))
+        return histogram
+
+    def record(self, name: str, elapsed_ms: float, start: Optional[float] = None):
+        self.histogram(name).record(elapsed_ms)
+        if self._trace_file is not None:
+            self._write_event(name, elapsed_ms, time.perf_counter() - elapsed_ms / 1000 if start is None else start)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Resumen por etapa: primero las del pipeline, en orden, luego el resto"""
+        names = [name for name in STAGES if name in self.histograms]
+        names += sorted(name for name in self.histograms if name not in STAGES)
+        return {name: self.histograms[name].summary() for name in names}
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
+
+    # per-session trace
+    def start_session(self, session: str):
+        self.end_session()
+        self.session = session
+        if not (self.enabled and self.trace):
+            return
+        os.makedirs(self.trace_dir, exist_ok=True)
+        self.trace_path = os.path.join(self.trace_dir, f'trace_{session}_{time.strftime("%Y%m%d_%H%M%S")}.json')
+        with self._lock:
+            self._trace_file = open(self.trace_path, 'w', encoding='utf-8')
+            self._trace_file.write('[\n')
+            self._trace_origin = time.perf_counter()
+
+    def end_session(self) -> Optional[str]:
+        """Cierra la traza de la sesión; devuelve su ruta si había una"""
+        with self._lock:
+            trace_file, self._trace_file = self._trace_file, None
+            if trace_file is None:
+                return None
+            # metadata event closes the array (the format also tolerates a missing bracket)
+            trace_file.write(json.dumps({'name': 'process_name', 'ph': 'M', 'pid': os.getpid(),
+                                         'args': {'name': f'face pipeline ({self.session})'}}) + '\n]\n')
+            trace_file.close()
+        print(f"🧭 Traza de etapas guardada en {self.trace_path}")
+        return self.trace_path
+
+    def _write_event(self, name: str, elapsed_ms: float, start: float):
+        event = {'name': name, 'ph': 'X', 'pid': os.getpid(), 'tid': threading.get_ident(),
+                 'ts': round((start - self._trace_origin) * 1e6, 1), 'dur': round(elapsed_ms * 1000, 1)}
+        with self._lock:
+            if self._trace_file is not None:
+                self._trace_file.write(json.dumps(event) + ',\n')
+
+
+# Instancia global para uso en el sistema
+STAGE_TIMERS = StageTimers()
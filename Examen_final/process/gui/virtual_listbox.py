@@ -0,0 +1,110 @@
+"""
+Lista virtualizada para Tk.
+
+Un tk.Listbox con cientos de miles de filas tarda en llenarse y en redibujarse; esta lista
+solo carga en el Listbox las filas visibles y maneja ella misma la barra de desplazamiento,
+la rueda del mouse y las flechas, de modo que su costo no depende del total de filas.
+Las filas se entregan como cantidad y función de texto (sin materializar los textos).
+"""
+import tkinter as tk
+import tkinter.font as tkfont
+from typing import Callable, Optional
+
+
+class VirtualListbox(tk.Frame):
+    """Listbox + Scrollbar que muestra una ventana de `count` filas generadas por `row_text`"""
+
+    def __init__(self, parent, on_select: Optional[Callable[[int], None]] = None, **listbox_options):
+        super().__init__(parent)
+        self.on_select = on_select
+        self.count = 0
+        self.row_text: Callable[[int], str] = str
+        self.first = 0
+        self.selected: Optional[int] = None
+
+        self.scrollbar = tk.Scrollbar(self, command=self.yview)
+        self.scrollbar.pack(side="right", fill="y")
+        self.listbox = tk.Listbox(self, selectmode="single", exportselection=False, **listbox_options)
+        self.listbox.pack(side="left", fill="both", expand=True)
+
+        font = tkfont.Font(font=self.listbox.cget("font"))
+        # each Listbox line is the font linespace plus one pixel of spacing
+        self.line_height = font.metrics("linespace") + 1
+
+        self.listbox.bind("<Configure>", lambda event: self.render())
+        self.listbox.bind("<<ListboxSelect>>", self._on_listbox_select)
+        self.listbox.bind("<MouseWheel>", self._on_wheel)
+        self.listbox.bind("<Button-4>", lambda event: self.scroll(-3))
+        self.listbox.bind("<Button-5>", lambda event: self.scroll(3))
+        self.listbox.bind("<Up>", lambda event: self.move_selection(-1))
+        self.listbox.bind("<Down>", lambda event: self.move_selection(1))
+        self.listbox.bind("<Prior>", lambda event: self.scroll(-self.visible_rows))
+        self.listbox.bind("<Next>", lambda event: self.scroll(self.visible_rows))
+
+    @property
+    def visible_rows(self) -> int:
+        return max(1, self.listbox.winfo_height() // self.line_height)
+
+    def set_rows(self, count: int, row_text: Callable[[int], str]):
+        """Reemplaza el contenido; vuelve al inicio y limpia la selección"""
+        self.count, self.row_text = count, row_text
+        self.first, self.selected = 0, None
+        self.render()
+
+    def render(self):
+        rows = self.visible_rows
+        self.first = max(0, min(self.first, self.count - rows))
+        last = min(self.count, self.first + rows)
+        self.listbox.delete(0, tk.END)
+        if last > self.first:
+            self.listbox.insert(tk.END, *(self.row_text(row) for row in range(self.first, last)))
+        if self.selected is not None and self.first <= self.selected < last:
+            self.listbox.selection_set(self.selected - self.first)
+        if self.count:
+            self.scrollbar.set(self.first / self.count, last / self.count)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def yview(self, *args):
+        """Protocolo de comando de tk.Scrollbar: moveto <fracción> | scroll <n> units|pages"""
+        if not args:
+            return
+        if args[0] == "moveto":
+            self.first = int(float(args[1]) * self.count)
+            self.render()
+        elif args[0] == "scroll":
+            step = int(args[1])
+            self.scroll(step * self.visible_rows if args[2] == "pages" else step)
+
+    def scroll(self, rows: int) -> str:
+        self.first += rows
+        self.render()
+        return "break"
+
+    def see(self, row: int):
+        if row < self.first:
+            self.first = row
+        elif row >= self.first + self.visible_rows:
+            self.first = row - self.visible_rows + 1
+        self.render()
+
+    def move_selection(self, step: int) -> str:
+        if self.count:
+            row = 0 if self.selected is None else max(0, min(self.count - 1, self.selected + step))
+            self.select(row)
+        return "break"
+
+    def select(self, row: int):
+        self.selected = row
+        self.see(row)
+        if self.on_select is not None:
+            self.on_select(row)
+
+    def _on_listbox_select(self, event=None):
+        selection = self.listbox.curselection()
+        if selection:
+            self.select(self.first + selection[0])
+
+    def _on_wheel(self, event) -> str:
+        # Windows reports multiples of 120 per notch, macOS small deltas
+        return self.scroll(-3 if event.delta > 0 else 3)
@@ -0,0 +1,106 @@
+"""
+Métricas de rendimiento en vivo para el panel del dashboard.
+
+Solo lee contadores que ya mantienen otros componentes (CaptureStats de la cámara,
+histogramas de STAGE_TIMERS, estado de MODEL_WARMUP, galería del registro de modelos y la
+memoria del proceso); no agrega trabajo al camino de la cámara. Las tasas (fps de
+procesamiento, uso de CPU) se calculan como diferencia entre dos instantáneas consecutivas.
+"""
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from process.config_modern import PROCESSING_CONFIG
+from process.face_processing.face_gallery import template_user
+from process.face_processing.model_registry import MODEL_REGISTRY, resident_memory_mb
+from process.face_processing.model_warmup import MODEL_WARMUP
+from process.face_processing.stage_timer import STAGE_TIMERS
+
+
+@dataclass
+class PerformanceSnapshot:
+    """Estado del sistema en un instante"""
+    camera_active: bool = False
+    capture_fps: float = 0.0
+    processing_fps: float = 0.0
+    frames_captured: int = 0
+    frames_dropped: int = 0
+    capture_latency_ms: float = 0.0
+    cpu_percent: float = 0.0
+    memory_mb: float = 0.0
+    models: str = ''
+    gallery_templates: Optional[int] = None
+    gallery_users: Optional[int] = None
+    stages: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
+    @property
+    def dropped_percent(self) -> float:
+        return 100.0 * self.frames_dropped / self.frames_captured if self.frames_captured else 0.0
+
+    @property
+    def starved(self) -> bool:
+        """El procesamiento no alcanza a la cámara: el equipo está corto de CPU"""
+        return (self.camera_active and self.capture_fps > 0
+                and self.processing_fps < PROCESSING_CONFIG.PERF_STARVED_RATIO * self.capture_fps)
+
+
+class PerformanceMonitor:
+    """Toma instantáneas periódicas; las tasas se miden entre una llamada y la siguiente"""
+
+    def __init__(self):
+        self._last_time: Optional[float] = None
+        self._last_cpu: float = 0.0
+        self._capture: Any = None
+        self._last_consumed: int = 0
+        # distinct users of the gallery, recounted only when its store changes
+        self._users_state: tuple = ()
+        self._users: int = 0
+
+    def snapshot(self, capture: Any = None) -> PerformanceSnapshot:
+        now, cpu = time.perf_counter(), time.process_time()
+        elapsed = now - self._last_time if self._last_time is not None else 0.0
+        snapshot = PerformanceSnapshot(models=MODEL_WARMUP.state_text, memory_mb=resident_memory_mb(),
+                                       stages=STAGE_TIMERS.summary())
+        if elapsed > 0:
+            snapshot.cpu_percent = 100.0 * (cpu - self._last_cpu) / elapsed
+
+        stats = getattr(capture, 'stats', None)
+        if stats is not None:
+            snapshot.camera_active = bool(capture.is_running)
+            snapshot.capture_fps = stats.capture_fps if snapshot.camera_active else 0.0
+            snapshot.frames_captured = stats.frames_captured
+            snapshot.frames_dropped = stats.frames_dropped
+            snapshot.capture_latency_ms = stats.last_latency_ms
+            # frames taken by the processing loop since the previous snapshot of the same camera
+            if capture is self._capture and elapsed > 0:
+                snapshot.processing_fps = (stats.frames_consumed - self._last_consumed) / elapsed
+            self._last_consumed = stats.frames_consumed
+        self._capture = capture
+
+        gallery = MODEL_REGISTRY.peek('face_gallery')
+        if gallery is not None:
+            snapshot.gallery_templates = len(gallery)
+            snapshot.gallery_users = self.count_users(gallery)
+
+        self._last_time, self._last_cpu = now, cpu
+        return snapshot
+
+    def count_users(self, gallery: Any) -> int:
+        # gallery.users is only filled by a search; counting the template names here leaves the
+        # gallery untouched (a matching job may be using it on another thread)
+        state = (id(gallery), gallery.store.generation, len(gallery.store))
+        if state != self._users_state:
+            self._users = len({template_user(name) for name in gallery.store.names})
+            self._users_state = state
+        return self._users
+
+
+def format_stages(stages: Dict[str, Dict[str, float]]) -> str:
+    """Tabla de percentiles por etapa en texto de ancho fijo"""
+    if not stages:
+        return 'Sin mediciones todavía (abre el registro o la verificación)'
+    lines = [f'{"etapa":<11}{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}{"n":>8}']
+    for name, stats in stages.items():
+        lines.append(f'{name:<11}{stats["p50_ms"]:>9.1f}{stats["p95_ms"]:>9.1f}{stats["p99_ms"]:>9.1f}'
+                     f'{stats["count"]:>8}')
+    return '\n'.join(lines)
@@ -0,0 +1,120 @@
+"""
+Vista previa de la cámara en Tk.
+
+El búfer de visualización y el PhotoImage se crean una vez por tamaño de ventana y en cada
+frame solo se actualizan en su lugar (paste). La visualización corre en su propio temporizador
+a PREVIEW_FPS: el procesamiento entrega frames con submit() a su ritmo y la vista muestra
+siempre el último disponible.
+"""
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Optional, Tuple
+
+import numpy as np
+
+from process.config_modern import VIDEO_CONFIG
+
+
+@dataclass
+class PreviewStats:
+    """Contadores de la vista previa"""
+    frames_submitted: int = 0
+    frames_rendered: int = 0
+    frames_skipped: int = 0
+    buffer_allocations: int = 0
+    last_render_ms: float = 0.0
+
+
+class PreviewRenderer:
+    """Muestra frames BGR en un tk.Label reutilizando el mismo PhotoImage"""
+
+    def __init__(self, label: Any, target_width: int = VIDEO_CONFIG.PREVIEW_WIDTH,
+                 display_fps: float = VIDEO_CONFIG.PREVIEW_FPS):
+        self.label = label
+        self.target_width = target_width
+        self.interval_ms = max(1, int(1000 / display_fps))
+        self.stats = PreviewStats()
+        self.render_times = deque(maxlen=120)
+        self._size: Optional[Tuple[int, int]] = None
+        self._resized: Optional[np.ndarray] = None
+        self._buffer: Optional[np.ndarray] = None
+        self._image = None
+        self._photo = None
+        self._pending: Optional[np.ndarray] = None
+        self._running = False
+
+    @property
+    def mean_render_ms(self) -> float:
+        return float(np.mean(self.render_times)) if self.render_times else 0.0
+
+    def start(self) -> 'PreviewRenderer':
+        if not self._running:
+            self._running = True
+            self.label.after(self.interval_ms, self._tick)
+        return self
+
+    def stop(self):
+        self._running = False
+        self._pending = None
+
+    def submit(self, frame_bgr: np.ndarray):
+        """Deja el frame para la próxima actualización; uno pendiente sin mostrar se descarta"""
+        if self._pending is not None:
+            self.stats.frames_skipped += 1
+        self._pending = frame_bgr
+        self.stats.frames_submitted += 1
+
+    def _tick(self):
+        if not self._running:
+            return
+        try:
+            if not self.label.winfo_exists():
+                self._running = False
+                return
+            if self._pending is not None:
+                frame, self._pending = self._pending, None
+                self.render(frame)
+        except Exception as e:
+            print(f"Error en vista previa: {str(e)}")
+        if self._running:
+            self.label.after(self.interval_ms, self._tick)
+
+    def create_photo(self, size: Tuple[int, int]) -> Any:
+        from PIL import ImageTk
+        photo = ImageTk.PhotoImage('RGBA', size)
+        self.label.config(image=photo)
+        self.label.image = photo
+        return photo
+
+    def _allocate(self, size: Tuple[int, int]):
+        from PIL import Image
+        width, height = size
+        self._resized = np.empty((height, width, 3), dtype=np.uint8)
+        # RGBA: PIL solo comparte memoria con el búfer en modos de 4 bytes por píxel,
+        # así el único copiado por frame es el paste a Tk
+        self._buffer = np.empty((height, width, 4), dtype=np.uint8)
+        self._image = Image.frombuffer('RGBA', size, self._buffer, 'raw', 'RGBA', 0, 1)
+        self._photo = self.create_photo(size)
+        self._size = size
+        self.stats.buffer_allocations += 1
+
+    def render(self, frame_bgr: np.ndarray):
+        import cv2
+        start = time.perf_counter()
+        height, width = frame_bgr.shape[:2]
+        size = (self.target_width, max(1, int(round(height * self.target_width / width))))
+        if size != self._size:
+            self._allocate(size)
+
+        if (width, height) == size:
+            cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGBA, dst=self._buffer)
+        else:
+            interpolation = cv2.INTER_AREA if width > size[0] else cv2.INTER_LINEAR
+            cv2.resize(frame_bgr, size, dst=self._resized, interpolation=interpolation)
+            cv2.cvtColor(self._resized, cv2.COLOR_BGR2RGBA, dst=self._buffer)
+        self._photo.paste(self._image)
+
+        self.stats.last_render_ms = (time.perf_counter() - start) * 1000
+        self.render_times.append(self.stats.last_render_ms)
+        self.stats.frames_rendered += 1
@@ -0,0 +1,211 @@
+"""
+Perfilado opcional de una sesión de cámara (registro o verificación).
+
+Activado con PROFILE_SESSIONS o con `python start.py --profile`, cada sesión corre bajo
+cProfile y tracemalloc y al cerrar la ventana deja en DIAGNOSTICS_DIR:
+  • profile_<sesión>_<fecha>.pstats     estadísticas de cProfile (python -m pstats, snakeviz)
+  • alloc_<sesión>_<fecha>.txt          top-N de asignaciones vivas y crecimiento en la sesión
+  • flame_<sesión>_<fecha>.collapsed    pilas colapsadas (flamegraph.pl, speedscope)
+
+cProfile mide el hilo de la interfaz, donde corre el pipeline por frame; la comparación en
+MATCHING_POOL queda fuera y se ve en las etapas de STAGE_TIMERS. Desactivado, start() y stop()
+vuelven de inmediato sin instalar ningún hook. Los reportes se escriben en un hilo aparte, para
+no congelar la interfaz al cerrar la ventana de la cámara.
+"""
+import os
+import time
+import pstats
+import threading
+import cProfile
+import tracemalloc
+from typing import Dict, List, Optional, Tuple
+
+from process.config_modern import PROCESSING_CONFIG
+
+# (archivo, línea, función) como en pstats
+FunctionKey = Tuple[str, int, str]
+
+
+def function_label(function: FunctionKey) -> str:
+    filename, line, name = function
+    if filename == '~':
+        # built-ins: '<built-in method time.sleep>' → 'built-in method time.sleep'
+        return name.strip('<>')
+    return f'{os.path.basename(filename)}:{name}:{line}'
+
+
+def caller_fractions(stats: pstats.Stats) -> Dict[FunctionKey, List[Tuple[FunctionKey, float]]]:
+    """Por función, la fracción de su tiempo atribuible a cada llamador, de mayor a menor"""
+    fractions = {}
+    for function, (_, _, _, _, callers) in stats.stats.items():
+        # edges without measurable time are split by call count instead
+        by_time = any(edge[3] > 0 for edge in callers.values())
+        weights = [(caller, edge[3] if by_time else edge[1]) for caller, edge in callers.items()]
+        total = sum(weight for _, weight in weights)
+        fractions[function] = sorted(((caller, weight / total) for caller, weight in weights if weight > 0),
+                                     key=lambda item: -item[1]) if total > 0 else []
+    return fractions
+
+
+def collapsed_stacks(stats: pstats.Stats, max_depth: int = 64, min_fraction: float = 1e-4,
+                     max_stacks: int = 20000) -> Dict[str, int]:
+    """
+    Pilas colapsadas ("a;b;c" → µs) reconstruidas del grafo de llamadas de cProfile.
+
+    cProfile guarda aristas llamador→llamado, no pilas completas: el tiempo propio de cada
+    función se reparte hacia arriba entre sus llamadores en proporción al tiempo acumulado de
+    cada arista, lo que basta para un flame graph aproximado.
+
+    El recorrido tiene un límite duro: una rama con menos de min_fraction del tiempo total
+    deja de subir y se cuenta en la pila donde quedó (y una función con menos tiempo propio
+    se omite), de modo que se visitan a lo sumo max_depth / min_fraction marcos; se
+    conservan las max_stacks pilas más pesadas.
+    """
+    fractions = caller_fractions(stats)
+    total = sum(entry[2] for entry in stats.stats.values()) * 1e6
+    if total <= 0:
+        return {}
+    min_us = max(total * min_fraction, 1.0)
+    labels = {function: function_label(function) for function in stats.stats}
+    stacks: Dict[str, float] = {}
+
+    def emit(path: List[FunctionKey], weight: float):
+        key = ';'.join(labels.get(function) or function_label(function) for function in reversed(path))
+        stacks[key] = stacks.get(key, 0.0) + weight
+
+    def climb(path: List[FunctionKey], on_path: set, weight: float):
+        callers = fractions.get(path[-1], [])
+        if not callers or len(path) >= max_depth:
+            emit(path, weight)
+            return
+        stopped, remaining = 0.0, 1.0
+        for caller, fraction in callers:
+            share = weight * fraction
+            if share < min_us:
+                # callers are sorted: every branch left is lighter, their time stays on this stack
+                stopped += weight * max(remaining, 0.0)
+                break
+            remaining -= fraction
+            if caller in on_path:
+                # recursion: stop at the first repeated frame
+                stopped += share
+                continue
+            path.append(caller)
+            on_path.add(caller)
+            climb(path, on_path, share)
+            on_path.discard(caller)
+            path.pop()
+        if stopped > 0:
+            emit(path, stopped)
+
+    for function, (_, _, self_time, _, _) in stats.stats.items():
+        if self_time * 1e6 >= min_us:
+            climb([function], {function}, self_time * 1e6)
+    heaviest = sorted(stacks.items(), key=lambda item: -item[1])[:max_stacks]
+    return {stack: int(round(us)) for stack, us in heaviest if round(us) > 0}
+
+
+class SessionProfiler:
+    """cProfile + tracemalloc alrededor de una sesión de cámara"""
+
+    def __init__(self, enabled: bool = PROCESSING_CONFIG.PROFILE_SESSIONS,
+                 output_dir: str = PROCESSING_CONFIG.DIAGNOSTICS_DIR,
+                 top_n: int = PROCESSING_CONFIG.PROFILE_TOP_N,
+                 traceback_frames: int = PROCESSING_CONFIG.PROFILE_TRACEMALLOC_FRAMES):
+        self.enabled = enabled
+        self.output_dir = output_dir
+        self.top_n = top_n
+        self.traceback_frames = traceback_frames
+        self.session: str = ''
+        self._profile: Optional[cProfile.Profile] = None
+        self._start_snapshot: Optional[tracemalloc.Snapshot] = None
+        self._started_tracemalloc = False
+        self._writers: List[threading.Thread] = []
+
+    @property
+    def active(self) -> bool:
+        return self._profile is not None
+
+    def start(self, session: str):
+        if not self.enabled:
+            return
+        self.stop()
+        self.session = session
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.traceback_frames)
+            self._started_tracemalloc = True
+        self._start_snapshot = tracemalloc.take_snapshot()
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+
+    def stop(self) -> Dict[str, str]:
+        """
+        Detiene el perfilado y lanza la escritura de los reportes en segundo plano; devuelve
+        {tipo: ruta} de inmediato (wait() espera a que estén escritos)
+        """
+        if self._profile is None:
+            return {}
+        profile, self._profile = self._profile, None
+        profile.disable()
+        start_snapshot, self._start_snapshot = self._start_snapshot, None
+        end_snapshot = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1]
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+        stem = f'{self.session}_{time.strftime("%Y%m%d_%H%M%S")}'
+        paths = {
+            'pstats': os.path.join(self.output_dir, f'profile_{stem}.pstats'),
+            'allocations': os.path.join(self.output_dir, f'alloc_{stem}.txt'),
+            'flame': os.path.join(self.output_dir, f'flame_{stem}.collapsed'),
+        }
+        # not a daemon: closing the application still lets the reports finish
+        writer = threading.Thread(target=self.write_reports, name='session-profiler',
+                                  args=(self.session, paths, profile, start_snapshot, end_snapshot, peak))
+        self._writers = [thread for thread in self._writers if thread.is_alive()] + [writer]
+        writer.start()
+        return paths
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Espera a que terminen de escribirse los reportes pendientes"""
+        for writer in self._writers:
+            writer.join(timeout)
+        return not any(writer.is_alive() for writer in self._writers)
+
+    def write_reports(self, session: str, paths: Dict[str, str], profile: cProfile.Profile,
+                      start_snapshot: tracemalloc.Snapshot, end_snapshot: tracemalloc.Snapshot, peak: int):
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            profile.dump_stats(paths['pstats'])
+            stats = pstats.Stats(profile)
+            with open(paths['flame'], 'w', encoding='utf-8') as f:
+                for stack, us in sorted(collapsed_stacks(stats).items()):
+                    f.write(f'{stack} {us}\n')
+            self.write_allocations(paths['allocations'], session, start_snapshot, end_snapshot, peak)
+            print(f"🔬 Perfil de la sesión '{session}' en {self.output_dir}: "
+                  + ', '.join(os.path.basename(path) for path in paths.values()))
+        except Exception as e:
+            print(f"❌ Error al escribir el perfil de la sesión '{session}': {e}")
+
+    def write_allocations(self, path: str, session: str, start_snapshot: tracemalloc.Snapshot,
+                          snapshot: tracemalloc.Snapshot, peak: int):
+        # the profiler's own bookkeeping is not part of the session
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, cProfile.__file__)]
+        snapshot = snapshot.filter_traces(filters)
+        live = snapshot.statistics('lineno')
+        growth = snapshot.compare_to(start_snapshot.filter_traces(filters), 'lineno')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f'Sesión: {session}\n')
+            f.write(f'Memoria trazada: {sum(stat.size for stat in live) / 2**20:.1f} MB '
+                    f'(pico {peak / 2**20:.1f} MB)\n')
+            f.write(f'\nTop {self.top_n} asignaciones vivas al cerrar:\n')
+            for stat in live[:self.top_n]:
+                f.write(f'{stat.size / 1024:>12.1f} KiB {stat.count:>9} bloques  {stat.traceback}\n')
+            f.write(f'\nTop {self.top_n} crecimientos durante la sesión:\n')
+            for stat in sorted(growth, key=lambda stat: -stat.size_diff)[:self.top_n]:
+                f.write(f'{stat.size_diff / 1024:>+12.1f} KiB {stat.count_diff:>+9} bloques  {stat.traceback}\n')
+
+
+# Instancia global para uso en el sistema
+SESSION_PROFILER = SessionProfiler()
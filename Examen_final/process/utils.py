@@ -2,12 +2,8 @@
 Utilidades modernas para el sistema de reconocimiento facial.
 Solo contiene las utilidades necesarias para la nueva interfaz moderna.
 """
-import cv2
-import imutils
-from PIL import Image, ImageTk
 from tkinter import messagebox
-from typing import Tuple
-import numpy as np
+from typing import Any
 import os
 
 from process.config_modern import VIDEO_CONFIG
@@ -17,21 +13,21 @@ class VideoProcessor:
     """Procesador de video reutilizable para la interfaz moderna"""
     
     @staticmethod
-    def setup_camera(camera_index: int = VIDEO_CONFIG.CAMERA_INDEX) -> cv2.VideoCapture:
-        """Configura y retorna la cámara con las configuraciones predeterminadas"""
+    def setup_camera(camera_index: int = VIDEO_CONFIG.CAMERA_INDEX) -> Any:
+        """Configura y retorna la cámara (cv2.VideoCapture) con las configuraciones predeterminadas"""
+        import cv2
         cap = cv2.VideoCapture(camera_index)
         cap.set(cv2.CAP_PROP_FRAME_WIDTH, VIDEO_CONFIG.WIDTH)
         cap.set(cv2.CAP_PROP_FRAME_HEIGHT, VIDEO_CONFIG.HEIGHT)
+        # la captura en hilo ya descarta frames viejos; no acumular cola en el driver
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
         return cap
     
     @staticmethod
-    def process_frame_large(frame_bgr: np.ndarray, target_width: int = 720) -> Tuple[np.ndarray, ImageTk.PhotoImage]:
-        """Procesa un frame de BGR a RGB para ventanas más grandes"""
-        frame_rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
-        frame_resized = imutils.resize(frame_rgb, width=target_width)
-        pil_image = Image.fromarray(frame_resized)
-        tk_image = ImageTk.PhotoImage(image=pil_image)
-        return frame_resized, tk_image
+    def start_capture(camera_index: int = VIDEO_CONFIG.CAMERA_INDEX):
+        """Abre la cámara y lanza la captura en un hilo dedicado (CameraCapture)"""
+        from process.capture import CameraCapture
+        return CameraCapture(VideoProcessor.setup_camera(camera_index)).start()
 
 
 class WindowManager:
@@ -70,6 +66,17 @@ class MessageHandler:
         print("🎯 Modo: Interfaz Moderna con Cámara en Tiempo Real")
         print(f"📹 Configurando cámara en resolución {VIDEO_CONFIG.resolution_text}...")
     
+    @staticmethod
+    def print_model_report(model_stats: list):
+        """Imprime el tiempo de carga y la memoria de cada modelo compartido"""
+        if not model_stats:
+            return
+        print("🧠 Modelos cargados:")
+        for stats in model_stats:
+            print(f"   • {stats.name}: {stats.load_time_s:.2f} s, +{stats.memory_mb:.1f} MB")
+        print(f"   Total: {sum(s.load_time_s for s in model_stats):.2f} s, "
+              f"+{sum(s.memory_mb for s in model_stats):.1f} MB")
+    
     @staticmethod
     def print_identity_verified():
         """Imprime mensaje de identidad verificada"""
@@ -123,18 +130,9 @@ class DatabaseUtils:
     """Utilidades para manejo de base de datos simplificadas"""
     
     @staticmethod
-    def get_registered_users(database_path: str) -> list:
-        """Obtiene la lista de usuarios registrados"""
-        user_codes = []
-        try:
-            user_list = os.listdir(database_path)
-            for user_file in user_list:
-                if user_file.endswith('.txt'):
-                    user_code = user_file.split('.')[0]
-                    user_codes.append(user_code)
-        except FileNotFoundError:
-            print(f"⚠️ Directorio de base de datos no encontrado: {database_path}")
-        return user_codes
+    def get_registered_users(user_store: Any) -> list:
+        """Obtiene la lista de códigos de usuarios registrados (UserStore)"""
+        return user_store.user_codes()
 
 
 class FileUtils:
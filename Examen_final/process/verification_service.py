@@ -0,0 +1,236 @@
+"""
+Servicio local de verificación facial sin interfaz.
+
+Uso: python -m process.verification_service [--host 127.0.0.1] [--port 8765] [--max-batch 8] [--max-wait-ms 5]
+
+Mantiene detector, malla y embedder cargados y precalentados y atiende por HTTP:
+  • POST /verify  cuerpo: imagen codificada (jpg/png) → identidad, distancia y candidatos
+  • GET  /health  estado de los modelos, tamaño de la galería y estadísticas de lotes
+  • POST /reload  vuelve a sincronizar la galería con el directorio de rostros
+
+Los pedidos concurrentes se agrupan en micro-lotes (MicroBatcher): una sola llamada al embedder
+por lote, de hasta MAX_BATCH_SIZE rostros o lo que llegue en MAX_WAIT_MS.
+"""
+import json
+import time
+import argparse
+import threading
+import http.client
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from process.config_modern import PROCESSING_CONFIG, SERVICE_CONFIG
+from process.database.config import DataBasePaths
+from process.face_processing.micro_batcher import MicroBatcher
+
+
+class VerificationService:
+    """Verificación 1:N de imágenes sueltas con los modelos compartidos del proceso"""
+
+    def __init__(self, max_batch_size: int = SERVICE_CONFIG.MAX_BATCH_SIZE,
+                 max_wait_ms: float = SERVICE_CONFIG.MAX_WAIT_MS,
+                 request_timeout: float = SERVICE_CONFIG.REQUEST_TIMEOUT):
+        from process.face_processing.model_warmup import MODEL_WARMUP
+        from process.face_processing.face_utils import FaceUtils
+
+        self.database = DataBasePaths()
+        self.request_timeout = request_timeout
+        self.warmup = MODEL_WARMUP
+        self.warmup.start()
+        if not self.warmup.wait():
+            raise RuntimeError(f'No se pudieron cargar los modelos: {self.warmup.error}')
+        self.face_utils = FaceUtils()
+        # MediaPipe graphs are not shared between threads: one request detects at a time
+        self.detect_lock = threading.Lock()
+        # the batcher thread owns the embedder; reload takes the same lock
+        self.gallery_lock = threading.Lock()
+        self.reload()
+        self.batcher = MicroBatcher(self.verify_batch, max_batch_size, max_wait_ms / 1000,
+                                    name='verification-batcher').start()
+
+    def reload(self) -> int:
+        with self.gallery_lock:
+            self.face_utils.read_face_database(self.database.faces)
+            return len(self.face_utils.face_gallery)
+
+    def close(self):
+        self.batcher.stop(timeout=1.0)
+
+    def detect(self, image_bgr: np.ndarray) -> Optional[np.ndarray]:
+        """Recorte del rostro con el mismo encuadre que FaceLogIn, o None"""
+        from process.face_processing.frame_context import FrameContext
+        frame_context = FrameContext(image_bgr)
+        face_utils = self.face_utils
+        with self.detect_lock:
+            check_face, face_info = face_utils.face_detector.face_detect_mediapipe(
+                image_bgr, face_utils.detection_image(frame_context))
+            if not check_face:
+                return None
+            face_bbox = face_utils.face_detector.extract_face_bbox_mediapipe(
+                frame_context.width, frame_context.height, face_info)
+        face_crop = face_utils.face_crop(frame_context, face_bbox)
+        return face_crop if face_crop.size else None
+
+    def verify_batch(self, face_crops: List[np.ndarray]) -> List[Optional[List]]:
+        """Un lote de recortes: una llamada al embedder y una búsqueda por rostro"""
+        import cv2
+        with self.gallery_lock:
+            gallery = self.face_utils.face_gallery
+            # faces enrolled or deleted on disk (GUI, bulk enrollment) since the last batch; when no
+            # file signature changed this is one directory listing and a stat per face
+            gallery.sync(self.database.faces)
+            # same color handling as FaceUtils.face_matching
+            faces = [cv2.cvtColor(face_crop, cv2.COLOR_RGB2BGR) for face_crop in face_crops]
+            embeddings = self.face_utils.face_matcher.face_embeddings(faces)
+            return [None if embedding is None or len(gallery) == 0 else
+                    gallery.search(embedding, PROCESSING_CONFIG.INDEX_TOP_K) for embedding in embeddings]
+
+    def verify(self, image_bytes: bytes) -> Dict[str, Any]:
+        import cv2
+        start = time.perf_counter()
+        image = cv2.imdecode(np.frombuffer(image_bytes, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            raise ValueError('Imagen ilegible')
+        face_crop = self.detect(image)
+        detected = time.perf_counter()
+        response: Dict[str, Any] = {'matched': False, 'user': '', 'distance': None, 'candidates': []}
+        if face_crop is None:
+            response['error'] = 'no_face'
+        else:
+            candidates = self.batcher.submit(face_crop).result(self.request_timeout)
+            if candidates is None:
+                response['error'] = 'no_embedding' if len(self.face_utils.face_gallery) else 'empty_gallery'
+            else:
+                user, distance = candidates[0]
+                response.update(matched=distance < self.face_utils.face_matcher.distance_threshold, user=user,
+                                distance=distance, candidates=[[name, d] for name, d in candidates])
+        end = time.perf_counter()
+        response['timings_ms'] = {'detect': (detected - start) * 1000, 'match': (end - detected) * 1000,
+                                  'total': (end - start) * 1000}
+        return response
+
+    def health(self) -> Dict[str, Any]:
+        stats = self.batcher.stats
+        return {
+            'models': self.warmup.state,
+            'warmup_s': round(self.warmup.duration, 3),
+            'embedding_model': self.face_utils.face_matcher.embedding_model,
+            'gallery_templates': len(self.face_utils.face_gallery),
+            'batches': stats.batches,
+            'requests': stats.items,
+            'mean_batch_size': round(stats.mean_batch_size, 3),
+            'batch_sizes': {str(size): count for size, count in sorted(stats.sizes.items())},
+            'max_batch_size': self.batcher.max_batch_size,
+            'max_wait_ms': self.batcher.max_wait * 1000,
+        }
+
+
+class VerificationHandler(BaseHTTPRequestHandler):
+    """Rutas HTTP del servicio; el servicio se toma de self.server.service"""
+    protocol_version = 'HTTP/1.1'
+
+    def send_json(self, status: int, payload: Dict[str, Any]):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+    def do_GET(self):
+        if self.path == '/health':
+            self.send_json(200, self.server.service.health())
+        else:
+            self.send_json(404, {'error': f'Ruta desconocida: {self.path}'})
+
+    def do_POST(self):
+        body = self.read_body()
+        try:
+            if self.path == '/verify':
+                self.send_json(200, self.server.service.verify(body))
+            elif self.path == '/reload':
+                self.send_json(200, {'gallery_templates': self.server.service.reload()})
+            else:
+                self.send_json(404, {'error': f'Ruta desconocida: {self.path}'})
+        except ValueError as e:
+            self.send_json(400, {'error': str(e)})
+        except Exception as e:
+            self.send_json(500, {'error': str(e)})
+
+    def log_message(self, format, *args):
+        # one line per request would dominate the console under load
+        pass
+
+
+def create_server(service: Any, host: str = SERVICE_CONFIG.HOST, port: int = SERVICE_CONFIG.PORT) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), VerificationHandler)
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+
+class VerificationClient:
+    """Cliente del servicio; una conexión persistente por hilo"""
+
+    def __init__(self, host: str = SERVICE_CONFIG.HOST, port: int = SERVICE_CONFIG.PORT,
+                 timeout: float = SERVICE_CONFIG.REQUEST_TIMEOUT):
+        self.host, self.port, self.timeout = host, port, timeout
+        self._local = threading.local()
+
+    def request(self, method: str, path: str, body: Optional[bytes] = None) -> Dict[str, Any]:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = http.client.HTTPConnection(self.host, self.port,
+                                                                              timeout=self.timeout)
+        headers = {'Content-Type': 'application/octet-stream'} if body is not None else {}
+        try:
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            payload = json.loads(response.read() or b'{}')
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            self._local.connection = None
+            raise
+        if response.status >= 400:
+            raise RuntimeError(f'{response.status}: {payload.get("error", "")}')
+        return payload
+
+    def verify(self, image_bytes: bytes) -> Dict[str, Any]:
+        return self.request('POST', '/verify', image_bytes)
+
+    def health(self) -> Dict[str, Any]:
+        return self.request('GET', '/health')
+
+    def reload(self) -> Dict[str, Any]:
+        return self.request('POST', '/reload', b'')
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Servicio local de verificación facial')
+    parser.add_argument('--host', default=SERVICE_CONFIG.HOST)
+    parser.add_argument('--port', type=int, default=SERVICE_CONFIG.PORT)
+    parser.add_argument('--max-batch', type=int, default=SERVICE_CONFIG.MAX_BATCH_SIZE)
+    parser.add_argument('--max-wait-ms', type=float, default=SERVICE_CONFIG.MAX_WAIT_MS)
+    args = parser.parse_args(argv)
+
+    service = VerificationService(args.max_batch, args.max_wait_ms)
+    server = create_server(service, args.host, args.port)
+    print(f'🛰️ Servicio de verificación en http://{args.host}:{server.server_port} '
+          f'(lotes de hasta {args.max_batch}, espera {args.max_wait_ms} ms, '
+          f'{len(service.face_utils.face_gallery)} plantillas)')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == '__main__':
+    main()
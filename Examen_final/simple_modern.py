@@ -7,12 +7,20 @@ from tkinter import ttk, messagebox
 from typing import Optional
 import os
 
-from process.config_modern import VIDEO_CONFIG
+from process.config_modern import VIDEO_CONFIG, PROCESSING_CONFIG
 from process.utils import (VideoProcessor, WindowManager, MessageHandler, 
                           DatabaseUtils)
 from process.database.config import DataBasePaths
-from process.face_processing.face_signup import FaceSignUp
-from process.face_processing.face_login import FaceLogIn
+from process.database.user_store import UserStore
+from process.database.user_index import UserIndex
+from process.gui.virtual_listbox import VirtualListbox
+from process.face_processing.model_registry import MODEL_REGISTRY
+from process.face_processing.model_warmup import MODEL_WARMUP
+from process.face_processing.matching_worker import MATCHING_POOL
+from process.preview import PreviewRenderer
+from process.face_processing.stage_timer import STAGE_TIMERS
+from process.session_profiler import SESSION_PROFILER
+from process.performance_monitor import PerformanceMonitor, format_stages
 
 
 class SimpleModernGUI:
@@ -74,8 +82,47 @@ class SimpleModernGUI:
     def _init_modules(self):
         """Inicializa los módulos del sistema"""
         self.database = DataBasePaths()
-        self.face_sign_up = FaceSignUp()
-        self.face_login = FaceLogIn()
+        self.user_store = UserStore(self.database.users_db)
+        # índice en memoria de la pestaña de usuarios: se llena en refresh_users_list
+        self.user_index = UserIndex()
+        self.user_rows = []
+        self._search_job = None
+        # la primera ejecución importa los registros .txt/.png del esquema anterior
+        migration = self.user_store.migrate_legacy(self.database.users, self.database.faces)
+        if not migration.skipped:
+            print(f"🗄️ Migración a {self.database.users_db}: {migration.users} usuarios, "
+                  f"{migration.templates} plantillas, {migration.check_ins} marcaciones")
+        # los modelos se precargan en segundo plano; los flujos se crean al usarlos
+        self._face_sign_up = None
+        self._face_login = None
+        MODEL_WARMUP.start()
+    
+    @property
+    def face_sign_up(self):
+        """Flujo de registro (comparte los modelos de MODEL_REGISTRY)"""
+        if self._face_sign_up is None:
+            from process.face_processing.face_signup import FaceSignUp
+            self._face_sign_up = FaceSignUp()
+        return self._face_sign_up
+    
+    @property
+    def face_login(self):
+        """Flujo de verificación (comparte los modelos de MODEL_REGISTRY)"""
+        if self._face_login is None:
+            from process.face_processing.face_login import FaceLogIn
+            self._face_login = FaceLogIn()
+        return self._face_login
+    
+    def poll_model_state(self):
+        """Actualiza el estado de precarga de modelos en el dashboard"""
+        if hasattr(self, 'models_state_label') and self.models_state_label.winfo_exists():
+            self.models_state_label.config(text=MODEL_WARMUP.state_text)
+        
+        if MODEL_WARMUP.is_done:
+            if MODEL_WARMUP.is_warm:
+                MessageHandler.print_model_report(MODEL_REGISTRY.report())
+            return
+        self.main_window.after(500, self.poll_model_state)
     
     def create_interface(self):
         """Crea la interfaz principal"""
@@ -122,9 +169,8 @@ class SimpleModernGUI:
         
         # Obtener estadísticas
         try:
-            users_path = self.database.users
-            total_users = len([f for f in os.listdir(users_path) if f.endswith('.txt')]) if os.path.exists(users_path) else 0
-        except:
+            total_users = self.user_store.user_count()
+        except Exception:
             total_users = 0
         
         # Tarjetas de estadísticas
@@ -143,9 +189,12 @@ class SimpleModernGUI:
         card2 = tk.Frame(stats_container, bg='#2ecc71', relief='raised', bd=2)
         card2.pack(side="left", fill="both", expand=True, padx=10)
         
-        tk.Label(card2, text="✅", font=("Arial", 24), bg='#2ecc71', fg='white').pack(pady=5)
-        tk.Label(card2, text="Sistema Activo", font=("Arial", 12, "bold"), bg='#2ecc71', fg='white').pack()
-        tk.Label(card2, text="OK", font=("Arial", 20, "bold"), bg='#2ecc71', fg='white').pack(pady=5)
+        tk.Label(card2, text="🧠", font=("Arial", 24), bg='#2ecc71', fg='white').pack(pady=5)
+        tk.Label(card2, text="Modelos", font=("Arial", 12, "bold"), bg='#2ecc71', fg='white').pack()
+        self.models_state_label = tk.Label(card2, text=MODEL_WARMUP.state_text, font=("Arial", 14, "bold"),
+                                           bg='#2ecc71', fg='white')
+        self.models_state_label.pack(pady=5)
+        self.poll_model_state()
         
         # Estadística 3
         card3 = tk.Frame(stats_container, bg='#e74c3c', relief='raised', bd=2)
@@ -155,6 +204,9 @@ class SimpleModernGUI:
         tk.Label(card3, text="Cámara", font=("Arial", 12, "bold"), bg='#e74c3c', fg='white').pack()
         tk.Label(card3, text="Lista", font=("Arial", 20, "bold"), bg='#e74c3c', fg='white').pack(pady=5)
         
+        # Rendimiento en vivo
+        self.create_performance_panel(dashboard_frame)
+        
         # Información del sistema
         info_frame = tk.Frame(dashboard_frame, bg='white', relief='raised', bd=2)
         info_frame.pack(fill="both", expand=True, padx=20, pady=10)
@@ -178,7 +230,7 @@ class SimpleModernGUI:
 📊 Estado: Sistema iniciado correctamente
 👥 Usuarios registrados: {total_users}
 📹 Resolución de cámara: {VIDEO_CONFIG.WIDTH}x{VIDEO_CONFIG.HEIGHT}
-💾 Base de datos: {self.database.users}
+💾 Base de datos: {self.database.users_db}
 
 🎯 Funcionalidades disponibles:
 • Registro de nuevos usuarios con captura facial
@@ -195,6 +247,67 @@ class SimpleModernGUI:
         
         info_text.config(state="disabled")
     
+    def create_performance_panel(self, parent):
+        """Panel de rendimiento en vivo (cámara, etapas del pipeline, modelos y memoria)"""
+        perf_frame = tk.Frame(parent, bg='white', relief='raised', bd=2)
+        perf_frame.pack(fill="x", padx=20, pady=10)
+        
+        tk.Label(
+            perf_frame,
+            text="⚡ Rendimiento en vivo",
+            font=("Arial", 14, "bold"),
+            fg="#2c3e50",
+            bg='white'
+        ).grid(row=0, column=0, columnspan=3, pady=(10, 5))
+        
+        metrics = [("capture", "📹 Captura"), ("processing", "⚙️ Procesamiento"), ("dropped", "🗑️ Descartados"),
+                   ("latency", "⏱️ Latencia cámara"), ("cpu", "🖥️ CPU del proceso"), ("models", "🧠 Modelos"),
+                   ("gallery", "🗂️ Galería"), ("memory", "💾 Memoria")]
+        self.perf_labels = {}
+        for row, (key, text) in enumerate(metrics, start=1):
+            tk.Label(perf_frame, text=text, font=("Arial", 10, "bold"), bg='white',
+                     anchor='w').grid(row=row, column=0, sticky='w', padx=(20, 10))
+            self.perf_labels[key] = tk.Label(perf_frame, text="—", font=("Arial", 10), bg='white', anchor='w')
+            self.perf_labels[key].grid(row=row, column=1, sticky='w')
+        
+        self.perf_stages_label = tk.Label(perf_frame, text="", font=("Consolas", 9), bg='white',
+                                          justify='left', anchor='nw')
+        self.perf_stages_label.grid(row=1, column=2, rowspan=len(metrics), sticky='nw', padx=20)
+        self.perf_warning_label = tk.Label(perf_frame, text="", font=("Arial", 10, "bold"), bg='white', fg='#e74c3c')
+        self.perf_warning_label.grid(row=len(metrics) + 1, column=0, columnspan=3, pady=(5, 10))
+        
+        self.performance_monitor = PerformanceMonitor()
+        self.poll_performance()
+    
+    def poll_performance(self):
+        """Refresca el panel de rendimiento a baja frecuencia (solo lee contadores)"""
+        if not self.perf_stages_label.winfo_exists():
+            return
+        self.main_window.after(PROCESSING_CONFIG.PERF_REFRESH_MS, self.poll_performance)
+        # con el dashboard oculto no hay nada que mostrar
+        if self.notebook.index(self.notebook.select()) != 0:
+            return
+        
+        snapshot = self.performance_monitor.snapshot(self.cap)
+        labels = self.perf_labels
+        if snapshot.camera_active:
+            labels["capture"].config(text=f"{snapshot.capture_fps:.1f} fps")
+            labels["processing"].config(text=f"{snapshot.processing_fps:.1f} fps")
+            labels["latency"].config(text=f"{snapshot.capture_latency_ms:.0f} ms")
+        else:
+            for key in ("capture", "processing", "latency"):
+                labels[key].config(text="cámara inactiva")
+        labels["dropped"].config(text=f"{snapshot.frames_dropped} de {snapshot.frames_captured} "
+                                      f"({snapshot.dropped_percent:.1f} %)")
+        labels["cpu"].config(text=f"{snapshot.cpu_percent:.0f} %")
+        labels["models"].config(text=snapshot.models)
+        labels["gallery"].config(text="sin cargar" if snapshot.gallery_templates is None else
+                                 f"{snapshot.gallery_templates} plantillas, {snapshot.gallery_users} usuarios")
+        labels["memory"].config(text=f"{snapshot.memory_mb:.0f} MB")
+        self.perf_stages_label.config(text=format_stages(snapshot.stages))
+        self.perf_warning_label.config(text="⚠️ El procesamiento no alcanza a la cámara: equipo sin CPU suficiente"
+                                       if snapshot.starved else "")
+    
     def create_users_tab(self):
         """Crea la pestaña de gestión de usuarios"""
         users_frame = ttk.Frame(self.notebook)
@@ -224,6 +337,18 @@ class SimpleModernGUI:
             padx=20
         ).pack(side="left", padx=5)
         
+        # Botón de eliminar
+        tk.Button(
+            controls_frame,
+            text="🗑️ Eliminar Usuario",
+            command=self.delete_selected_user,
+            font=("Arial", 10, "bold"),
+            bg="#e74c3c",
+            fg="white",
+            relief="flat",
+            padx=20
+        ).pack(side="left", padx=5)
+        
         # Barra de búsqueda
         tk.Label(controls_frame, text="🔍 Buscar:", font=("Arial", 10)).pack(side="left", padx=(20, 5))
         self.search_var = tk.StringVar()
@@ -235,20 +360,9 @@ class SimpleModernGUI:
         list_frame = tk.Frame(users_frame, relief='raised', bd=2)
         list_frame.pack(fill="both", expand=True, padx=20, pady=10)
         
-        # Scrollbar y listbox
-        scrollbar = tk.Scrollbar(list_frame)
-        scrollbar.pack(side="right", fill="y")
-        
-        self.users_listbox = tk.Listbox(
-            list_frame,
-            yscrollcommand=scrollbar.set,
-            font=("Arial", 10),
-            selectmode="single"
-        )
-        self.users_listbox.pack(side="left", fill="both", expand=True)
-        scrollbar.config(command=self.users_listbox.yview)
-        
-        self.users_listbox.bind("<<ListboxSelect>>", self.on_user_select)
+        # Lista virtualizada: solo las filas visibles viven en el Listbox
+        self.users_listbox = VirtualListbox(list_frame, on_select=self.on_user_select, font=("Arial", 10))
+        self.users_listbox.pack(fill="both", expand=True)
         
         # Panel de detalles
         details_frame = tk.Frame(users_frame, bg='white', relief='raised', bd=2)
@@ -358,12 +472,15 @@ Configuración actual de cámara:
 • Geometría de ventana: {VIDEO_CONFIG.geometry}
 
 Configuración de procesamiento:
-• Umbral de distancia: {getattr(self, 'PROCESSING_CONFIG', {}).get('DISTANCE_THRESHOLD', 1.2)}
-• Intentos de reconocimiento: 3
-• Frames para captura: 48
+• Umbral de distancia: {PROCESSING_CONFIG.DISTANCE_THRESHOLD or f'calibrado por DeepFace para {PROCESSING_CONFIG.FACE_MODEL}'}
+• Frames fusionados por verificación: {PROCESSING_CONFIG.FUSION_FRAMES} ({PROCESSING_CONFIG.FUSION_MODE})
+• Plantillas por usuario al registrar: {PROCESSING_CONFIG.ENROLL_TEMPLATES} (máx. {PROCESSING_CONFIG.ENROLL_TIME_BUDGET} s)
+• Selección de imagen: mejor de {PROCESSING_CONFIG.SELECTOR_BEST_K}, máximo {PROCESSING_CONFIG.SELECTOR_TIME_BUDGET} s
+• Superposición de malla: {PROCESSING_CONFIG.OVERLAY_MODE} (cada {PROCESSING_CONFIG.OVERLAY_EVERY_N} frames)
+• Medición por etapa: {'sí' if PROCESSING_CONFIG.STAGE_TIMING else 'no'} (traza por sesión: {'sí' if PROCESSING_CONFIG.STAGE_TRACE else 'no'}, en {PROCESSING_CONFIG.DIAGNOSTICS_DIR})
 
 Base de datos:
-• Directorio de usuarios: {self.database.users}
+• Usuarios y marcaciones (SQLite): {self.database.users_db}
 • Directorio de rostros: {self.database.faces}
         """)
         
@@ -396,126 +513,103 @@ Base de datos:
         ).pack(side="left", padx=5)
     
     def refresh_users_list(self):
-        """Actualiza la lista de usuarios"""
+        """Recarga el índice de usuarios desde la base y vuelve a aplicar la búsqueda"""
         try:
-            self.users_listbox.delete(0, tk.END)
-            
-            users_path = self.database.users
-            if not os.path.exists(users_path):
-                self.users_listbox.insert(tk.END, "No hay usuarios registrados")
-                return
-            
-            users = []
-            for file_name in os.listdir(users_path):
-                if file_name.endswith('.txt'):
-                    user_code = file_name.replace('.txt', '')
-                    file_path = os.path.join(users_path, file_name)
-                    
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as file:
-                            content = file.read().strip()
-                            if content:
-                                parts = content.split(',')
-                                name = parts[0] if len(parts) > 0 else 'Sin nombre'
-                                users.append(f"{name} (ID: {user_code})")
-                    except Exception as e:
-                        users.append(f"Error al leer: {user_code}")
-            
-            if not users:
-                self.users_listbox.insert(tk.END, "No hay usuarios registrados")
-            else:
-                for user in sorted(users):
-                    self.users_listbox.insert(tk.END, user)
-                    
+            # una sola consulta; las altas y bajas posteriores actualizan el índice directamente
+            self.user_index.rebuild((user.code, user.name) for user in self.user_store.users())
+            self.apply_search()
         except Exception as e:
-            self.users_listbox.insert(tk.END, f"Error al cargar usuarios: {str(e)}")
+            self.show_list_message(f"Error al cargar usuarios: {str(e)}")
+    
+    def show_list_message(self, message: str):
+        """Muestra un aviso como única fila de la lista"""
+        self.user_rows = []
+        self.users_listbox.set_rows(1, lambda row: message)
     
     def filter_users(self, event=None):
-        """Filtra usuarios según el texto de búsqueda"""
-        search_text = self.search_var.get().lower()
-        
-        if not search_text:
-            self.refresh_users_list()
-            return
-        
-        # Filtrar lista actual
-        self.users_listbox.delete(0, tk.END)
+        """Filtra usuarios según el texto de búsqueda (espera a que se deje de escribir)"""
+        if self._search_job is not None:
+            self.main_window.after_cancel(self._search_job)
+        self._search_job = self.main_window.after(PROCESSING_CONFIG.USER_SEARCH_DEBOUNCE_MS, self.apply_search)
+    
+    def apply_search(self):
+        """Muestra los usuarios del índice que coinciden con el texto de búsqueda"""
+        self._search_job = None
+        search_text = self.search_var.get()
         
         try:
-            users_path = self.database.users
-            if not os.path.exists(users_path):
+            self.user_rows = self.user_index.search(search_text)
+            if not self.user_rows:
+                self.show_list_message("No se encontraron usuarios" if search_text.strip() else
+                                       "No hay usuarios registrados")
                 return
-            
-            filtered_users = []
-            for file_name in os.listdir(users_path):
-                if file_name.endswith('.txt'):
-                    user_code = file_name.replace('.txt', '')
-                    file_path = os.path.join(users_path, file_name)
-                    
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as file:
-                            content = file.read().strip()
-                            if content:
-                                parts = content.split(',')
-                                name = parts[0] if len(parts) > 0 else 'Sin nombre'
-                                display_text = f"{name} (ID: {user_code})"
-                                
-                                if (search_text in name.lower() or 
-                                    search_text in user_code.lower()):
-                                    filtered_users.append(display_text)
-                    except:
-                        continue
-            
-            if not filtered_users:
-                self.users_listbox.insert(tk.END, "No se encontraron usuarios")
-            else:
-                for user in sorted(filtered_users):
-                    self.users_listbox.insert(tk.END, user)
-                    
+            rows, index = self.user_rows, self.user_index
+            self.users_listbox.set_rows(len(rows), lambda row: index.display(rows[row]))
         except Exception as e:
-            self.users_listbox.insert(tk.END, f"Error en búsqueda: {str(e)}")
+            self.show_list_message(f"Error en búsqueda: {str(e)}")
+    
+    def selected_user_code(self) -> Optional[str]:
+        row = self.users_listbox.selected
+        if row is None or row >= len(self.user_rows):
+            return None
+        return self.user_index.codes[self.user_rows[row]]
     
-    def on_user_select(self, event=None):
+    def on_user_select(self, row=None):
         """Maneja la selección de usuario"""
-        selection = self.users_listbox.curselection()
-        if not selection:
+        user_code = self.selected_user_code()
+        if user_code is not None:
+            # Mostrar detalles
+            self.show_user_details(user_code)
+    
+    def delete_selected_user(self):
+        """Elimina el usuario seleccionado, sus plantillas y sus imágenes"""
+        user_code = self.selected_user_code()
+        if user_code is None:
+            messagebox.showwarning("Sin Selección", "Selecciona un usuario de la lista")
+            return
+        if not messagebox.askyesno("Eliminar Usuario", f"¿Eliminar al usuario '{user_code}' y sus rostros?"):
             return
         
-        selected_text = self.users_listbox.get(selection[0])
+        try:
+            # las imágenes borradas salen de la galería en la próxima sincronización
+            face_files = {path for _, path in self.user_store.templates(user_code)}
+            face_files.add(os.path.join(self.database.faces, f"{user_code}.png"))
+            for face_file in face_files:
+                if os.path.exists(face_file):
+                    os.remove(face_file)
+            self.user_store.delete_user(user_code)
+            self.user_index.remove(user_code)
+        except Exception as e:
+            messagebox.showerror("Error", f"Error al eliminar usuario: {str(e)}")
+            return
         
-        if "ID:" in selected_text:
-            # Extraer código de usuario
-            user_code = selected_text.split("ID: ")[1].rstrip(")")
-            
-            # Mostrar detalles
-            self.show_user_details(user_code)
+        print(f"🗑️ Usuario eliminado: {user_code}")
+        self.apply_search()
+        self.details_text.config(state="normal")
+        self.details_text.delete("1.0", tk.END)
+        self.details_text.config(state="disabled")
     
     def show_user_details(self, user_code):
         """Muestra detalles del usuario seleccionado"""
         try:
-            users_path = self.database.users
             faces_path = self.database.faces
-            
-            user_file = os.path.join(users_path, f"{user_code}.txt")
             face_file = os.path.join(faces_path, f"{user_code}.png")
             
             details = f"📋 Detalles del Usuario: {user_code}\n"
             details += "=" * 40 + "\n"
             
-            if os.path.exists(user_file):
-                with open(user_file, 'r', encoding='utf-8') as file:
-                    content = file.read().strip()
-                    if content:
-                        parts = content.split(',')
-                        name = parts[0] if len(parts) > 0 else 'Sin nombre'
-                        details += f"👤 Nombre: {name}\n"
-                        details += f"🆔 Código: {user_code}\n"
-                        
-                        # Información del archivo
-                        stat = os.stat(user_file)
-                        import datetime
-                        reg_date = datetime.datetime.fromtimestamp(stat.st_mtime)
-                        details += f"📅 Registrado: {reg_date.strftime('%Y-%m-%d %H:%M')}\n"
+            user = self.user_store.get_user(user_code)
+            if user is not None:
+                details += f"👤 Nombre: {user.name}\n"
+                details += f"🆔 Código: {user.code}\n"
+                details += f"📅 Registrado: {user.created_at}\n"
+                details += f"🖼️ Plantillas: {len(self.user_store.templates(user_code))}\n"
+                
+                # Últimas marcaciones
+                check_ins = self.user_store.check_ins(user_code, limit=5)
+                details += f"🕒 Marcaciones: {self.user_store.check_in_count(user_code)}\n"
+                for checked_at, success in check_ins:
+                    details += f"   {'✅' if success else '❌'} {checked_at}\n"
             
             # Verificar si tiene imagen facial
             if os.path.exists(face_file):
@@ -526,7 +620,7 @@ Base de datos:
             else:
                 details += "📸 Imagen facial: ❌ No disponible\n"
             
-            details += f"📁 Archivo de datos: {user_file}\n"
+            details += f"📁 Base de datos: {self.database.users_db}\n"
             details += f"🖼️ Archivo de imagen: {face_file}\n"
             
             self.details_text.config(state="normal")
@@ -710,20 +804,17 @@ de usuarios registrados para verificar tu identidad.
         
         # Verificar si el usuario ya existe
         try:
-            users_path = self.database.users
-            if os.path.exists(os.path.join(users_path, f"{code}.txt")):
+            if code in self.user_store:
                 messagebox.showerror("Usuario Existente", f"Ya existe un usuario con el código '{code}'")
                 return
         except Exception as e:
             messagebox.showerror("Error", f"Error al verificar usuario: {str(e)}")
             return
         
-        # Guardar datos del usuario en archivo
+        # Guardar datos del usuario en la base
         try:
-            os.makedirs(users_path, exist_ok=True)
-            user_file = os.path.join(users_path, f"{code}.txt")
-            with open(user_file, 'w', encoding='utf-8') as f:
-                f.write(f"{name},{code},\n")
+            self.user_store.add_user(code, name)
+            self.user_index.add(code, name)
         except Exception as e:
             messagebox.showerror("Error", f"Error al guardar datos del usuario: {str(e)}")
             return
@@ -742,13 +833,7 @@ de usuarios registrados para verificar tu identidad.
         
         # Verificar que hay usuarios registrados
         try:
-            users_path = self.database.users
-            if not os.path.exists(users_path):
-                messagebox.showwarning("Sin Usuarios", "No hay usuarios registrados para verificar")
-                return
-            
-            users = [f for f in os.listdir(users_path) if f.endswith('.txt')]
-            if not users:
+            if self.user_store.user_count() == 0:
                 messagebox.showwarning("Sin Usuarios", "No hay usuarios registrados para verificar")
                 return
         except Exception as e:
@@ -762,16 +847,12 @@ de usuarios registrados para verificar tu identidad.
         """Simula el proceso de registro facial"""
         try:
             # Crear directorios si no existen
-            users_path = self.database.users
             faces_path = self.database.faces
-            
-            os.makedirs(users_path, exist_ok=True)
             os.makedirs(faces_path, exist_ok=True)
             
             # Guardar datos del usuario
-            user_file = os.path.join(users_path, f"{code}.txt")
-            with open(user_file, 'w', encoding='utf-8') as f:
-                f.write(f"{name},{code},\n")
+            self.user_store.add_user(code, name)
+            self.user_index.add(code, name)
             
             # Simular creación de imagen facial (archivo vacío por ahora)
             face_file = os.path.join(faces_path, f"{code}.png")
@@ -784,7 +865,7 @@ de usuarios registrados para verificar tu identidad.
             
             # Actualizar lista de usuarios si está visible
             if hasattr(self, 'users_listbox'):
-                self.refresh_users_list()
+                self.apply_search()
                 
         except Exception as e:
             messagebox.showerror("Error en Registro", f"Error al registrar usuario: {str(e)}")
@@ -794,27 +875,16 @@ de usuarios registrados para verificar tu identidad.
         """Simula el proceso de verificación facial"""
         try:
             # Simular verificación
-            users_path = self.database.users
-            
-            if not os.path.exists(users_path):
-                messagebox.showwarning("Sin Usuarios", "No hay usuarios registrados para verificar")
-                return
-            
-            users = [f for f in os.listdir(users_path) if f.endswith('.txt')]
+            users = self.user_store.users()
             
             if not users:
                 messagebox.showwarning("Sin Usuarios", "No hay usuarios registrados para verificar")
                 return
             
             # Simular verificación exitosa (por ejemplo, primer usuario)
-            user_file = users[0]
-            user_code = user_file.replace('.txt', '')
+            user_code, name = users[0].code, users[0].name
             
             try:
-                with open(os.path.join(users_path, user_file), 'r', encoding='utf-8') as f:
-                    content = f.read().strip()
-                    name = content.split(',')[0] if content else 'Usuario'
-                
                 messagebox.showinfo("Verificación Exitosa", f"✅ Identidad verificada: {name} (ID: {user_code})")
                 print("✅ IDENTIDAD VERIFICADA - Usuario reconocido exitosamente")
                 print("👤 Coincidencia facial confirmada")
@@ -844,7 +914,7 @@ de usuarios registrados para verificar tu identidad.
             import subprocess
             import platform
             
-            path = self.database.users
+            path = os.path.dirname(self.database.users_db)
             
             if platform.system() == "Windows":
                 os.startfile(path)
@@ -861,6 +931,9 @@ de usuarios registrados para verificar tu identidad.
         if messagebox.askokcancel("Salir", "¿Deseas cerrar el sistema?"):
             if self.cap:
                 self.cap.release()
+            MATCHING_POOL.shutdown()
+            # una sesión perfilada aún abierta deja igual sus reportes
+            SESSION_PROFILER.stop()
             self.main_window.quit()
             self.main_window.destroy()
     
@@ -872,7 +945,7 @@ de usuarios registrados para verificar tu identidad.
             self.capture_window.geometry("900x750")
             
             # Configurar cámara
-            self.cap = VideoProcessor.setup_camera()
+            self.cap = VideoProcessor.start_capture()
             if not self.cap.isOpened():
                 messagebox.showerror("Error de Cámara", "No se pudo acceder a la cámara")
                 self.capture_window.destroy()
@@ -884,6 +957,10 @@ de usuarios registrados para verificar tu identidad.
             # Iniciar captura
             self.registration_active = True
             self.current_user_code = user_code
+            STAGE_TIMERS.start_session('registro')
+            SESSION_PROFILER.start('registro')
+            if self._face_sign_up is not None:
+                self._face_sign_up.reset(user_code)
             self.update_camera_registration()
             
         except Exception as e:
@@ -897,7 +974,7 @@ de usuarios registrados para verificar tu identidad.
             self.capture_window.geometry("900x750")
             
             # Configurar cámara
-            self.cap = VideoProcessor.setup_camera()
+            self.cap = VideoProcessor.start_capture()
             if not self.cap.isOpened():
                 messagebox.showerror("Error de Cámara", "No se pudo acceder a la cámara")
                 self.capture_window.destroy()
@@ -908,9 +985,10 @@ de usuarios registrados para verificar tu identidad.
             
             # Iniciar verificación
             self.verification_active = True
-            self.face_login.matcher = None  # Reset matcher
-            self.face_login.comparison = False
-            self.face_login.cont_frame = 0
+            STAGE_TIMERS.start_session('verificacion')
+            SESSION_PROFILER.start('verificacion')
+            if self._face_login is not None:
+                self._face_login.reset()
             self.update_camera_verification()
             
         except Exception as e:
@@ -935,6 +1013,7 @@ de usuarios registrados para verificar tu identidad.
         
         self.video_label = tk.Label(video_frame, bg='black')
         self.video_label.pack(padx=10, pady=10)
+        self.preview = PreviewRenderer(self.video_label).start()
         
         # Frame de instrucciones
         instructions_frame = tk.Frame(window, bg='white', relief='raised', bd=2)
@@ -1000,6 +1079,7 @@ de usuarios registrados para verificar tu identidad.
         
         self.video_label = tk.Label(video_frame, bg='black')
         self.video_label.pack(padx=10, pady=10)
+        self.preview = PreviewRenderer(self.video_label).start()
         
         # Frame de instrucciones
         instructions_frame = tk.Frame(window, bg='white', relief='raised', bd=2)
@@ -1052,6 +1132,11 @@ de usuarios registrados para verificar tu identidad.
             return
             
         try:
+            if not MODEL_WARMUP.is_warm:
+                self.wait_for_models(self.status_label_reg, self.update_camera_registration,
+                                     self.close_camera_registration)
+                return
+            
             ret, frame = self.cap.read()
             if ret:
                 # Procesar frame con FaceSignUp
@@ -1060,22 +1145,19 @@ de usuarios registrados para verificar tu identidad.
                 # Actualizar estado
                 self.status_label_reg.config(text=f"📹 {message}")
                 
-                # Convertir frame para mostrar (más grande)
-                _, tk_image = VideoProcessor.process_frame_large(processed_frame, 720)
-                
-                # Actualizar video
-                if hasattr(self, 'video_label') and self.video_label.winfo_exists():
-                    self.video_label.config(image=tk_image)
-                    self.video_label.image = tk_image
+                # Mostrar frame (la vista previa refresca a su propio ritmo)
+                self.preview.submit(processed_frame)
                 
                 # Si el registro fue exitoso
                 if success:
                     self.registration_success()
                     return
-                
-                # Continuar captura
-                if self.registration_active:
-                    self.capture_window.after(30, self.update_camera_registration)
+            elif not self.cap.is_running:
+                raise RuntimeError("La cámara dejó de entregar frames")
+            
+            # Continuar captura (sin frame nuevo se reintenta pronto)
+            if self.registration_active:
+                self.capture_window.after(30 if ret else 5, self.update_camera_registration)
                     
         except Exception as e:
             print(f"Error en captura de registro: {str(e)}")
@@ -1087,6 +1169,11 @@ de usuarios registrados para verificar tu identidad.
             return
             
         try:
+            if not MODEL_WARMUP.is_warm:
+                self.wait_for_models(self.status_label_ver, self.update_camera_verification,
+                                     self.close_camera_verification)
+                return
+            
             ret, frame = self.cap.read()
             if ret:
                 # Procesar frame con FaceLogIn
@@ -1095,13 +1182,8 @@ de usuarios registrados para verificar tu identidad.
                 # Actualizar estado
                 self.status_label_ver.config(text=f"🔐 {message}")
                 
-                # Convertir frame para mostrar (más grande)
-                _, tk_image = VideoProcessor.process_frame_large(processed_frame, 720)
-                
-                # Actualizar video
-                if hasattr(self, 'video_label') and self.video_label.winfo_exists():
-                    self.video_label.config(image=tk_image)
-                    self.video_label.image = tk_image
+                # Mostrar frame (la vista previa refresca a su propio ritmo)
+                self.preview.submit(processed_frame)
                 
                 # Si se encontró una coincidencia
                 if matcher_result is True:
@@ -1110,18 +1192,47 @@ de usuarios registrados para verificar tu identidad.
                 elif matcher_result is False and self.face_login.comparison:
                     self.verification_failed(message)
                     return
-                
-                # Continuar verificación
-                if self.verification_active:
-                    self.capture_window.after(30, self.update_camera_verification)
+            elif not self.cap.is_running:
+                raise RuntimeError("La cámara dejó de entregar frames")
+            
+            # Continuar verificación (sin frame nuevo se reintenta pronto)
+            if self.verification_active:
+                self.capture_window.after(30 if ret else 5, self.update_camera_verification)
                     
         except Exception as e:
             print(f"Error en captura de verificación: {str(e)}")
             self.close_camera_verification()
     
+    def wait_for_models(self, status_label, retry, close):
+        """Muestra la cámara sin procesar mientras los modelos terminan de cargar"""
+        if MODEL_WARMUP.state == MODEL_WARMUP.FAILED:
+            messagebox.showerror("Error de Modelos", f"No se pudieron cargar los modelos: {MODEL_WARMUP.error}")
+            close()
+            return
+        
+        ret, frame = self.cap.read()
+        if ret:
+            self.preview.submit(frame)
+        status_label.config(text=MODEL_WARMUP.state_text)
+        self.capture_window.after(30, retry)
+    
+    def stop_preview(self):
+        """Detiene la vista previa e informa su tiempo de render"""
+        preview = getattr(self, 'preview', None)
+        if preview is not None:
+            preview.stop()
+            print(f"🖼️ Vista previa: {preview.stats.frames_rendered} frames mostrados, "
+                  f"{preview.mean_render_ms:.2f} ms/frame, {preview.stats.frames_skipped} omitidos")
+            self.preview = None
+            print("⏱️ Etapas: " + " | ".join(f"{stage} p50 {stats['p50_ms']:.1f} / p95 {stats['p95_ms']:.1f} ms"
+                                             for stage, stats in STAGE_TIMERS.summary().items()))
+            STAGE_TIMERS.end_session()
+            SESSION_PROFILER.stop()
+    
     def registration_success(self):
         """Maneja el éxito del registro"""
         self.registration_active = False
+        self.stop_preview()
         if self.cap:
             self.cap.release()
         
@@ -1130,13 +1241,14 @@ de usuarios registrados para verificar tu identidad.
         
         # Actualizar lista de usuarios si está visible
         if hasattr(self, 'users_listbox'):
-            self.refresh_users_list()
+            self.apply_search()
         
         self.capture_window.destroy()
     
     def verification_success(self, message: str):
         """Maneja el éxito de la verificación"""
         self.verification_active = False
+        self.stop_preview()
         if self.cap:
             self.cap.release()
         
@@ -1148,6 +1260,7 @@ de usuarios registrados para verificar tu identidad.
     def verification_failed(self, message: str):
         """Maneja el fallo de la verificación"""
         self.verification_active = False
+        self.stop_preview()
         if self.cap:
             self.cap.release()
         
@@ -1159,6 +1272,7 @@ de usuarios registrados para verificar tu identidad.
     def close_camera_registration(self):
         """Cierra la ventana de captura de registro"""
         self.registration_active = False
+        self.stop_preview()
         if self.cap:
             self.cap.release()
         if hasattr(self, 'capture_window') and self.capture_window.winfo_exists():
@@ -1168,6 +1282,10 @@ de usuarios registrados para verificar tu identidad.
     def close_camera_verification(self):
         """Cierra la ventana de captura de verificación"""
         self.verification_active = False
+        # cancela la comparación en curso en el pool de trabajo
+        if self._face_login is not None:
+            self._face_login.cancel()
+        self.stop_preview()
         if self.cap:
             self.cap.release()
         if hasattr(self, 'capture_window') and self.capture_window.winfo_exists():
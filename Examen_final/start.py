@@ -9,8 +9,19 @@ Incluye verificaciones de dependencias y configuración automática.
 import sys
 import os
 import subprocess
+import importlib.util
 from pathlib import Path
 
+# Presupuesto de tiempo de importación para llegar a la ventana interactiva
+IMPORT_BUDGET_MS = 500
+
+# Módulos perfilados con --import-profile
+IMPORT_PROFILE_TARGETS = {
+    'Interfaz (hasta la ventana)': 'simple_modern',
+    'Pipeline facial (precarga)': 'process.face_processing.face_utils',
+    'Backend de reconocimiento': 'process.face_processing.face_matcher_models.face_matcher',
+}
+
 def print_banner():
     """Muestra el banner del sistema"""
     print("=" * 60)
@@ -29,20 +40,11 @@ def check_dependencies():
     
     missing_packages = []
     
+    # find_spec localiza el paquete sin importarlo (sin pagar su tiempo de carga)
     for package in required_packages:
-        try:
-            if package == 'cv2':
-                import cv2
-            elif package == 'tkinter':
-                import tkinter
-            elif package == 'PIL':
-                from PIL import Image
-            elif package == 'numpy':
-                import numpy
-            elif package == 'imutils':
-                import imutils
+        if importlib.util.find_spec(package) is not None:
             print(f"  ✅ {package}")
-        except ImportError:
+        else:
             print(f"  ❌ {package}")
             missing_packages.append(package)
     
@@ -152,8 +154,61 @@ def run_system_check():
     else:
         print("\n⚠️  Se encontraron problemas. Revisa los mensajes anteriores.")
 
+def parse_import_times(importtime_output: str) -> list:
+    """Convierte la salida de `python -X importtime` en (módulo, propio_ms, acumulado_ms, nivel)"""
+    modules = []
+    for line in importtime_output.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        level = (len(name) - len(name.lstrip())) // 2
+        modules.append((name.strip(), int(self_us) / 1000, int(cumulative_us) / 1000, level))
+    return modules
+
+def run_import_profile(top_n: int = 15):
+    """Reporta el costo de importación por módulo en un intérprete limpio"""
+    print("\n⏱️  PERFIL DE IMPORTACIÓN")
+    print("=" * 60)
+    
+    for title, module in IMPORT_PROFILE_TARGETS.items():
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                                capture_output=True, text=True)
+        modules = parse_import_times(result.stderr)
+        if result.returncode != 0 or not modules:
+            error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'sin salida'
+            print(f"\n❌ {title} ({module}): {error}")
+            continue
+        
+        total_ms = max(cumulative for name, _, cumulative, _ in modules if name == module)
+        status = '✅' if total_ms <= IMPORT_BUDGET_MS else '⚠️'
+        print(f"\n{status} {title}: import {module} = {total_ms:.0f} ms (presupuesto {IMPORT_BUDGET_MS} ms)")
+        
+        # paquetes de primer nivel (p. ej. cv2, tensorflow) ordenados por costo acumulado
+        packages = {}
+        for name, _, cumulative, _ in modules:
+            package = name.split('.')[0]
+            # site pertenece al arranque del intérprete, no al módulo perfilado
+            if name == package and package not in (module.split('.')[0], 'site'):
+                packages[package] = max(packages.get(package, 0.0), cumulative)
+        print(f"   {'paquete':<32}{'acumulado (ms)':>16}")
+        for package, cumulative in sorted(packages.items(), key=lambda item: -item[1])[:top_n]:
+            print(f"   {package:<32}{cumulative:>16.1f}")
+
+def enable_session_profiling():
+    """Perfila cada sesión de cámara (cProfile + tracemalloc) con reportes en DIAGNOSTICS_DIR"""
+    from process.session_profiler import SESSION_PROFILER
+    SESSION_PROFILER.enabled = True
+    print(f"🔬 Perfilado de sesiones activo: reportes en {os.path.abspath(SESSION_PROFILER.output_dir)}")
+
 def main():
     """Función principal"""
+    if '--import-profile' in sys.argv[1:]:
+        run_import_profile()
+        return
+    
+    if '--profile' in sys.argv[1:]:
+        enable_session_profiling()
+    
     print_banner()
     
     # Verificación inicial rápida
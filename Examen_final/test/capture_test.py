@@ -0,0 +1,106 @@
+import unittest
+import time
+import threading
+import numpy as np
+
+from process.capture import CameraCapture, FrameRingBuffer
+
+
+class SyntheticCamera:
+    """Cámara de prueba: frames numerados a una tasa fija"""
+    def __init__(self, fps: float = 200.0, max_frames: int = 10000):
+        self.period = 1.0 / fps
+        self.max_frames = max_frames
+        self.count = 0
+        self.opened = True
+
+    def isOpened(self):
+        return self.opened
+
+    def read(self):
+        time.sleep(self.period)
+        if self.count >= self.max_frames:
+            self.opened = False
+            return False, None
+        self.count += 1
+        return True, np.full((4, 4, 3), self.count % 256, dtype=np.uint8)
+
+    def release(self):
+        self.opened = False
+
+
+class StalledCamera(SyntheticCamera):
+    """Cámara cuya lectura se bloquea más que el tiempo de espera de release()"""
+    def __init__(self, stall: float):
+        super().__init__()
+        self.stall = stall
+        self.reading = threading.Event()
+        self.released_while_reading = False
+        self.releases = 0
+
+    def read(self):
+        self.reading.set()
+        time.sleep(self.stall)
+        self.reading.clear()
+        return super().read()
+
+    def release(self):
+        self.released_while_reading = self.reading.is_set()
+        self.releases += 1
+        super().release()
+
+
+class TestFrameRingBuffer(unittest.TestCase):
+    def test_latest_returns_newest_frame(self):
+        buffer = FrameRingBuffer(size=2)
+        for i in range(5):
+            buffer.put(np.array([i]), time.perf_counter())
+        frame_id, _, frame = buffer.latest()
+        self.assertEqual((frame_id, frame[0]), (5, 4))
+        self.assertEqual(len(buffer.recent()), 2)
+        self.assertIsNone(buffer.latest(after_id=5, timeout=0.01))
+
+
+class TestCameraCapture(unittest.TestCase):
+    def test_release_waits_for_a_stalled_read(self):
+        camera = StalledCamera(stall=1.3)
+        capture = CameraCapture(camera).start()
+        self.assertTrue(camera.reading.wait(1.0))
+        capture.release()
+        # the join timed out with the producer still in read(): the camera is not released under it
+        self.assertEqual(camera.releases, 0)
+        capture._thread.join(2.0)
+        self.assertEqual(camera.releases, 1)
+        self.assertFalse(camera.released_while_reading)
+
+    def test_slow_consumer_gets_latest_frames(self):
+        capture = CameraCapture(SyntheticCamera(fps=200)).start()
+        try:
+            consumed = []
+            deadline = time.perf_counter() + 0.5
+            while time.perf_counter() < deadline:
+                ret, frame = capture.read(timeout=0.1)
+                if ret:
+                    consumed.append(int(frame[0, 0, 0]))
+                    time.sleep(0.03)  # procesamiento más lento que la cámara
+        finally:
+            capture.release()
+
+        self.assertGreater(len(consumed), 5)
+        self.assertEqual(consumed, sorted(consumed))
+        self.assertGreater(capture.stats.frames_dropped, 0)
+        self.assertEqual(capture.stats.frames_consumed, len(consumed))
+        # la latencia queda acotada por el periodo de la cámara, no por la cola
+        self.assertLess(capture.stats.last_latency_ms, 30)
+        self.assertFalse(capture.is_running)
+
+    def test_camera_end_stops_producer(self):
+        capture = CameraCapture(SyntheticCamera(fps=500, max_frames=3)).start()
+        time.sleep(0.1)
+        self.assertFalse(capture.is_running)
+        self.assertEqual(capture.stats.frames_captured, 3)
+        capture.release()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+import unittest
+import os
+import tempfile
+import cv2
+import numpy as np
+
+from process.database.embedding_store import EmbeddingEntry, EmbeddingStore
+from process.face_processing.face_gallery import FaceGallery
+
+
+class TestEmbeddingStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = self.tmp_dir.name
+        self.embeddings = np.random.default_rng(0).normal(size=(5, 16)).astype(np.float32)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_store_persists_as_memmap(self):
+        store = EmbeddingStore(self.root, 'VGG-Face')
+        for i, embedding in enumerate(self.embeddings):
+            store.add(f'user_{i}', embedding, content_hash=f'hash_{i}')
+
+        reloaded = EmbeddingStore(self.root, 'VGG-Face')
+        self.assertIsInstance(reloaded.matrix, np.memmap)
+        self.assertEqual(reloaded.names, [f'user_{i}' for i in range(5)])
+        np.testing.assert_array_equal(reloaded.matrix, self.embeddings)
+        self.assertEqual(reloaded.get('user_3').content_hash, 'hash_3')
+
+    def test_replace_and_remove(self):
+        store = EmbeddingStore(self.root, 'VGG-Face')
+        for i, embedding in enumerate(self.embeddings):
+            store.add(f'user_{i}', embedding)
+        store.add('user_1', self.embeddings[4])
+        store.remove(['user_0', 'user_3'])
+
+        reloaded = EmbeddingStore(self.root, 'VGG-Face')
+        self.assertEqual(reloaded.names, ['user_1', 'user_2', 'user_4'])
+        np.testing.assert_array_equal(reloaded.matrix, self.embeddings[[4, 2, 4]])
+        np.testing.assert_allclose(reloaded.norms, np.linalg.norm(self.embeddings[[4, 2, 4]], axis=1), rtol=1e-6)
+
+    def test_add_many_writes_one_batch(self):
+        store = EmbeddingStore(self.root, 'VGG-Face')
+        store.add('user_0', self.embeddings[0])
+        generation = store.generation
+        entries = [EmbeddingEntry(f'user_{i}', f'hash_{i}') for i in range(1, 5)] + [EmbeddingEntry('user_0')]
+        store.add_many(entries, self.embeddings[[1, 2, 3, 4, 4]])
+        self.assertGreater(store.generation, generation)
+
+        reloaded = EmbeddingStore(self.root, 'VGG-Face')
+        self.assertEqual(reloaded.names, [f'user_{i}' for i in range(5)])
+        np.testing.assert_array_equal(reloaded.matrix, self.embeddings[[4, 1, 2, 3, 4]])
+        self.assertEqual(reloaded.get('user_2').content_hash, 'hash_2')
+
+        memory = EmbeddingStore(None, 'memory')
+        memory.add_many(entries[:2], self.embeddings[:2])
+        np.testing.assert_allclose(memory.norms, np.linalg.norm(self.embeddings[:2], axis=1), rtol=1e-6)
+
+    def test_other_model_is_stale(self):
+        store = EmbeddingStore(self.root, 'VGG-Face')
+        store.add('user_0', self.embeddings[0])
+        self.assertEqual(len(EmbeddingStore(self.root, 'Facenet')), 0)
+
+        # the same directory name with another model recorded in the index is rebuilt
+        os.rename(os.path.join(self.root, 'VGG-Face'), os.path.join(self.root, 'ArcFace'))
+        self.assertEqual(len(EmbeddingStore(self.root, 'ArcFace')), 0)
+
+    def test_refresh_sees_other_writer(self):
+        reader = EmbeddingStore(self.root, 'VGG-Face')
+        writer = EmbeddingStore(self.root, 'VGG-Face')
+        writer.add('user_0', self.embeddings[0])
+        self.assertTrue(reader.refresh())
+        self.assertEqual(reader.names, ['user_0'])
+        self.assertFalse(reader.refresh())
+
+
+class TestFaceGallerySync(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.faces_path = os.path.join(self.tmp_dir.name, 'faces')
+        os.makedirs(self.faces_path)
+        self.calls = 0
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def embedder(self, face_image):
+        self.calls += 1
+        return face_image.mean(axis=(0, 1)).astype(np.float32)
+
+    def write_face(self, name, value):
+        cv2.imwrite(os.path.join(self.faces_path, f'{name}.png'), np.full((8, 8, 3), value, dtype=np.uint8))
+
+    def new_gallery(self):
+        store = EmbeddingStore(os.path.join(self.tmp_dir.name, 'embeddings'), 'test-model')
+        return FaceGallery(self.embedder, 'euclidean', store)
+
+    def test_sync_embeds_only_new_faces(self):
+        self.write_face('ana', 10)
+        self.write_face('luis', 200)
+        gallery = self.new_gallery()
+        self.assertEqual(gallery.sync(self.faces_path), 2)
+        self.assertEqual(gallery.sync(self.faces_path), 0)
+
+        # a new process loads the store without embedding anything
+        self.calls = 0
+        gallery = self.new_gallery()
+        self.assertEqual(gallery.sync(self.faces_path), 0)
+        self.assertEqual(self.calls, 0)
+        self.assertEqual(gallery.match(np.full(3, 12, dtype=np.float32))[0], 'ana')
+
+        # changed and deleted faces are detected
+        self.write_face('ana', 100)
+        os.remove(os.path.join(self.faces_path, 'luis.png'))
+        self.assertEqual(gallery.sync(self.faces_path), 1)
+        self.assertEqual(gallery.names, ['ana'])
+
+    def test_sync_writes_the_index_once(self):
+        for i in range(5):
+            self.write_face(f'user_{i}', 40 * i)
+        gallery = self.new_gallery()
+        writes = []
+        write_index = gallery.store._write_index
+        gallery.store._write_index = lambda: (writes.append(1), write_index())
+        self.assertEqual(gallery.sync(self.faces_path), 5)
+        self.assertEqual(len(writes), 1)
+        self.assertEqual(len(self.new_gallery().store), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
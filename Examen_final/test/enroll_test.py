@@ -0,0 +1,85 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+
+from process.database.config import DataBasePaths
+from process.database.embedding_store import EmbeddingEntry, EmbeddingStore
+from process.database.user_store import UserStore
+from process.enroll import discover_directory, pending_tasks, read_manifest, source_key, write_user_records
+
+
+class TestEnrollSources(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = self.tmp_dir.name
+        self.photos = os.path.join(self.root, 'photos')
+        os.makedirs(os.path.join(self.photos, '2002'))
+        for path in ('1001.jpg', 'notas.txt', '2002/frente.jpg', '2002/perfil.png'):
+            open(os.path.join(self.photos, path), 'wb').close()
+        self.database = DataBasePaths(faces=os.path.join(self.root, 'faces'), users=os.path.join(self.root, 'users'),
+                                      embeddings=os.path.join(self.root, 'embeddings'),
+                                      users_db=os.path.join(self.root, 'users.sqlite3'))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_directory_one_photo_or_folder_per_user(self):
+        tasks = discover_directory(self.photos)
+        self.assertEqual([(task.code, task.template) for task in tasks],
+                         [('1001', '1001'), ('2002', '2002'), ('2002', '2002~1')])
+
+    def test_manifest_paths_are_relative_to_it(self):
+        manifest = os.path.join(self.photos, 'badges.csv')
+        with open(manifest, 'w', encoding='utf-8') as file:
+            file.write('path,code,name\n1001.jpg,1001,Ana Pérez\n2002/frente.jpg,2002,\n,3003,Sin foto\n')
+        tasks = read_manifest(manifest)
+        self.assertEqual([(task.code, task.name) for task in tasks], [('1001', 'Ana Pérez'), ('2002', '2002')])
+        self.assertEqual(tasks[0].path, os.path.join(self.photos, '1001.jpg'))
+
+    def test_resume_skips_stored_templates(self):
+        tasks = discover_directory(self.photos)
+        store = EmbeddingStore(self.database.embeddings, 'test-model')
+        os.makedirs(self.database.faces)
+        store.add('2002', np.ones(4))
+        open(os.path.join(self.database.faces, '2002.png'), 'wb').close()
+        # an embedding without its face image on disk is done again
+        store.add('1001', np.ones(4))
+        self.assertEqual([task.template for task in pending_tasks(tasks, store, self.database.faces)],
+                         ['1001', '2002~1'])
+
+    def test_resume_follows_source_photos(self):
+        store = EmbeddingStore(self.database.embeddings, 'test-model')
+        os.makedirs(self.database.faces)
+        for template, photo in (('2002', 'frente.jpg'), ('2002~1', 'perfil.png')):
+            path = os.path.join(self.photos, '2002', photo)
+            with open(path, 'wb') as file:
+                file.write(photo.encode())
+            store.add_many([EmbeddingEntry(template, source=source_key(path))], np.ones((1, 4)))
+            open(os.path.join(self.database.faces, f'{template}.png'), 'wb').close()
+
+        # a new photo sorted first shifts every position: only it is pending, in a free slot
+        with open(os.path.join(self.photos, '2002', 'atras.jpg'), 'wb') as file:
+            file.write(b'atras')
+        tasks = [task for task in discover_directory(self.photos) if task.code == '2002']
+        pending = pending_tasks(tasks, store, self.database.faces)
+        self.assertEqual([(os.path.basename(task.path), task.template) for task in pending], [('atras.jpg', '2002~2')])
+        self.assertEqual([task.template for task in tasks], ['2002~2', '2002', '2002~1'])
+
+        # removing a photo does not make the others look new
+        os.remove(os.path.join(self.photos, '2002', 'frente.jpg'))
+        tasks = [task for task in discover_directory(self.photos) if task.code == '2002']
+        self.assertEqual([task.template for task in pending_tasks(tasks, store, self.database.faces)], ['2002~2'])
+
+    def test_user_records_are_not_overwritten(self):
+        tasks = discover_directory(self.photos)
+        user_store = UserStore(self.database.users_db)
+        self.assertEqual(write_user_records(tasks, user_store, self.database.faces), 2)
+        self.assertEqual(write_user_records(tasks, user_store, self.database.faces), 0)
+        self.assertEqual(user_store.get_user('2002').name, '2002')
+        self.assertEqual([template for template, _ in user_store.templates('2002')], ['2002', '2002~1'])
+        user_store.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
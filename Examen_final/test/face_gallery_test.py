@@ -0,0 +1,135 @@
+import unittest
+import numpy as np
+
+from process.face_processing.face_gallery import FaceGallery, embedding_distances, template_name, template_user
+
+
+class TestFaceGallery(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.embeddings = rng.normal(size=(20, 128)).astype(np.float32)
+        self.gallery = FaceGallery(embedder=lambda face: face.ravel().astype(np.float32), metric='cosine')
+        for i, embedding in enumerate(self.embeddings):
+            self.gallery.add(f'user_{i}', embedding)
+
+    def test_match_returns_closest_user(self):
+        probe = self.embeddings[7] + 0.01
+        user, distance = self.gallery.match(probe)
+        self.assertEqual(user, 'user_7')
+        self.assertLess(distance, 0.01)
+
+    def test_vectorized_distances_match_pairwise(self):
+        probe = self.embeddings[3]
+        for metric in ('cosine', 'euclidean', 'euclidean_l2'):
+            distances = embedding_distances(probe, self.embeddings, metric)
+            for i, embedding in enumerate(self.embeddings):
+                if metric == 'cosine':
+                    expected = 1 - embedding @ probe / (np.linalg.norm(embedding) * np.linalg.norm(probe))
+                elif metric == 'euclidean':
+                    expected = np.linalg.norm(embedding - probe)
+                else:
+                    expected = np.linalg.norm(embedding / np.linalg.norm(embedding) - probe / np.linalg.norm(probe))
+                self.assertAlmostEqual(float(distances[i]), float(expected), places=4)
+
+    def test_add_replaces_and_remove_drops_user(self):
+        self.gallery.add('user_0', self.embeddings[5])
+        self.assertEqual(len(self.gallery), 20)
+        self.gallery.remove('user_5')
+        user, _ = self.gallery.match(self.embeddings[5])
+        self.assertEqual(user, 'user_0')
+
+    def test_empty_gallery(self):
+        gallery = FaceGallery(embedder=lambda face: None)
+        self.assertEqual(gallery.match(np.ones(4)), ('', float('inf')))
+        self.assertFalse(gallery.add_face('user', np.ones((2, 2))))
+
+
+class TestFaceGalleryFusion(unittest.TestCase):
+    def setUp(self):
+        self.gallery = FaceGallery(embedder=lambda face: face, metric='cosine')
+        self.gallery.add('ana', np.array([1.0, 0.0, 0.0], dtype=np.float32))
+        self.gallery.add('luis', np.array([0.0, 1.0, 0.0], dtype=np.float32))
+
+    def test_fused_probe_is_scored_once(self):
+        frames = [np.array([2.0, 0.4, 0.0]), np.array([1.0, -0.2, 0.1]), np.array([0.4, 1.0, 0.0])]
+        fused = self.gallery.fuse(frames, weights=[1.0, 1.0, 0.1])
+        user, distance = self.gallery.match(fused)
+        self.assertEqual(user, 'ana')
+        frame_distances = self.gallery.frame_distances(user, frames)
+        self.assertEqual(len(frame_distances), 3)
+        # el frame de baja calidad está lejos, la sonda fusionada no
+        self.assertGreater(frame_distances[2], distance)
+        self.assertLess(distance, min(frame_distances))
+
+    def test_mean_of_unit_vectors(self):
+        fused = self.gallery.fuse([np.array([10.0, 0.0, 0.0]), np.array([0.0, 1.0, 0.0])])
+        np.testing.assert_allclose(fused, [0.5, 0.5, 0.0])
+        self.assertEqual(self.gallery.frame_distances('nadie', [fused]), [])
+
+
+class TestFaceGalleryTemplates(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.identities = rng.normal(size=(50, 64)).astype(np.float32)
+        self.gallery = FaceGallery(embedder=lambda face: face, metric='cosine')
+        for i, identity in enumerate(self.identities):
+            for n in range(3):
+                noise = rng.normal(scale=0.15, size=64).astype(np.float32)
+                self.gallery.add(template_name(f'user_{i}', n), identity + noise)
+
+    def test_template_names(self):
+        self.assertEqual(template_name('123', 0), '123')
+        self.assertEqual(template_user(template_name('123', 2)), '123')
+        self.assertEqual(len(self.gallery.user_templates('user_4')), 3)
+
+    def test_one_centroid_per_user(self):
+        self.gallery.update_users()
+        self.assertEqual(len(self.gallery.users), 50)
+        self.assertEqual(self.gallery.centroids.shape, (50, 64))
+        self.assertTrue((self.gallery.spreads > 0).all())
+        self.assertEqual(self.gallery.template_counts.tolist(), [3] * 50)
+
+    def test_clear_match_skips_templates(self):
+        candidates = self.gallery.search(self.identities[7], 3, threshold=0.5)
+        self.assertEqual([user for user, _ in candidates][0], 'user_7')
+        self.assertEqual(len({user for user, _ in candidates}), 3)
+        self.assertEqual(self.gallery.templates_consulted, 0)
+
+    def test_ambiguous_match_uses_closest_template(self):
+        # the probe sits on one template, far enough from the centroid to straddle the threshold
+        template = self.gallery.store.matrix[self.gallery.store.positions[template_name('user_3', 2)]]
+        centroid_distance = self.gallery.frame_distances('user_3', [template])[0]
+        user, distance = self.gallery.search(template, 1, threshold=centroid_distance)[0]
+        self.assertEqual(user, 'user_3')
+        self.assertGreater(self.gallery.templates_consulted, 0)
+        self.assertLess(distance, 1e-5)
+
+    def test_cosine_bounds_hold_for_wide_spreads(self):
+        # templates at ±30°, probe at 60°: the centroid is 0.5 away, the closest template 0.134;
+        # with the spread in cosine distance the bounds would exclude the template
+        gallery = FaceGallery(embedder=lambda face: face, metric='cosine')
+        for n, angle in enumerate((-30.0, 30.0)):
+            gallery.add(template_name('ana', n), np.array([np.cos(np.radians(angle)), np.sin(np.radians(angle))]))
+        probe = np.array([np.cos(np.radians(60.0)), np.sin(np.radians(60.0))], dtype=np.float32)
+        user, distance = gallery.search(probe, 1, threshold=0.3)[0]
+        self.assertEqual(user, 'ana')
+        self.assertEqual(gallery.templates_consulted, 1)
+        self.assertAlmostEqual(distance, 1 - np.cos(np.radians(30.0)), places=5)
+
+        # the matcher's threshold handed to the gallery is the default of search
+        gallery.threshold = 0.3
+        self.assertAlmostEqual(gallery.search(probe, 1)[0][1], 1 - np.cos(np.radians(30.0)), places=5)
+        gallery.threshold = 0.05
+        self.assertAlmostEqual(gallery.search(probe, 1)[0][1], 0.5, places=5)
+
+    def test_new_template_updates_centroid(self):
+        self.gallery.update_users()
+        before = self.gallery.centroids[0].copy()
+        self.gallery.add(template_name('user_0', 3), self.identities[1])
+        self.gallery.update_users()
+        self.assertEqual(self.gallery.template_counts[0], 4)
+        self.assertFalse(np.allclose(before, self.gallery.centroids[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
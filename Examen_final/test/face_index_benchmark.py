@@ -0,0 +1,63 @@
+"""
+Benchmark de los índices de galería contra la búsqueda exacta.
+
+Uso: python -m test.face_index_benchmark --size 100000 --dim 512 --queries 200
+"""
+import argparse
+import time
+import numpy as np
+
+from process.face_processing.face_index_models.face_index import (FaceIndexExact, FaceIndexIVF, FaceIndexPQ,
+                                                                  evaluate_face_index)
+
+
+def synthetic_gallery(size: int, dim: int, n_queries: int, noise: float = 0.35, latent_dim: int = 32, seed: int = 0):
+    """Identidades con estructura de baja dimensión (como los embeddings reales) y sondas ruidosas"""
+    rng = np.random.default_rng(seed)
+    projection = rng.normal(size=(latent_dim, dim)).astype(np.float32)
+    embeddings = rng.normal(size=(size, latent_dim)).astype(np.float32) @ projection
+    embeddings += rng.normal(scale=0.5, size=(size, dim)).astype(np.float32)
+    norms = np.linalg.norm(embeddings, axis=1)
+    targets = rng.choice(size, n_queries, replace=False)
+    queries = embeddings[targets] / norms[targets, None] + rng.normal(scale=noise / np.sqrt(dim),
+                                                                      size=(n_queries, dim)).astype(np.float32)
+    return embeddings, norms, queries.astype(np.float32)
+
+
+def run_benchmark(size: int, dim: int, n_queries: int, k: int, metric: str = 'cosine') -> list:
+    embeddings, norms, queries = synthetic_gallery(size, dim, n_queries)
+    exact = FaceIndexExact(metric)
+    exact.build(embeddings, norms)
+
+    results = []
+    for index in (FaceIndexExact(metric), FaceIndexIVF(metric, n_probe=8), FaceIndexIVF(metric, n_probe=32),
+                  FaceIndexPQ(metric, n_subvectors=16), FaceIndexPQ(metric, n_subvectors=16, rerank=0)):
+        start = time.perf_counter()
+        index.build(embeddings, norms)
+        build_time = time.perf_counter() - start
+        summary = evaluate_face_index(index, exact, queries, k)
+        summary['backend'] = index.name + (f' (n_probe={index.n_probe})' if isinstance(index, FaceIndexIVF) else '') \
+            + (f' (rerank={index.rerank})' if isinstance(index, FaceIndexPQ) else '')
+        summary['build_s'] = build_time
+        results.append(summary)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Recall@k y latencia de los índices de galería')
+    parser.add_argument('--size', type=int, default=100000)
+    parser.add_argument('--dim', type=int, default=512)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f'Galería sintética: {args.size} identidades x {args.dim} dimensiones, {args.queries} consultas')
+    print(f'{"backend":<24}{"build (s)":>10}{"recall@1":>10}{f"recall@{args.k}":>10}{"p50 (ms)":>10}{"p95 (ms)":>10}{"RAM (MB)":>10}')
+    for summary in run_benchmark(args.size, args.dim, args.queries, args.k):
+        print(f'{summary["backend"]:<24}{summary["build_s"]:>10.2f}{summary["recall@1"]:>10.3f}'
+              f'{summary[f"recall@{args.k}"]:>10.3f}{summary["latency_p50_ms"]:>10.2f}{summary["latency_p95_ms"]:>10.2f}'
+              f'{summary["memory_mb"]:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+
+from process.face_processing.face_gallery import FaceGallery
+from process.face_processing.face_index_models.face_index import (FaceIndexExact, FaceIndexIVF, FaceIndexPQ,
+                                                                  create_face_index, evaluate_face_index)
+from test.face_index_benchmark import synthetic_gallery
+
+
+class TestFaceIndex(unittest.TestCase):
+    def setUp(self):
+        self.embeddings, self.norms, self.queries = synthetic_gallery(4000, 64, 50)
+        self.exact = FaceIndexExact('cosine')
+        self.exact.build(self.embeddings, self.norms)
+
+    def test_exact_matches_brute_force(self):
+        rows, distances = self.exact.search(self.queries[0], 3)
+        brute = 1 - self.embeddings @ self.queries[0] / (self.norms * np.linalg.norm(self.queries[0]))
+        np.testing.assert_array_equal(rows, np.argsort(brute)[:3])
+        np.testing.assert_allclose(distances, np.sort(brute)[:3], rtol=1e-5)
+
+    def test_ann_backends_recall(self):
+        for index in (FaceIndexIVF('cosine', n_probe=16), FaceIndexPQ('cosine', n_subvectors=16)):
+            index.build(self.embeddings, self.norms)
+            summary = evaluate_face_index(index, self.exact, self.queries, k=1)
+            self.assertGreaterEqual(summary['recall@1'], 0.95, index.name)
+
+    def test_incremental_add(self):
+        for index in (FaceIndexIVF('euclidean', n_probe=64), FaceIndexPQ('euclidean')):
+            index.build(self.embeddings[:3000], self.norms[:3000])
+            index.add(self.embeddings, self.norms)
+            rows, distances = index.search(self.embeddings[3500], 1)
+            self.assertEqual(rows[0], 3500, index.name)
+            self.assertAlmostEqual(float(distances[0]), 0.0, places=4)
+
+    def test_pq_footprint(self):
+        # rerank=0 keeps only the codes and codebooks, not the float matrix
+        pq = FaceIndexPQ('cosine', n_subvectors=16, rerank=0)
+        pq.build(self.embeddings, self.norms)
+        self.assertEqual(len(pq.embeddings), 0)
+        self.assertLess(pq.memory_bytes(), self.exact.memory_bytes() / 4)
+        summary = evaluate_face_index(pq, self.exact, self.queries[:5], k=1)
+        self.assertAlmostEqual(summary['memory_mb'], pq.memory_bytes() / 2**20)
+
+        # re-ranking over a memmapped matrix reads candidate rows from disk and copies nothing
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, 'embeddings.f32')
+            self.embeddings.astype(np.float32).tofile(path)
+            matrix = np.memmap(path, dtype=np.float32, mode='r', shape=self.embeddings.shape)
+            pq = FaceIndexPQ('cosine', n_subvectors=16)
+            pq.build(matrix, self.norms)
+            self.assertIs(pq.embeddings, matrix)
+            self.assertLess(pq.memory_bytes(), self.exact.memory_bytes() / 4)
+            rows, _ = pq.search(self.embeddings[123], 1)
+            self.assertEqual(rows[0], 123)
+            del pq, matrix
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            create_face_index('hnsw')
+
+    def test_gallery_uses_index_above_min_size(self):
+        gallery = FaceGallery(embedder=lambda face: None, metric='cosine', index_backend='ivf')
+        for i, embedding in enumerate(self.embeddings[:2500]):
+            gallery.add(f'user_{i}', embedding)
+        candidates = gallery.search(self.embeddings[42], 3)
+        self.assertEqual(candidates[0][0], 'user_42')
+        self.assertEqual(len(candidates), 3)
+        self.assertEqual(gallery.index_state[1], 2500)
+
+        gallery.add('user_new', self.embeddings[3000])
+        self.assertEqual(gallery.match(self.embeddings[3000])[0], 'user_new')
+
+        # a second template moves the user's centroid: the index is rebuilt over the centroids
+        gallery.add('user_new~1', self.embeddings[3000] * 1.5)
+        self.assertEqual(gallery.match(self.embeddings[3000])[0], 'user_new')
+        self.assertEqual(gallery.index_state[1], 2501)
+        self.assertEqual(gallery.indexed_templates, 2502)
+
+
+if __name__ == '__main__':
+    unittest.main()
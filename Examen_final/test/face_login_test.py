@@ -0,0 +1,89 @@
+import unittest
+
+import numpy as np
+
+from process.face_processing.face_login import FaceLogIn
+from process.face_processing.frame_selector import FrameSelector, FrameQuality
+from process.face_processing.matching_worker import MatchingCancelled, MatchingResult
+
+
+class FakeJob:
+    progress = 'Comparando...'
+
+    def __init__(self, result=None, error=None):
+        self.outcome, self.error = result, error
+
+    def done(self):
+        return True
+
+    def result(self):
+        if self.error is not None:
+            raise self.error
+        return self.outcome
+
+
+class FakeFaceUtils:
+    """Pipeline that always finds a centered face"""
+
+    def __init__(self):
+        self.check_ins = []
+
+    def check_face(self, face_image):
+        return True, None, None
+
+    def face_mesh(self, face_image):
+        return True, None
+
+    def extract_face_mesh(self, face_image, face_mesh_info):
+        return np.zeros((4, 2))
+
+    def check_face_center(self, face_points):
+        return True
+
+    def show_state_login(self, face_image, state):
+        pass
+
+    def user_check_in(self, user_name, user_store):
+        self.check_ins.append(user_name)
+
+
+class TestFaceLogInFlow(unittest.TestCase):
+    def setUp(self):
+        # no models: FaceLogIn is assembled around the fake pipeline
+        self.login = FaceLogIn.__new__(FaceLogIn)
+        self.login.face_utilities = FakeFaceUtils()
+        self.login.user_store = None
+        self.login.frame_selector = FrameSelector()
+        self.login.matching_job = None
+        self.login.matcher, self.login.comparison, self.login.message = None, False, ''
+        self.frame = np.zeros((8, 8, 3), dtype=np.uint8)
+
+    def trigger(self, job):
+        self.login.frame_selector.add(FrameQuality(0.9, 0.0, 0.0, 200), None, None)
+        self.login.frame_selector.triggered = True
+        self.login.matching_job = job
+
+    def test_undecided_jobs_rearm_the_selector(self):
+        for job in (FakeJob(error=MatchingCancelled()), FakeJob(MatchingResult(empty_database=True))):
+            self.trigger(job)
+            _, matcher, _ = self.login.process(self.frame)
+            self.assertIsNone(matcher)
+            self.assertFalse(self.login.comparison)
+            self.assertFalse(self.login.frame_selector.triggered)
+            self.assertEqual(self.login.frame_selector.candidates, [])
+
+    def test_decision_is_reported_on_later_frames(self):
+        self.trigger(FakeJob(MatchingResult(matched=True, user_name='1001', distance=0.3)))
+        _, matcher, message = self.login.process(self.frame)
+        self.assertTrue(matcher)
+        self.assertEqual(self.login.face_utilities.check_ins, ['1001'])
+
+        scored = self.login.frame_selector.frames_scored
+        _, matcher, later = self.login.process(self.frame)
+        self.assertTrue(matcher)
+        self.assertEqual(later, message)
+        self.assertEqual(self.login.frame_selector.frames_scored, scored)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,348 @@
+"""
+Benchmark de modelos de reconocimiento sobre pares de rostros.
+
+Uso: python -m test.face_matcher_benchmark [--dataset tests/face_matcher/images] [--models VGG-Face ArcFace ...]
+     [--workers 4] [--output test/face_matcher/benchmark]
+
+El dataset tiene pares del mismo rostro (similar/face_1, similar/face_2) y de rostros distintos
+(not_similar/face_1, not_similar/face_2), emparejados por orden de nombre de archivo.
+
+Cada imagen se decodifica una vez por proceso y se embebe una vez por modelo; los embeddings
+(con su latencia) se guardan en <output>/cache/<modelo>.npz y se reutilizan mientras la imagen
+no cambie. Con --workers > 1 cada modelo corre en su propio proceso, de modo que el tiempo de
+carga y el pico de memoria medidos son solo los de ese modelo.
+
+Por modelo se reporta exactitud, FAR/FRR al umbral del modelo, percentiles de latencia por par,
+tiempo de carga y pico de memoria, en <output>/face_matcher_benchmark.json y .csv.
+"""
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+import zipfile
+import multiprocessing
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, asdict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from process.face_processing.face_index_models.face_index import embedding_distances
+from process.face_processing.model_registry import resident_memory_mb
+
+DEFAULT_DATASET = 'tests/face_matcher/images'
+DEFAULT_OUTPUT = 'test/face_matcher/benchmark'
+DEEPFACE_MODELS = ['VGG-Face', 'Facenet', 'Facenet512', 'OpenFace', 'DeepFace', 'DeepID', 'ArcFace', 'Dlib',
+                   'SFace', 'GhostFaceNet']
+ALL_MODELS = ['face_recognition'] + DEEPFACE_MODELS
+
+
+@dataclass
+class FacePair:
+    image_1: str
+    image_2: str
+    same_person: bool
+
+
+class MatcherBackend(ABC):
+    """Embedder de un modelo, con la métrica y el umbral con los que decide si dos rostros coinciden"""
+    metric: str = 'cosine'
+    threshold: float = 0.4
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def load(self):
+        pass
+
+    @abstractmethod
+    def embed(self, image_bgr: np.ndarray) -> Optional[np.ndarray]:
+        """Embedding del rostro de la imagen BGR, None si no se pudo calcular"""
+
+
+class DeepFaceBackend(MatcherBackend):
+    def load(self):
+        from deepface import DeepFace
+        DeepFace.build_model(self.name)
+        try:
+            from deepface.modules.verification import find_threshold
+            self.threshold = float(find_threshold(self.name, self.metric))
+        except ImportError:
+            from deepface.commons import distance
+            self.threshold = float(distance.findThreshold(self.name, self.metric))
+
+    def embed(self, image_bgr: np.ndarray) -> Optional[np.ndarray]:
+        from deepface import DeepFace
+        try:
+            # same detector as DeepFace.verify in FaceMatcherModels.face_matching_*_model
+            result = DeepFace.represent(img_path=image_bgr, model_name=self.name, enforce_detection=False)
+            return np.asarray(result[0]['embedding'], dtype=np.float32)
+        except Exception:
+            return None
+
+
+class FaceRecognitionBackend(MatcherBackend):
+    # FaceMatcherModels.face_matching_face_recognition_model: euclidean distance, tolerance 0.55
+    metric = 'euclidean'
+    threshold = 0.55
+
+    def load(self):
+        import face_recognition
+        self.fr = face_recognition
+
+    def embed(self, image_bgr: np.ndarray) -> Optional[np.ndarray]:
+        import cv2
+        image_rgb = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB)
+        encodings = self.fr.face_encodings(image_rgb, known_face_locations=[(0, image_rgb.shape[1],
+                                                                             image_rgb.shape[0], 0)])
+        return np.asarray(encodings[0], dtype=np.float32) if encodings else None
+
+
+BACKENDS: Dict[str, Callable[[str], MatcherBackend]] = {'face_recognition': FaceRecognitionBackend}
+BACKENDS.update({name: DeepFaceBackend for name in DEEPFACE_MODELS})
+
+
+@dataclass
+class ModelReport:
+    """Fila de resultados de un modelo"""
+    model: str
+    pairs: int = 0
+    accuracy: float = 0.0
+    far: float = 0.0  # pares distintos aceptados / pares distintos
+    frr: float = 0.0  # pares iguales rechazados / pares iguales
+    threshold: float = 0.0
+    failures: int = 0  # pares sin embedding en alguna de las imágenes (cuentan como rechazo)
+    pair_p50_ms: float = 0.0
+    pair_p95_ms: float = 0.0
+    pair_p99_ms: float = 0.0
+    load_s: float = 0.0
+    peak_memory_mb: float = 0.0
+    cached_images: int = 0
+    error: str = ''
+    details: List[Dict] = field(default_factory=list)
+
+
+def image_extension(filename: str) -> bool:
+    return filename.lower().endswith(('.jpg', '.jpeg', '.png'))
+
+
+def load_pairs(dataset: str) -> List[FacePair]:
+    pairs = []
+    for folder, same_person in (('similar', True), ('not_similar', False)):
+        face1_dir = os.path.join(dataset, folder, 'face_1')
+        face2_dir = os.path.join(dataset, folder, 'face_2')
+        if not os.path.isdir(face1_dir) or not os.path.isdir(face2_dir):
+            continue
+        face1_images = sorted(f for f in os.listdir(face1_dir) if image_extension(f))
+        face2_images = sorted(f for f in os.listdir(face2_dir) if image_extension(f))
+        pairs.extend(FacePair(os.path.join(face1_dir, a), os.path.join(face2_dir, b), same_person)
+                     for a, b in zip(face1_images, face2_images))
+    return pairs
+
+
+def peak_memory_mb() -> float:
+    """Pico de memoria residente del proceso en MB (actual si no se puede medir el pico)"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    except ImportError:
+        return resident_memory_mb()
+
+
+def error_rates(distances: np.ndarray, same_person: np.ndarray, threshold: float) -> Tuple[float, float, float]:
+    """Exactitud, FAR y FRR al umbral dado (distancia NaN = sin embedding = rechazo)"""
+    accepted = np.nan_to_num(distances, nan=np.inf) <= threshold
+    genuine, impostor = same_person, ~same_person
+    accuracy = float(np.mean(accepted == same_person)) if len(distances) else 0.0
+    far = float(accepted[impostor].mean()) if impostor.any() else 0.0
+    frr = float((~accepted[genuine]).mean()) if genuine.any() else 0.0
+    return accuracy, far, frr
+
+
+class EmbeddingCache:
+    """
+    Embeddings de un modelo por imagen, válidos mientras no cambie la firma del archivo.
+
+    Se guarda como arreglos planos en un .npz (rutas, firmas, embeddings, latencias), que se
+    leen sin allow_pickle: abrir un caché ajeno no puede ejecutar código.
+    """
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.entries: Dict[str, Tuple[Tuple[int, int], Optional[np.ndarray], float]] = {}
+        if path and os.path.exists(path):
+            try:
+                with np.load(path) as data:
+                    for image_path, (mtime_ns, size), embedding, valid, latency_ms in zip(
+                            data['paths'], data['signatures'], data['embeddings'], data['valid'], data['latencies']):
+                        self.entries[str(image_path)] = ((int(mtime_ns), int(size)), embedding if valid else None,
+                                                         float(latency_ms))
+            except (KeyError, ValueError, OSError, zipfile.BadZipFile) as e:
+                # unreadable or old pickled format: the cache is rebuilt
+                self.entries = {}
+                print(f'⚠️ Caché de embeddings ignorado ({path}): {e}')
+
+    @staticmethod
+    def signature(image_path: str) -> Tuple[int, int]:
+        stat = os.stat(image_path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def get(self, image_path: str) -> Optional[Tuple[Optional[np.ndarray], float]]:
+        entry = self.entries.get(image_path)
+        if entry is None or entry[0] != self.signature(image_path):
+            return None
+        return entry[1], entry[2]
+
+    def put(self, image_path: str, embedding: Optional[np.ndarray], latency_ms: float):
+        self.entries[image_path] = (self.signature(image_path), embedding, latency_ms)
+
+    def save(self):
+        if self.path:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            entries = list(self.entries.items())
+            # failed images keep a zero row and valid=False
+            dim = max((len(entry[1]) for _, entry in entries if entry[1] is not None), default=0)
+            embeddings = np.zeros((len(entries), dim), dtype=np.float32)
+            for row, (_, entry) in enumerate(entries):
+                if entry[1] is not None:
+                    embeddings[row] = entry[1]
+            np.savez(self.path,
+                     paths=np.array([image_path for image_path, _ in entries], dtype=str),
+                     signatures=np.array([entry[0] for _, entry in entries], dtype=np.int64).reshape(-1, 2),
+                     embeddings=embeddings,
+                     valid=np.array([entry[1] is not None for _, entry in entries], dtype=bool),
+                     latencies=np.array([entry[2] for _, entry in entries], dtype=np.float64))
+
+
+# decoded images shared by every model run in the same process
+_IMAGES: Dict[str, Optional[np.ndarray]] = {}
+
+
+def read_image(image_path: str) -> Optional[np.ndarray]:
+    if image_path not in _IMAGES:
+        import cv2
+        _IMAGES[image_path] = cv2.imread(image_path)
+    return _IMAGES[image_path]
+
+
+def run_model(model: str, pairs: List[FacePair], cache_dir: Optional[str] = None) -> ModelReport:
+    report = ModelReport(model)
+    try:
+        backend = BACKENDS[model](model)
+        start = time.perf_counter()
+        backend.load()
+        report.load_s = time.perf_counter() - start
+    except Exception as e:
+        report.error = f'{type(e).__name__}: {e}'
+        return report
+
+    cache = EmbeddingCache(os.path.join(cache_dir, f'{model}.npz') if cache_dir else None)
+
+    def embedding_of(image_path: str) -> Tuple[Optional[np.ndarray], float]:
+        cached = cache.get(image_path)
+        if cached is not None:
+            report.cached_images += 1
+            return cached
+        image = read_image(image_path)
+        start_embed = time.perf_counter()
+        embedding = backend.embed(image) if image is not None else None
+        latency_ms = (time.perf_counter() - start_embed) * 1000
+        cache.put(image_path, embedding, latency_ms)
+        return embedding, latency_ms
+
+    distances, latencies = [], []
+    for pair in pairs:
+        (embedding_1, latency_1), (embedding_2, latency_2) = embedding_of(pair.image_1), embedding_of(pair.image_2)
+        start_distance = time.perf_counter()
+        if embedding_1 is None or embedding_2 is None:
+            distance = float('nan')
+            report.failures += 1
+        else:
+            distance = float(embedding_distances(embedding_1, embedding_2[None, :], backend.metric)[0])
+        # a pair costs both embeddings (as first measured, also when cached) plus the comparison
+        latencies.append(latency_1 + latency_2 + (time.perf_counter() - start_distance) * 1000)
+        distances.append(distance)
+        report.details.append({'image_1': os.path.basename(pair.image_1), 'image_2': os.path.basename(pair.image_2),
+                               'same_person': pair.same_person, 'distance': distance,
+                               'match': bool(distance <= backend.threshold)})
+    cache.save()
+
+    same_person = np.array([pair.same_person for pair in pairs], dtype=bool)
+    report.pairs = len(pairs)
+    report.threshold = backend.threshold
+    report.accuracy, report.far, report.frr = error_rates(np.asarray(distances, dtype=np.float64), same_person,
+                                                          backend.threshold)
+    if latencies:
+        report.pair_p50_ms, report.pair_p95_ms, report.pair_p99_ms = (
+            float(value) for value in np.percentile(latencies, [50, 95, 99]))
+    report.peak_memory_mb = peak_memory_mb()
+    return report
+
+
+def run_benchmark(models: List[str], pairs: List[FacePair], workers: int = 1,
+                  cache_dir: Optional[str] = None) -> List[ModelReport]:
+    if workers <= 1:
+        return [run_model(model, pairs, cache_dir) for model in models]
+    # one fresh process per model: load time and peak memory are not shared between models
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(workers, mp_context=context, max_tasks_per_child=1) as executor:
+        return list(executor.map(run_model, models, [pairs] * len(models), [cache_dir] * len(models)))
+
+
+SUMMARY_FIELDS = ['model', 'pairs', 'accuracy', 'far', 'frr', 'threshold', 'failures', 'pair_p50_ms',
+                  'pair_p95_ms', 'pair_p99_ms', 'load_s', 'peak_memory_mb', 'cached_images', 'error']
+
+
+def write_reports(reports: List[ModelReport], output: str) -> Tuple[str, str]:
+    os.makedirs(output, exist_ok=True)
+    json_path = os.path.join(output, 'face_matcher_benchmark.json')
+    csv_path = os.path.join(output, 'face_matcher_benchmark.csv')
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump([asdict(report) for report in reports], f, indent=2)
+    with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(asdict(report) for report in reports)
+    return json_path, csv_path
+
+
+def print_table(reports: List[ModelReport]):
+    print(f'{"modelo":<18}{"exactitud":>10}{"FAR":>7}{"FRR":>7}{"p50 (ms)":>10}{"p95 (ms)":>10}{"p99 (ms)":>10}'
+          f'{"carga (s)":>11}{"pico (MB)":>11}')
+    for report in sorted(reports, key=lambda report: -report.accuracy):
+        if report.error:
+            print(f'{report.model:<18}  {report.error}')
+            continue
+        print(f'{report.model:<18}{report.accuracy:>10.3f}{report.far:>7.3f}{report.frr:>7.3f}'
+              f'{report.pair_p50_ms:>10.1f}{report.pair_p95_ms:>10.1f}{report.pair_p99_ms:>10.1f}'
+              f'{report.load_s:>11.2f}{report.peak_memory_mb:>11.0f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Exactitud, FAR/FRR, latencia y memoria de los modelos de rostro')
+    parser.add_argument('--dataset', default=DEFAULT_DATASET)
+    parser.add_argument('--models', nargs='+', default=ALL_MODELS, choices=ALL_MODELS)
+    parser.add_argument('--workers', type=int, default=1, help='procesos en paralelo (uno por modelo)')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--no-cache', action='store_true', help='no leer ni guardar embeddings en caché')
+    args = parser.parse_args()
+
+    pairs = load_pairs(args.dataset)
+    if not pairs:
+        raise SystemExit(f'No se encontraron pares en {args.dataset} (similar/ y not_similar/ con face_1 y face_2)')
+    print(f'{len(pairs)} pares ({sum(pair.same_person for pair in pairs)} del mismo rostro) | '
+          f'{len(args.models)} modelos | {args.workers} procesos')
+
+    cache_dir = None if args.no_cache else os.path.join(args.output, 'cache')
+    reports = run_benchmark(args.models, pairs, args.workers, cache_dir)
+    print_table(reports)
+    for path in write_reports(reports, args.output):
+        print(f'📄 {path}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+import unittest
+import os
+import csv
+import tempfile
+import cv2
+import numpy as np
+
+from test.face_matcher_benchmark import (BACKENDS, EmbeddingCache, MatcherBackend, error_rates, load_pairs,
+                                         run_model, write_reports)
+
+
+class MeanColorBackend(MatcherBackend):
+    """Embedder falso: color medio de la imagen"""
+    metric = 'euclidean'
+    threshold = 20.0
+    calls = 0
+
+    def embed(self, image_bgr):
+        MeanColorBackend.calls += 1
+        return image_bgr.reshape(-1, 3).mean(axis=0).astype(np.float32)
+
+
+class TestFaceMatcherBenchmark(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.dataset = os.path.join(self.tmp_dir.name, 'images')
+        # similar: same color (one pair too far apart = false rejection); not_similar: different colors
+        self.write_pairs('similar', [(10, 12), (100, 105), (200, 150)])
+        self.write_pairs('not_similar', [(10, 200), (60, 70)])
+        BACKENDS['mean_color'] = MeanColorBackend
+        MeanColorBackend.calls = 0
+
+    def tearDown(self):
+        BACKENDS.pop('mean_color')
+        self.tmp_dir.cleanup()
+
+    def write_pairs(self, folder, values):
+        for i, (value_1, value_2) in enumerate(values):
+            for face, value in (('face_1', value_1), ('face_2', value_2)):
+                os.makedirs(os.path.join(self.dataset, folder, face), exist_ok=True)
+                cv2.imwrite(os.path.join(self.dataset, folder, face, f'{i}.png'),
+                            np.full((8, 8, 3), value, dtype=np.uint8))
+
+    def test_backend_must_embed(self):
+        with self.assertRaises(TypeError):
+            MatcherBackend('abstract')
+
+    def test_cache_round_trip_without_pickle(self):
+        image_1, image_2 = (os.path.join(self.dataset, 'similar', face, '0.png') for face in ('face_1', 'face_2'))
+        path = os.path.join(self.tmp_dir.name, 'cache', 'model.npz')
+        cache = EmbeddingCache(path)
+        cache.put(image_1, np.array([1.0, 2.0, 3.0], dtype=np.float32), 12.5)
+        cache.put(image_2, None, 3.0)
+        cache.save()
+
+        with np.load(path) as data:
+            self.assertFalse(any(data[key].dtype == object for key in data.files))
+        loaded = EmbeddingCache(path)
+        embedding, latency_ms = loaded.get(image_1)
+        np.testing.assert_array_equal(embedding, [1.0, 2.0, 3.0])
+        self.assertEqual(latency_ms, 12.5)
+        self.assertEqual(loaded.get(image_2), (None, 3.0))
+
+        # a cache in the old pickled format is ignored instead of unpickled
+        np.savez(path, entries=np.array({image_1: None}, dtype=object))
+        self.assertEqual(EmbeddingCache(path).entries, {})
+
+    def test_error_rates(self):
+        distances = np.array([0.1, 0.5, np.nan, 0.2, 0.9])
+        same_person = np.array([True, True, True, False, False])
+        accuracy, far, frr = error_rates(distances, same_person, 0.3)
+        self.assertAlmostEqual(accuracy, 2 / 5)
+        self.assertAlmostEqual(far, 1 / 2)
+        self.assertAlmostEqual(frr, 2 / 3)
+
+    def test_run_model_reports_and_caches(self):
+        pairs = load_pairs(self.dataset)
+        self.assertEqual([pair.same_person for pair in pairs], [True] * 3 + [False] * 2)
+        cache_dir = os.path.join(self.tmp_dir.name, 'cache')
+
+        report = run_model('mean_color', pairs, cache_dir)
+        self.assertEqual(report.error, '')
+        self.assertAlmostEqual(report.frr, 1 / 3)
+        self.assertAlmostEqual(report.far, 1 / 2)
+        self.assertAlmostEqual(report.accuracy, 3 / 5)
+        self.assertLessEqual(report.pair_p50_ms, report.pair_p99_ms)
+        self.assertGreater(report.peak_memory_mb, 0)
+        self.assertEqual(MeanColorBackend.calls, 10)
+
+        # a second run embeds nothing: every image comes from the cache
+        cached = run_model('mean_color', pairs, cache_dir)
+        self.assertEqual(MeanColorBackend.calls, 10)
+        self.assertEqual(cached.cached_images, 10)
+        self.assertEqual([d['distance'] for d in cached.details], [d['distance'] for d in report.details])
+
+        json_path, csv_path = write_reports([report, run_model('no_such_model', pairs)], self.tmp_dir.name)
+        self.assertTrue(os.path.exists(json_path))
+        with open(csv_path, newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual([row['model'] for row in rows], ['mean_color', 'no_such_model'])
+        self.assertIn('KeyError', rows[1]['error'])
+
+
+if __name__ == '__main__':
+    unittest.main()
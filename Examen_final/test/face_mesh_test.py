@@ -0,0 +1,86 @@
+import struct
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from process.face_processing.face_mesh_models.face_mesh import FaceMeshMediapipe, landmarks_to_array
+
+
+class FakeLandmarkList:
+    """Lista de landmarks con el mismo formato serializado que NormalizedLandmarkList"""
+    def __init__(self, points, visibility=False):
+        self.landmark = [SimpleNamespace(x=x, y=y, z=z) for x, y, z in points]
+        self.visibility = visibility
+
+    def SerializeToString(self):
+        data = b''
+        for point in self.landmark:
+            entry = struct.pack('<BfBfBf', 0x0d, point.x, 0x15, point.y, 0x1d, point.z)
+            if self.visibility:
+                entry += struct.pack('<Bf', 0x25, 1.0)
+            data += bytes([0x0a, len(entry)]) + entry
+        return data
+
+
+def fake_mesh(points):
+    mesh = FaceMeshMediapipe.__new__(FaceMeshMediapipe)
+    mesh.mesh_info, mesh.mesh_points, mesh.mesh_transform = None, None, (0.0, 0.0, 1.0, 1.0)
+    return mesh, SimpleNamespace(multi_face_landmarks=[FakeLandmarkList(points)])
+
+
+class TestFaceMeshArrays(unittest.TestCase):
+    def setUp(self):
+        self.points = np.random.default_rng(0).random((468, 3)).astype(np.float32)
+
+    def test_bulk_decode_matches_landmarks(self):
+        array = landmarks_to_array(FakeLandmarkList(self.points))
+        self.assertEqual(array.dtype, np.float32)
+        np.testing.assert_array_equal(array, self.points)
+
+    def test_other_layouts_fall_back(self):
+        np.testing.assert_allclose(landmarks_to_array(FakeLandmarkList(self.points, visibility=True)), self.points)
+
+    def test_pixels_and_subset(self):
+        mesh, info = fake_mesh(self.points)
+        image = np.zeros((480, 640, 3), dtype=np.uint8)
+        pixels = mesh.extract_face_mesh_points(image, info, viz=False)
+        self.assertEqual(pixels.shape, (468, 2))
+        self.assertEqual(pixels.dtype, np.int32)
+        subset = mesh.extract_face_mesh_points(image, info, viz=False, indices=mesh.CENTER_LANDMARKS)
+        np.testing.assert_array_equal(subset, pixels[list(mesh.CENTER_LANDMARKS)])
+
+    def test_roi_landmarks_map_to_full_frame(self):
+        mesh, info = fake_mesh(self.points)
+        mesh.mesh_info, mesh.mesh_transform = info, (0.25, 0.5, 0.5, 0.25)
+        points = mesh.face_mesh_landmarks(info)
+        np.testing.assert_allclose(points[:, 0], 0.25 + self.points[:, 0] * 0.5, rtol=1e-6)
+        np.testing.assert_allclose(points[:, 1], 0.5 + self.points[:, 1] * 0.25, rtol=1e-6)
+
+    def test_roi_on_downscaled_frame(self):
+        mesh, info = fake_mesh(self.points)
+        seen = []
+        mesh.face_mesh_mp = SimpleNamespace(process=lambda image: seen.append(image.shape) or info)
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        small = np.zeros((240, 320, 3), dtype=np.uint8)
+        # roi en píxeles del frame completo, la malla corre sobre la copia reducida
+        check, result = mesh.face_mesh_mediapipe(frame, small, roi=[160, 120, 480, 360])
+        self.assertTrue(check)
+        self.assertEqual(seen, [(120, 160, 3)])
+        points = mesh.face_mesh_landmarks(result)
+        np.testing.assert_allclose(points[:, 0], 0.25 + self.points[:, 0] * 0.5, rtol=1e-6)
+        np.testing.assert_allclose(points[:, 1], 0.25 + self.points[:, 1] * 0.5, rtol=1e-6)
+
+    def test_check_face_center(self):
+        mesh, _ = fake_mesh(self.points)
+        # parietales a los lados de las cejas: rostro centrado
+        self.assertTrue(mesh.check_face_center(np.array([[100, 200], [400, 200], [150, 150], [350, 150]])))
+        self.assertFalse(mesh.check_face_center(np.array([[100, 200], [400, 200], [50, 150], [350, 150]])))
+        full = np.zeros((468, 2), dtype=np.int32)
+        full[list(mesh.CENTER_LANDMARKS)] = [[100, 200], [400, 200], [150, 150], [350, 150]]
+        self.assertTrue(mesh.check_face_center(full))
+        self.assertFalse(mesh.check_face_center(np.zeros((10, 2))))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import numpy as np
+
+from process.face_processing.face_overlay import FaceOverlay
+
+
+class TestFaceOverlay(unittest.TestCase):
+    def setUp(self):
+        self.pixels = np.array([[10, 10], [50, 10], [50, 40], [10, 40]], dtype=np.int32)
+        self.edges = np.array([[0, 1], [1, 2], [2, 3], [3, 0]], dtype=np.int32)
+        self.contour = np.array([[0, 2]], dtype=np.int32)
+
+    def draw(self, mode):
+        overlay = FaceOverlay(self.edges, self.contour, mode=mode)
+        image = np.zeros((60, 60, 3), dtype=np.uint8)
+        if overlay.render_frame():
+            overlay.draw(image, self.pixels)
+        return image
+
+    def test_modes(self):
+        self.assertEqual(self.draw('off').sum(), 0)
+        bbox = self.draw('bbox')
+        self.assertTrue(bbox[10, 30].any() and bbox[40, 30].any())
+        self.assertFalse(bbox[25, 30].any())
+        self.assertTrue(self.draw('contour')[25, 30].any())
+        self.assertTrue(self.draw('full')[10, 30].any())
+        with self.assertRaises(ValueError):
+            FaceOverlay(self.edges, self.contour, mode='wireframe')
+
+    def test_throttle(self):
+        overlay = FaceOverlay(self.edges, self.contour, mode='full', every_n=3)
+        self.assertEqual([overlay.render_frame() for _ in range(7)], [True, False, False, True, False, False, True])
+        self.assertEqual(overlay.rendered_frames, 3)
+
+    def test_skipped_frames_redraw_last_geometry(self):
+        for mode in ('bbox', 'contour', 'full'):
+            overlay = FaceOverlay(self.edges, self.contour, mode=mode, every_n=3)
+            images = []
+            for _ in range(3):
+                image = np.zeros((60, 60, 3), dtype=np.uint8)
+                if overlay.render_frame():
+                    overlay.draw(image, self.pixels)
+                else:
+                    overlay.redraw(image)
+                images.append(image)
+            self.assertEqual(overlay.rendered_frames, 1, mode)
+            self.assertTrue(images[0].any(), mode)
+            np.testing.assert_array_equal(images[1], images[0])
+            np.testing.assert_array_equal(images[2], images[0])
+
+            overlay.clear()
+            image = np.zeros((60, 60, 3), dtype=np.uint8)
+            overlay.redraw(image)
+            self.assertEqual(image.sum(), 0, mode)
+
+    def test_styles_are_cached(self):
+        overlay = FaceOverlay(self.edges, self.contour)
+        overlay.set_color((0, 255, 0))
+        style = overlay.style
+        overlay.set_color((0, 0, 255))
+        overlay.set_color([0, 255, 0])
+        self.assertIs(overlay.style, style)
+
+
+if __name__ == '__main__':
+    unittest.main()
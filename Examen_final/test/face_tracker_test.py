@@ -0,0 +1,56 @@
+import unittest
+
+from process.face_processing.face_tracker import DetectionScheduler, bbox_iou
+
+
+class TestDetectionScheduler(unittest.TestCase):
+    def test_detects_every_n_frames(self):
+        scheduler = DetectionScheduler(detect_every=3, min_confidence=0.5)
+        decisions = []
+        for _ in range(8):
+            detect = scheduler.should_detect()
+            decisions.append(detect)
+            if detect:
+                scheduler.on_detection([10, 10, 110, 110])
+            scheduler.on_mesh([5, 0, 115, 120])
+        self.assertEqual(decisions, [True, False, False, False, True, False, False, False])
+        self.assertEqual(scheduler.stats.detections, 2)
+        self.assertEqual(scheduler.stats.reasons['interval'], 1)
+        self.assertEqual(scheduler.stats.tracked_frames, 6)
+
+    def test_low_confidence_forces_detection(self):
+        scheduler = DetectionScheduler(detect_every=10, min_confidence=0.5)
+        self.assertTrue(scheduler.should_detect())
+        scheduler.on_detection([0, 0, 100, 100])
+        scheduler.on_mesh([0, 0, 100, 100])
+        self.assertFalse(scheduler.should_detect())
+        # la malla saltó lejos del bbox anterior
+        scheduler.on_mesh([200, 200, 300, 300])
+        self.assertTrue(scheduler.should_detect())
+        self.assertEqual(scheduler.last_decision, 'low_confidence')
+
+    def test_lost_face_and_roi(self):
+        scheduler = DetectionScheduler(detect_every=5, roi_margin=0.5)
+        self.assertIsNone(scheduler.roi(640, 480))
+        scheduler.on_detection([100, 100, 200, 200])
+        self.assertEqual(scheduler.roi(640, 480), [50, 50, 250, 250])
+        self.assertEqual(scheduler.roi(220, 480), [50, 50, 220, 250])
+        scheduler.on_lost()
+        self.assertTrue(scheduler.should_detect())
+        self.assertEqual(scheduler.last_decision, 'no_track')
+        self.assertEqual(scheduler.stats.lost, 1)
+
+    def test_disabled_always_detects(self):
+        scheduler = DetectionScheduler(enabled=False)
+        scheduler.on_detection([0, 0, 10, 10])
+        self.assertTrue(all(scheduler.should_detect() for _ in range(5)))
+        self.assertIsNone(scheduler.roi(640, 480))
+
+    def test_bbox_iou(self):
+        self.assertAlmostEqual(bbox_iou([0, 0, 10, 10], [0, 0, 10, 10]), 1.0)
+        self.assertAlmostEqual(bbox_iou([0, 0, 10, 10], [5, 0, 15, 10]), 1 / 3)
+        self.assertEqual(bbox_iou([0, 0, 10, 10], [20, 20, 30, 30]), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+import unittest
+import numpy as np
+
+from process.face_processing.frame_context import FrameContext
+
+
+class TestFrameContext(unittest.TestCase):
+    def setUp(self):
+        self.frame = np.random.default_rng(0).integers(0, 255, (480, 640, 3), dtype=np.uint8)
+
+    def test_views_are_computed_once(self):
+        context = FrameContext(self.frame)
+        rgb = context.rgb
+        self.assertIs(context.rgb, rgb)
+        np.testing.assert_array_equal(rgb, self.frame[..., ::-1])
+        context.gray
+        context.gray
+        self.assertEqual(context.allocations, 2)
+        self.assertEqual(context.allocated_views, ['rgb', 'gray'])
+
+    def test_downscaled(self):
+        context = FrameContext(self.frame)
+        small, scale = context.downscaled(320)
+        self.assertEqual(small.shape, (240, 320, 3))
+        self.assertAlmostEqual(scale, 0.5)
+        self.assertIs(context.downscaled(320)[0], small)
+        self.assertIs(context.downscaled(1280)[0], context.rgb)
+
+    def test_crop_ignores_drawings(self):
+        context = FrameContext(self.frame)
+        original = self.frame[100:200, 50:150].copy()
+        context.rgb
+        # lo que se dibuja sobre el frame no aparece en el recorte
+        self.frame[:] = 0
+        np.testing.assert_array_equal(context.crop_bgr(100, 200, 50, 150), original)
+
+
+if __name__ == '__main__':
+    unittest.main()
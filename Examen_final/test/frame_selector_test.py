@@ -0,0 +1,68 @@
+import unittest
+import numpy as np
+
+from process.face_processing.frame_context import FrameContext
+from process.face_processing.frame_selector import (CHIN, FACE_LEFT, FACE_RIGHT, FOREHEAD, NOSE_TIP, FrameSelector,
+                                                    head_pose, laplacian_variance)
+
+
+def face_points(nose_x=320, nose_y=258, width=200):
+    """Malla mínima: solo los landmarks de pose, sobre un rostro de `width` píxeles"""
+    points = np.zeros((468, 2), dtype=np.int32)
+    points[:] = (320, 240)
+    points[FACE_RIGHT] = (320 - width // 2, 240)
+    points[FACE_LEFT] = (320 + width // 2, 240)
+    points[FOREHEAD] = (320, 140)
+    points[CHIN] = (320, 340)
+    points[NOSE_TIP] = (nose_x, nose_y)
+    return points
+
+
+class TestFrameSelector(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.sharp = FrameContext(rng.integers(0, 255, (480, 640, 3), dtype=np.uint8))
+        self.flat = FrameContext(np.full((480, 640, 3), 128, dtype=np.uint8))
+
+    def test_pose_and_sharpness(self):
+        yaw, pitch = head_pose(face_points())
+        self.assertAlmostEqual(yaw, 0.0)
+        self.assertAlmostEqual(pitch, -0.0, places=1)
+        self.assertGreater(head_pose(face_points(nose_x=380))[0], 0.5)
+        self.assertGreater(laplacian_variance(self.sharp.rgb), laplacian_variance(self.flat.rgb))
+
+    def test_rejects_bad_frames(self):
+        selector = FrameSelector()
+        self.assertFalse(selector.score(self.sharp, face_points(nose_x=390)).accepted)
+        self.assertFalse(selector.score(self.sharp, face_points(width=40)).accepted)
+        self.assertFalse(selector.score(self.flat, face_points()).accepted)
+        self.assertEqual(selector.frames_rejected, 3)
+
+    def test_good_frame_triggers_immediately(self):
+        selector = FrameSelector(good_score=0.7, min_good_frames=1, time_budget=10.0)
+        quality = selector.score(self.sharp, face_points())
+        self.assertGreaterEqual(quality.score, 0.7)
+        self.assertTrue(selector.add(quality, self.sharp, None, now=0.0))
+        self.assertTrue(selector.ready(now=0.01))
+
+    def test_time_budget_picks_best_of_k(self):
+        selector = FrameSelector(best_k=2, good_score=0.99, time_budget=0.5)
+        for i, nose_x in enumerate((345, 330, 340, 322)):
+            selector.add(selector.score(self.sharp, face_points(nose_x=nose_x)), self.sharp, i, now=i * 0.1)
+        self.assertFalse(selector.ready(now=0.4))
+        self.assertTrue(selector.ready(now=0.6))
+        self.assertEqual([candidate.face_info for candidate in selector.best_frames()], [3, 1])
+        selector.triggered = True
+        self.assertFalse(selector.ready(now=1.0))
+
+    def test_waits_for_frames_to_fuse(self):
+        selector = FrameSelector(best_k=3, good_score=0.7, min_good_frames=2, time_budget=10.0)
+        quality = selector.score(self.sharp, face_points())
+        selector.add(quality, self.sharp, 0, now=0.0)
+        self.assertFalse(selector.ready(now=0.05))
+        selector.add(quality, self.sharp, 1, now=0.05)
+        self.assertTrue(selector.ready(now=0.05))
+
+
+if __name__ == '__main__':
+    unittest.main()
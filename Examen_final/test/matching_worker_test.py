@@ -0,0 +1,72 @@
+import unittest
+import threading
+
+import numpy as np
+
+from process.face_processing.matching_worker import MatchingCancelled, MatchingWorkerPool
+
+
+class FakeFaceUtils:
+    """Galería mínima: read_face_database se bloquea hasta que el test lo libere"""
+
+    def __init__(self, names):
+        self.names = names
+        self.release = threading.Event()
+        self.distance = 0.0
+        self.candidates = []
+        self.frame_distances = []
+
+    def read_face_database(self, path):
+        self.release.wait(2.0)
+        return self.names, f'{len(self.names)} rostros'
+
+    def face_matching(self, faces, weights=None):
+        self.distance = 0.3
+        self.candidates = [('ana', 0.3)]
+        self.frame_distances = [0.3] * len(faces)
+        return True, 'ana'
+
+
+class TestMatchingWorkerPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = MatchingWorkerPool('thread', 1)
+        self.face = np.zeros((8, 8, 3), dtype=np.uint8)
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_job_reports_progress_and_result(self):
+        face_utils = FakeFaceUtils(['ana'])
+        job = self.pool.submit(face_utils, [self.face, self.face], 'faces', weights=[0.9, 0.8])
+        self.assertFalse(job.done())
+        face_utils.release.set()
+        result = job.future.result(timeout=2.0)
+        self.assertTrue(result.matched)
+        self.assertEqual(result.user_name, 'ana')
+        self.assertEqual(result.candidates, [('ana', 0.3)])
+        self.assertEqual(result.frame_distances, [0.3] * 2)
+        self.assertEqual(job.progress, '1 rostros')
+
+    def test_cancelled_job_discards_result(self):
+        face_utils = FakeFaceUtils(['ana'])
+        job = self.pool.submit(face_utils, self.face, 'faces')
+        job.cancel()
+        self.assertTrue(job.done())
+        face_utils.release.set()
+        with self.assertRaises(MatchingCancelled):
+            job.result()
+
+    def test_empty_database(self):
+        face_utils = FakeFaceUtils([])
+        face_utils.release.set()
+        result = self.pool.submit(face_utils, self.face, 'faces').future.result(timeout=2.0)
+        self.assertTrue(result.empty_database)
+        self.assertFalse(result.matched)
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            MatchingWorkerPool('gpu')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from process.face_processing.micro_batcher import MicroBatcher
+
+
+class TestMicroBatcher(unittest.TestCase):
+    def setUp(self):
+        self.release = threading.Event()
+        self.calls = []
+
+    def process(self, items):
+        self.calls.append(list(items))
+        self.release.wait(2.0)
+        return [item * 10 for item in items]
+
+    def test_concurrent_requests_share_a_batch(self):
+        batcher = MicroBatcher(self.process, max_batch_size=4, max_wait=0.2).start()
+        self.addCleanup(batcher.stop, 1.0)
+        self.release.set()
+        with ThreadPoolExecutor(4) as executor:
+            results = list(executor.map(lambda i: batcher.submit(i).result(2.0), range(4)))
+        self.assertEqual(results, [0, 10, 20, 30])
+        self.assertEqual(batcher.stats.items, 4)
+        self.assertLess(batcher.stats.batches, 4)
+
+    def test_batch_size_is_capped(self):
+        batcher = MicroBatcher(self.process, max_batch_size=3, max_wait=0.05)
+        futures = [batcher.submit(i) for i in range(7)]
+        self.release.set()
+        batcher.start()
+        self.addCleanup(batcher.stop, 1.0)
+        self.assertEqual([future.result(2.0) for future in futures], [i * 10 for i in range(7)])
+        self.assertEqual([len(call) for call in self.calls], [3, 3, 1])
+        self.assertEqual(batcher.stats.sizes[3], 2)
+
+    def test_errors_reach_every_request(self):
+        def fail(items):
+            raise RuntimeError('embedder caído')
+        batcher = MicroBatcher(fail, max_batch_size=2, max_wait=0.0)
+        futures = [batcher.submit(i) for i in range(2)]
+        batcher.start()
+        self.addCleanup(batcher.stop, 1.0)
+        for future in futures:
+            with self.assertRaises(RuntimeError):
+                future.result(2.0)
+        self.assertEqual(batcher.stats.errors, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+import threading
+import time
+
+from process.face_processing.model_registry import ModelRegistry, resident_memory_mb
+
+
+class TestModelRegistry(unittest.TestCase):
+    def test_model_created_once_across_threads(self):
+        registry = ModelRegistry()
+        calls = []
+
+        def factory():
+            calls.append(1)
+            time.sleep(0.05)
+            return object()
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(registry.get('model', factory))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertTrue(registry.is_loaded('model'))
+        self.assertGreaterEqual(registry.stats['model'].load_time_s, 0.05)
+
+    def test_report_and_clear(self):
+        registry = ModelRegistry()
+        registry.get('a', dict)
+        registry.get('b', list)
+        self.assertEqual([stats.name for stats in registry.report()], ['a', 'b'])
+        registry.clear()
+        self.assertFalse(registry.is_loaded('a'))
+        self.assertGreater(resident_memory_mb(), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from process.face_processing.model_warmup import ModelWarmUp
+
+
+class FakeMatcher:
+    def __init__(self, embedding):
+        self.embedding = embedding
+
+    def face_embedding(self, face):
+        return self.embedding
+
+
+class FakeFaceUtils:
+    embedding = None
+
+    def __init__(self):
+        self.face_matcher = FakeMatcher(self.embedding)
+
+    def check_face(self, frame):
+        return True, None, None
+
+    def face_mesh(self, frame):
+        return True, None
+
+
+class TestModelWarmUp(unittest.TestCase):
+    def run_warmup(self, embedding) -> ModelWarmUp:
+        warmup = ModelWarmUp()
+        with mock.patch('process.face_processing.face_utils.FaceUtils',
+                        type('FaceUtils', (FakeFaceUtils,), {'embedding': embedding})):
+            warmup.start()
+            warmup.wait(5.0)
+        return warmup
+
+    def test_warm_with_embedding(self):
+        warmup = self.run_warmup(np.ones(128, dtype=np.float32))
+        self.assertTrue(warmup.is_done)
+        self.assertTrue(warmup.is_warm)
+        self.assertEqual(warmup.error, '')
+
+    def test_none_embedding_is_a_failure(self):
+        warmup = self.run_warmup(None)
+        self.assertTrue(warmup.is_done)
+        self.assertFalse(warmup.is_warm)
+        self.assertEqual(warmup.state, ModelWarmUp.FAILED)
+        self.assertIn('embeddings', warmup.error)
+
+
+if __name__ == '__main__':
+    unittest.main()
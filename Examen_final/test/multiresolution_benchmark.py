@@ -0,0 +1,97 @@
+"""
+Benchmark del pipeline multirresolución: latencia por frame y recall de detección y malla
+cuando detector y malla corren sobre una copia reducida del frame.
+
+Uso: python -m test.multiresolution_benchmark <directorio de imágenes | video> --widths 0 640 480 320 240
+(ancho 0 = resolución completa, referencia para el IoU de los bbox)
+"""
+import os
+import time
+import argparse
+from typing import Dict, Iterator, List
+
+import cv2
+import numpy as np
+
+from process.face_processing.face_detect_models.face_detect import FaceDetectMediapipe
+from process.face_processing.face_mesh_models.face_mesh import FaceMeshMediapipe
+from process.face_processing.face_tracker import bbox_iou
+from process.face_processing.frame_context import FrameContext
+
+
+def load_frames(source: str, max_frames: int) -> Iterator[np.ndarray]:
+    if os.path.isdir(source):
+        names = sorted(name for name in os.listdir(source) if name.lower().endswith(('.jpg', '.jpeg', '.png')))
+        for name in names[:max_frames]:
+            frame = cv2.imread(os.path.join(source, name))
+            if frame is not None:
+                yield frame
+    else:
+        cap = cv2.VideoCapture(source)
+        for _ in range(max_frames):
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield frame
+        cap.release()
+
+
+def run_benchmark(frames: List[np.ndarray], widths: List[int]) -> List[Dict]:
+    face_detector = FaceDetectMediapipe()
+    mesh_detector = FaceMeshMediapipe()
+    reference_bboxes = {}
+    results = []
+    for width in widths:
+        latencies, bbox_ious = [], []
+        detected = meshed = 0
+        for i, frame in enumerate(frames):
+            h_img, w_img = frame.shape[:2]
+            start = time.perf_counter()
+            frame_context = FrameContext(frame)
+            rgb_image = frame_context.downscaled(width)[0] if width > 0 else frame_context.rgb
+            check_face, face_info = face_detector.face_detect_mediapipe(frame, rgb_image)
+            check_mesh, _ = mesh_detector.face_mesh_mediapipe(frame, rgb_image)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+            meshed += int(check_mesh)
+            if check_face:
+                detected += 1
+                bbox = face_detector.extract_face_bbox_mediapipe(w_img, h_img, face_info)
+                if width == 0:
+                    reference_bboxes[i] = bbox
+                elif i in reference_bboxes:
+                    bbox_ious.append(bbox_iou(reference_bboxes[i], bbox))
+
+        latencies = np.asarray(latencies)
+        results.append({
+            'width': width or 'full',
+            'latency_mean_ms': float(latencies.mean()),
+            'latency_p95_ms': float(np.percentile(latencies, 95)),
+            'detection_recall': detected / len(frames),
+            'mesh_recall': meshed / len(frames),
+            'bbox_iou_vs_full': float(np.mean(bbox_ious)) if bbox_ious else float('nan'),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Latencia y recall de detección a distintas escalas')
+    parser.add_argument('source', help='directorio de imágenes con un rostro cada una, o archivo de video')
+    parser.add_argument('--widths', type=int, nargs='+', default=[0, 640, 480, 320, 240])
+    parser.add_argument('--max-frames', type=int, default=300)
+    args = parser.parse_args()
+
+    frames = list(load_frames(args.source, args.max_frames))
+    if not frames:
+        raise SystemExit(f'No se encontraron frames en {args.source}')
+    widths = [0] + [width for width in args.widths if width > 0]
+
+    print(f'{len(frames)} frames de {frames[0].shape[1]}x{frames[0].shape[0]}')
+    print(f'{"ancho":>8}{"media (ms)":>12}{"p95 (ms)":>10}{"recall det":>12}{"recall malla":>14}{"IoU bbox":>10}')
+    for summary in run_benchmark(frames, widths):
+        print(f'{summary["width"]:>8}{summary["latency_mean_ms"]:>12.2f}{summary["latency_p95_ms"]:>10.2f}'
+              f'{summary["detection_recall"]:>12.3f}{summary["mesh_recall"]:>14.3f}{summary["bbox_iou_vs_full"]:>10.3f}')
+
+
+if __name__ == '__main__':
+    main()
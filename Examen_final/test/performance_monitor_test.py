@@ -0,0 +1,69 @@
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from process.capture import CaptureStats
+from process.face_processing.face_gallery import FaceGallery
+from process.performance_monitor import PerformanceMonitor, PerformanceSnapshot, format_stages
+
+
+class FakeCapture:
+    def __init__(self):
+        self.stats = CaptureStats(capture_fps=30.0)
+        self.is_running = True
+
+
+class TestPerformanceMonitor(unittest.TestCase):
+    def test_rates_between_snapshots(self):
+        monitor, capture = PerformanceMonitor(), FakeCapture()
+        first = monitor.snapshot(capture)
+        self.assertEqual(first.processing_fps, 0.0)
+
+        capture.stats.frames_captured, capture.stats.frames_consumed, capture.stats.frames_dropped = 4, 1, 3
+        time.sleep(0.1)
+        second = monitor.snapshot(capture)
+        self.assertTrue(second.camera_active)
+        self.assertGreater(second.processing_fps, 0.0)
+        self.assertLessEqual(second.processing_fps, 1 / 0.1)
+        self.assertEqual(second.dropped_percent, 75.0)
+        self.assertTrue(second.starved)
+
+    def test_new_camera_restarts_rates(self):
+        monitor, capture = PerformanceMonitor(), FakeCapture()
+        monitor.snapshot(capture)
+        capture.stats.frames_consumed = 100
+        other = FakeCapture()
+        self.assertEqual(monitor.snapshot(other).processing_fps, 0.0)
+
+    def test_gallery_users_before_any_search(self):
+        gallery = FaceGallery(embedder=lambda face: None)
+        for name in ('ana', 'ana~1', 'beto'):
+            gallery.add(name, np.ones(4))
+        with mock.patch('process.performance_monitor.MODEL_REGISTRY.peek', lambda name: gallery):
+            monitor = PerformanceMonitor()
+            snapshot = monitor.snapshot(None)
+            self.assertEqual((snapshot.gallery_templates, snapshot.gallery_users), (3, 2))
+            gallery.add('carla', np.ones(4))
+            self.assertEqual(monitor.snapshot(None).gallery_users, 3)
+        # counted without touching the gallery's search state
+        self.assertEqual(gallery.users, [])
+
+    def test_without_camera(self):
+        snapshot = PerformanceMonitor().snapshot(None)
+        self.assertFalse(snapshot.camera_active)
+        self.assertFalse(snapshot.starved)
+        self.assertGreater(snapshot.memory_mb, 0.0)
+
+    def test_format_stages(self):
+        stages = {'detect': {'count': 3, 'p50_ms': 4.0, 'p95_ms': 6.5, 'p99_ms': 7.0}}
+        lines = format_stages(stages).splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[1].startswith('detect'))
+        self.assertIn('6.5', lines[1])
+        self.assertEqual(PerformanceSnapshot().dropped_percent, 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
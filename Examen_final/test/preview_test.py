@@ -0,0 +1,70 @@
+import unittest
+import numpy as np
+
+from process.preview import PreviewRenderer
+
+
+class FakePhoto:
+    def __init__(self):
+        self.pasted = []
+
+    def paste(self, image):
+        self.pasted.append(np.asarray(image).copy())
+
+
+class FakeLabel:
+    def __init__(self):
+        self.callbacks = []
+
+    def after(self, delay, callback):
+        self.callbacks.append(callback)
+
+    def winfo_exists(self):
+        return True
+
+
+class OffscreenRenderer(PreviewRenderer):
+    """Vista previa sin Tk: el PhotoImage registra cada paste"""
+    def create_photo(self, size):
+        self.photos = getattr(self, 'photos', []) + [FakePhoto()]
+        return self.photos[-1]
+
+
+class TestPreviewRenderer(unittest.TestCase):
+    def setUp(self):
+        self.frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        self.frame[..., 2] = 200  # rojo en BGR
+
+    def test_buffer_allocated_once_per_size(self):
+        renderer = OffscreenRenderer(FakeLabel(), target_width=320)
+        for _ in range(5):
+            renderer.render(self.frame)
+        self.assertEqual(renderer.stats.buffer_allocations, 1)
+        self.assertEqual(len(renderer.photos), 1)
+        pasted = renderer.photos[0].pasted
+        self.assertEqual(len(pasted), 5)
+        self.assertEqual(pasted[-1].shape, (240, 320, 4))
+        np.testing.assert_array_equal(pasted[-1][0, 0], [200, 0, 0, 255])
+        self.assertGreater(renderer.mean_render_ms, 0.0)
+
+        renderer.render(np.zeros((240, 640, 3), dtype=np.uint8))
+        self.assertEqual(renderer.stats.buffer_allocations, 2)
+
+    def test_display_rate_is_decoupled(self):
+        label = FakeLabel()
+        renderer = OffscreenRenderer(label, target_width=320).start()
+        for _ in range(3):
+            renderer.submit(self.frame)
+        label.callbacks.pop(0)()
+        # varios frames entregados entre dos refrescos: solo se muestra el último
+        self.assertEqual(renderer.stats.frames_rendered, 1)
+        self.assertEqual(renderer.stats.frames_skipped, 2)
+        label.callbacks.pop(0)()
+        self.assertEqual(renderer.stats.frames_rendered, 1)
+        renderer.stop()
+        label.callbacks.pop(0)()
+        self.assertEqual(label.callbacks, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import os
+import time
+import random
+import pstats
+import cProfile
+import tempfile
+import unittest
+
+from process.session_profiler import SessionProfiler, collapsed_stacks
+
+
+def leaf(n):
+    return [bytearray(64) for _ in range(n)]
+
+
+def branch_a():
+    return leaf(20000)
+
+
+def branch_b():
+    return leaf(5000)
+
+
+class TestCollapsedStacks(unittest.TestCase):
+    def test_self_time_split_by_caller(self):
+        profile = cProfile.Profile()
+        profile.enable()
+        for _ in range(5):
+            branch_a()
+            branch_b()
+        profile.disable()
+        stacks = collapsed_stacks(pstats.Stats(profile))
+
+        def leaf_time(caller):
+            return sum(us for stack, us in stacks.items()
+                       if f':{caller}:' in stack and ':leaf:' in stack.split(';')[-1])
+        # leaf's self time follows the caller that spent more time in it
+        self.assertGreater(leaf_time('branch_a'), leaf_time('branch_b'))
+        self.assertTrue(all(us > 0 for us in stacks.values()))
+
+    def test_bounded_on_a_large_call_graph(self):
+        # ~5,500 functions in 64 layers, each called from 8 functions of the layer above:
+        # the number of distinct caller paths is astronomically large
+        rng = random.Random(0)
+        layers = [[(f'module_{depth}.py', i, f'f_{depth}_{i}') for i in range(86)] for depth in range(64)]
+        graph = {}
+        for depth, layer in enumerate(layers):
+            for function in layer:
+                callers = {} if depth == 0 else {
+                    caller: (1, 1, 0.001, rng.uniform(0.01, 1.0)) for caller in rng.sample(layers[depth - 1], 8)}
+                graph[function] = (1, 1, 0.001, 0.001, callers)
+        stats = type('Stats', (), {'stats': graph})()
+
+        start = time.perf_counter()
+        stacks = collapsed_stacks(stats, max_stacks=5000)
+        self.assertLess(time.perf_counter() - start, 20.0)
+        self.assertLessEqual(len(stacks), 5000)
+        self.assertTrue(all(len(stack.split(';')) <= 64 for stack in stacks))
+        # the cut keeps the time on shorter stacks, so the heaviest stacks hold most of it
+        self.assertGreater(sum(stacks.values()), 0.5 * len(graph) * 1000)
+
+
+class TestSessionProfiler(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_disabled_is_a_no_op(self):
+        profiler = SessionProfiler(enabled=False, output_dir=self.tmp_dir.name)
+        profiler.start('registro')
+        self.assertFalse(profiler.active)
+        self.assertEqual(profiler.stop(), {})
+        self.assertEqual(os.listdir(self.tmp_dir.name), [])
+
+    def test_session_reports(self):
+        profiler = SessionProfiler(enabled=True, output_dir=self.tmp_dir.name, top_n=5)
+        profiler.start('verificacion')
+        kept = branch_a()
+        paths = profiler.stop()
+        self.assertFalse(profiler.active)
+        self.assertTrue(profiler.wait(30.0))
+        self.assertEqual(set(paths), {'pstats', 'allocations', 'flame'})
+
+        stats = pstats.Stats(paths['pstats'])
+        self.assertTrue(any(name == 'branch_a' for _, _, name in stats.stats))
+        with open(paths['flame'], encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        self.assertTrue(lines and all(line.rsplit(' ', 1)[1].isdigit() for line in lines))
+        with open(paths['allocations'], encoding='utf-8') as f:
+            report = f.read()
+        self.assertIn('session_profiler_test.py', report)
+        self.assertEqual(len(kept), 20000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+import os
+import json
+import tempfile
+import threading
+
+from process.face_processing.stage_timer import LatencyHistogram, StageTimers
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_rolling_window(self):
+        histogram = LatencyHistogram(window=100)
+        for value in range(1, 201):
+            histogram.record(float(value))
+        # only the last 100 samples are kept, totals cover all of them
+        self.assertEqual(histogram.count, 200)
+        self.assertEqual(histogram.values().min(), 101.0)
+        self.assertAlmostEqual(histogram.percentile(50), 150.5)
+        summary = histogram.summary()
+        self.assertEqual((summary['max_ms'], summary['last_ms']), (200.0, 200.0))
+        self.assertAlmostEqual(histogram.total_ms, sum(range(1, 201)))
+
+    def test_buckets(self):
+        histogram = LatencyHistogram()
+        for value in (0.5, 1.5, 7.0, 7.5, 9000.0):
+            histogram.record(value)
+        buckets = histogram.buckets()
+        self.assertEqual((buckets['<=1'], buckets['<=2'], buckets['<=10'], buckets['>5000']), (1, 1, 2, 1))
+        self.assertEqual(LatencyHistogram().summary()['p95_ms'], 0.0)
+
+
+class TestStageTimers(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_stages_in_pipeline_order(self):
+        timers = StageTimers(enabled=True, trace=False)
+        for name in ('matching', 'custom', 'detect'):
+            with timers.stage(name):
+                pass
+        self.assertEqual(list(timers.summary()), ['detect', 'matching', 'custom'])
+        self.assertEqual(timers.histogram('detect').count, 1)
+
+    def test_disabled_records_nothing(self):
+        timers = StageTimers(enabled=False)
+        with timers.stage('detect'):
+            pass
+        self.assertEqual(timers.summary(), {})
+
+    def test_session_trace(self):
+        timers = StageTimers(enabled=True, trace=True, trace_dir=self.tmp_dir.name)
+        timers.start_session('verificacion')
+        with timers.stage('detect'):
+            pass
+        worker = threading.Thread(target=lambda: timers.record('embedding', 12.5))
+        worker.start()
+        worker.join()
+        path = timers.end_session()
+        with timers.stage('mesh'):
+            pass
+
+        with open(path, encoding='utf-8') as f:
+            events = json.load(f)
+        self.assertTrue(os.path.basename(path).startswith('trace_verificacion_'))
+        self.assertEqual([event['name'] for event in events if event['ph'] == 'X'], ['detect', 'embedding'])
+        self.assertEqual(events[1]['dur'], 12500.0)
+        self.assertNotEqual(events[0]['tid'], events[1]['tid'])
+        self.assertIsNone(timers.end_session())
+
+
+if __name__ == '__main__':
+    unittest.main()
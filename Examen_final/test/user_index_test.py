@@ -0,0 +1,55 @@
+import time
+import unittest
+
+from process.database.user_index import UserIndex
+
+
+class TestUserIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = UserIndex([('3003', 'Carla Ruiz'), ('1001', 'ana pérez'), ('2002', 'Bruno Anaya'),
+                                ('4004', 'Mariana')])
+
+    def names(self, rows):
+        return [self.index.names[row] for row in rows]
+
+    def test_sorted_by_name(self):
+        self.assertEqual(self.names(self.index.search('')), ['ana pérez', 'Bruno Anaya', 'Carla Ruiz', 'Mariana'])
+        self.assertEqual(self.index.display(0), 'ana pérez (ID: 1001)')
+
+    def test_prefix_matches_first(self):
+        self.assertEqual(self.names(self.index.search('ANA')), ['ana pérez', 'Bruno Anaya', 'Mariana'])
+        self.assertEqual(self.names(self.index.search('bru')), ['Bruno Anaya'])
+        self.assertEqual(self.names(self.index.search('300')), ['Carla Ruiz'])
+        self.assertEqual(self.index.search('zz'), [])
+
+    def test_incremental_narrowing_matches_full_scan(self):
+        for query in ('a', 'an', 'ana', 'anay', 'r', 'ri', 'ria'):
+            narrowed = self.index.search(query)
+            fresh = UserIndex(zip(self.index.codes, self.index.names)).search(query)
+            self.assertEqual(narrowed, fresh, query)
+
+    def test_add_and_remove(self):
+        self.index.search('ana')
+        self.index.add('5005', 'Anabel')
+        self.assertEqual(self.names(self.index.search('ana')), ['ana pérez', 'Anabel', 'Bruno Anaya', 'Mariana'])
+        self.assertTrue(self.index.remove('1001'))
+        self.assertFalse(self.index.remove('1001'))
+        self.assertNotIn('1001', self.index)
+        self.assertEqual(self.names(self.index.search('ana')), ['Anabel', 'Bruno Anaya', 'Mariana'])
+        # a second add of the same code renames the user
+        self.index.add('5005', 'Zoe')
+        self.assertEqual(self.names(self.index.search('')), ['Bruno Anaya', 'Carla Ruiz', 'Mariana', 'Zoe'])
+
+    def test_large_index_stays_interactive(self):
+        index = UserIndex((f'{i:06d}', f'Usuario {i}') for i in range(100000))
+        start = time.perf_counter()
+        self.assertEqual(len(index.search('9')), 40951)
+        rows = index.search('9999')
+        elapsed = time.perf_counter() - start
+        self.assertEqual(len(rows), 19)
+        self.assertEqual(index.codes[rows[0]], '019999')
+        self.assertLess(elapsed, 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+import os
+import datetime
+import tempfile
+import threading
+
+from process.database.user_store import UserStore
+
+
+class TestUserStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = UserStore(os.path.join(self.tmp_dir.name, 'db', 'users.sqlite3'))
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp_dir.cleanup()
+
+    def test_users(self):
+        self.assertTrue(self.store.add_user('2002', 'bruno'))
+        self.assertFalse(self.store.add_user('2002', 'Otro nombre'))
+        self.assertEqual(self.store.add_users([('1001', 'Ana'), ('2002', 'Bruno'), ('3003', 'Carla')]), 2)
+        self.assertEqual([user.code for user in self.store.users()], ['1001', '2002', '3003'])
+        self.assertEqual(self.store.get_user('2002').name, 'bruno')
+        self.assertIn('3003', self.store)
+        self.assertIsNone(self.store.get_user('9999'))
+        self.assertEqual(self.store.user_count(), 3)
+        self.assertEqual(self.store.connection.execute('PRAGMA journal_mode').fetchone()[0], 'wal')
+
+    def test_delete_keeps_check_in_history(self):
+        self.store.add_user('1001', 'Ana')
+        self.store.add_templates([('1001', '1001', 'faces/1001.png'), ('1001~1', '1001', 'faces/1001~1.png')])
+        self.store.check_in('1001')
+        self.assertTrue(self.store.delete_user('1001'))
+        self.assertEqual(self.store.templates('1001'), [])
+        self.assertEqual(self.store.check_in_count('1001'), 1)
+
+    def test_check_ins_newest_first(self):
+        self.store.add_user('1001', 'Ana')
+        self.store.check_in('1001', moment=datetime.datetime(2025, 1, 2, 8, 0, 0))
+        self.store.check_in('1001', success=False, moment=datetime.datetime(2025, 1, 3, 8, 0, 0))
+        self.assertEqual(self.store.check_ins('1001'), [('2025-01-03 08:00:00', False), ('2025-01-02 08:00:00', True)])
+
+    def test_concurrent_writers(self):
+        self.store.add_user('1001', 'Ana')
+
+        def writer():
+            # each thread gets its own connection to the same file
+            for _ in range(25):
+                self.store.check_in('1001')
+            self.store.close()
+
+        threads = [threading.Thread(target=writer) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        reader = UserStore(self.store.path)
+        self.assertEqual(reader.check_in_count('1001'), 100)
+        reader.close()
+
+    def test_migrate_legacy_layout(self):
+        users_path = os.path.join(self.tmp_dir.name, 'users')
+        faces_path = os.path.join(self.tmp_dir.name, 'faces')
+        os.makedirs(users_path)
+        os.makedirs(faces_path)
+        with open(os.path.join(users_path, '1001.txt'), 'w', encoding='utf-8') as file:
+            file.write('Ana Pérez,1001,\n\n✅ Acceso exitoso: 2025-03-01 09:15:00\n\n✅ Acceso exitoso: 2025-03-02 09:01:00\n')
+        with open(os.path.join(users_path, '2002.txt'), 'w', encoding='utf-8') as file:
+            file.write('Bruno,2002,\n')
+        for name in ('1001.png', '1001~1.png', '2002.png', '7777.png'):
+            open(os.path.join(faces_path, name), 'wb').close()
+
+        report = self.store.migrate_legacy(users_path, faces_path)
+        self.assertEqual((report.users, report.templates, report.check_ins), (2, 3, 2))
+        self.assertEqual(self.store.get_user('1001').name, 'Ana Pérez')
+        self.assertEqual(self.store.check_ins('1001')[0], ('2025-03-02 09:01:00', True))
+        self.assertEqual([template for template, _ in self.store.templates('1001')], ['1001', '1001~1'])
+
+        self.assertTrue(self.store.migrate_legacy(users_path, faces_path).skipped)
+        report = self.store.migrate_legacy(users_path, faces_path, force=True)
+        self.assertEqual((report.users, report.templates, report.check_ins), (0, 0, 0))
+        self.assertEqual(self.store.check_in_count('1001'), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+"""
+Generador de carga del servicio de verificación: latencia p50/p95/p99 y throughput con N
+clientes concurrentes, junto al tamaño medio de los micro-lotes que formó el servicio.
+
+Uso: python -m test.verification_load <directorio de imágenes> --concurrency 8 --requests 400
+     [--host 127.0.0.1 --port 8765] [--serve --max-batch 8 --max-wait-ms 5]
+(--serve levanta el servicio en este mismo proceso antes de medir)
+"""
+import os
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import numpy as np
+
+from process.config_modern import SERVICE_CONFIG
+from process.verification_service import VerificationClient
+
+
+def load_images(directory: str) -> List[bytes]:
+    images = []
+    for name in sorted(os.listdir(directory)):
+        if name.lower().endswith(('.jpg', '.jpeg', '.png')):
+            with open(os.path.join(directory, name), 'rb') as file:
+                images.append(file.read())
+    return images
+
+
+def latency_summary(latencies_ms: List[float]) -> Dict[str, float]:
+    latencies = np.asarray(latencies_ms, dtype=np.float64)
+    if latencies.size == 0:
+        return {'p50_ms': float('nan'), 'p95_ms': float('nan'), 'p99_ms': float('nan'), 'mean_ms': float('nan')}
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {'p50_ms': float(p50), 'p95_ms': float(p95), 'p99_ms': float(p99), 'mean_ms': float(latencies.mean())}
+
+
+def run_load(client: VerificationClient, images: List[bytes], concurrency: int, requests: int) -> Dict:
+    latencies: List[float] = []
+    errors, matched = [], 0
+    lock = threading.Lock()
+
+    def one_request(i: int):
+        nonlocal matched
+        start = time.perf_counter()
+        try:
+            response = client.verify(images[i % len(images)])
+        except Exception as e:
+            with lock:
+                errors.append(str(e))
+            return
+        elapsed = (time.perf_counter() - start) * 1000
+        with lock:
+            latencies.append(elapsed)
+            matched += int(response.get('matched', False))
+
+    before = client.health()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        list(executor.map(one_request, range(requests)))
+    wall = time.perf_counter() - start
+    after = client.health()
+
+    batches = after['batches'] - before['batches']
+    summary = latency_summary(latencies)
+    summary.update({
+        'requests': requests,
+        'concurrency': concurrency,
+        'errors': len(errors),
+        'matched': matched,
+        'throughput_rps': len(latencies) / wall if wall > 0 else 0.0,
+        'mean_batch_size': (after['requests'] - before['requests']) / batches if batches else 0.0,
+    })
+    if errors:
+        summary['first_error'] = errors[0]
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Carga concurrente contra el servicio de verificación')
+    parser.add_argument('images', help='directorio de imágenes enviadas en rotación')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--host', default=SERVICE_CONFIG.HOST)
+    parser.add_argument('--port', type=int, default=SERVICE_CONFIG.PORT)
+    parser.add_argument('--serve', action='store_true', help='levantar el servicio en este proceso')
+    parser.add_argument('--max-batch', type=int, default=SERVICE_CONFIG.MAX_BATCH_SIZE)
+    parser.add_argument('--max-wait-ms', type=float, default=SERVICE_CONFIG.MAX_WAIT_MS)
+    args = parser.parse_args()
+
+    images = load_images(args.images)
+    if not images:
+        raise SystemExit(f'No se encontraron imágenes en {args.images}')
+
+    server = service = None
+    if args.serve:
+        from process.verification_service import VerificationService, create_server
+        service = VerificationService(args.max_batch, args.max_wait_ms)
+        server = create_server(service, args.host, 0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        args.port = server.server_port
+
+    client = VerificationClient(args.host, args.port)
+    print(f'{len(images)} imágenes | servicio {args.host}:{args.port} | {client.health()["embedding_model"]}')
+    print(f'{"clientes":>9}{"p50 (ms)":>10}{"p95 (ms)":>10}{"p99 (ms)":>10}{"pedidos/s":>11}{"lote medio":>12}{"errores":>9}')
+    try:
+        for concurrency in args.concurrency:
+            summary = run_load(client, images, concurrency, args.requests)
+            print(f'{concurrency:>9}{summary["p50_ms"]:>10.1f}{summary["p95_ms"]:>10.1f}{summary["p99_ms"]:>10.1f}'
+                  f'{summary["throughput_rps"]:>11.1f}{summary["mean_batch_size"]:>12.2f}{summary["errors"]:>9}')
+    finally:
+        if server is not None:
+            server.shutdown()
+            service.close()
+
+
+if __name__ == '__main__':
+    main()
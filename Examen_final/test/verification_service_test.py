@@ -0,0 +1,107 @@
+import os
+import types
+import tempfile
+import unittest
+import threading
+
+import cv2
+import numpy as np
+
+from process.face_processing.face_gallery import FaceGallery
+from process.face_processing.micro_batcher import MicroBatcher
+from process.verification_service import VerificationClient, VerificationService, create_server
+from test.verification_load import latency_summary, run_load
+
+
+class FakeService:
+    """Servicio sin modelos: la "imagen" es el nombre del usuario y pasa por un MicroBatcher real"""
+
+    def __init__(self):
+        self.batcher = MicroBatcher(lambda names: [[(name, 0.1)] for name in names], 8, 0.01).start()
+
+    def verify(self, image_bytes):
+        if not image_bytes:
+            raise ValueError('Imagen ilegible')
+        user, distance = self.batcher.submit(image_bytes.decode()).result(2.0)[0]
+        return {'matched': True, 'user': user, 'distance': distance}
+
+    def reload(self):
+        return 3
+
+    def health(self):
+        return {'batches': self.batcher.stats.batches, 'requests': self.batcher.stats.items,
+                'embedding_model': 'fake'}
+
+
+def mean_color(image_bgr):
+    return image_bgr.reshape(-1, 3).mean(axis=0).astype(np.float32) + 1.0
+
+
+class TestVerifyBatch(unittest.TestCase):
+    """verify_batch sin modelos: el embedding es el color medio del recorte"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.faces = self.tmp_dir.name
+        for user, color in (('ana', (200, 10, 10)), ('beto', (10, 200, 10))):
+            cv2.imwrite(os.path.join(self.faces, f'{user}.png'), np.full((8, 8, 3), color, dtype=np.uint8))
+        gallery = FaceGallery(embedder=mean_color, metric='cosine')
+        matcher = types.SimpleNamespace(face_embeddings=lambda faces: [mean_color(face) for face in faces])
+        self.service = VerificationService.__new__(VerificationService)
+        self.service.database = types.SimpleNamespace(faces=self.faces)
+        self.service.gallery_lock = threading.Lock()
+        self.service.face_utils = types.SimpleNamespace(face_gallery=gallery, face_matcher=matcher)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_changes_on_disk_are_seen_without_reload(self):
+        # crops arrive in RGB, as from FaceUtils
+        probe = np.full((8, 8, 3), (10, 10, 200), dtype=np.uint8)
+        self.assertEqual(self.service.verify_batch([probe])[0][0][0], 'ana')
+
+        # deleting a user only removes the image (GUI action): the next batch no longer finds it
+        os.remove(os.path.join(self.faces, 'ana.png'))
+        candidates = self.service.verify_batch([probe])[0]
+        self.assertEqual([user for user, _ in candidates], ['beto'])
+
+
+class TestVerificationService(unittest.TestCase):
+    def setUp(self):
+        self.service = FakeService()
+        self.server = create_server(self.service, '127.0.0.1', 0)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.client = VerificationClient('127.0.0.1', self.server.server_port, timeout=5.0)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.service.batcher.stop(1.0)
+
+    def test_verify_and_health(self):
+        response = self.client.verify(b'ana')
+        self.assertEqual((response['user'], response['matched']), ('ana', True))
+        self.assertEqual(self.client.reload(), {'gallery_templates': 3})
+        self.assertEqual(self.client.health()['requests'], 1)
+
+    def test_bad_request(self):
+        with self.assertRaises(RuntimeError):
+            self.client.verify(b'')
+        # the connection is still usable after an error response
+        self.assertEqual(self.client.verify(b'luis')['user'], 'luis')
+
+    def test_load_generator_reports_percentiles(self):
+        summary = run_load(self.client, [b'ana', b'luis'], concurrency=4, requests=40)
+        self.assertEqual((summary['errors'], summary['matched']), (0, 40))
+        self.assertLessEqual(summary['p50_ms'], summary['p99_ms'])
+        self.assertGreater(summary['throughput_rps'], 0)
+        self.assertGreaterEqual(summary['mean_batch_size'], 1.0)
+
+    def test_latency_summary(self):
+        summary = latency_summary(list(range(1, 101)))
+        self.assertAlmostEqual(summary['p50_ms'], 50.5)
+        self.assertAlmostEqual(summary['p99_ms'], 99.01)
+
+
+if __name__ == '__main__':
+    unittest.main()